@@ -0,0 +1,84 @@
+# %%
+"""
+Compares the integer and string-parsing paths of `polars_convert_date_and_time_columns_to_datetime`
+on a report-sized frame of AQS dates and times.
+
+    python benchmarks/bench_datetime.py --rows 1000000
+"""
+
+import argparse
+import time
+import polars as pl
+import tceq_tamis_processor as ttp
+
+
+def make_date_time_frame(rows: int, parameters: int = 48) -> pl.DataFrame:
+    """Hourly Date (YYYYMMDD int) and Time ("HH:MM") columns, repeated once per parameter like a TAMIS report"""
+
+    hours = -(-rows // parameters)
+    datetimes = pl.datetime_range(
+        pl.datetime(2023, 1, 1),
+        pl.datetime(2023, 1, 1) + pl.duration(hours=hours - 1),
+        interval="1h",
+        eager=True,
+    )
+    df = pl.DataFrame(
+        {
+            "Date": datetimes.dt.strftime("%Y%m%d").cast(pl.Int32),
+            "Time": datetimes.dt.strftime("%H:%M"),
+        }
+    )
+    return pl.concat([df] * parameters).head(rows)
+
+
+def best_of(repeat: int, function, *args, **kwargs) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def parse_strings(df: pl.DataFrame, tzone_in: str, tzone_out: str) -> pl.DataFrame:
+    """The string-parsing path every report took before the integer path was added"""
+    return ttp._parse_date_and_time_columns(
+        df,
+        "Date",
+        ttp.AQS_DATE_FORMAT,
+        "Time",
+        ttp.AQS_TIME_FORMAT,
+        tzone_in,
+        tzone_out,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tzone-in", default="Etc/GMT+6")
+    parser.add_argument("--tzone-out", default="Etc/GMT+6")
+    args = parser.parse_args()
+
+    df = make_date_time_frame(args.rows)
+    engines = {
+        "integer": ttp.polars_convert_date_and_time_columns_to_datetime,
+        "string parsing": parse_strings,
+    }
+
+    timings = {}
+    for engine, convert in engines.items():
+        timings[engine] = best_of(
+            args.repeat, convert, df, tzone_in=args.tzone_in, tzone_out=args.tzone_out
+        )
+        print(f"{engine:>15}: {timings[engine] * 1000:8.1f} ms")
+
+    print(
+        f"{df.height:,} rows, {args.tzone_in} -> {args.tzone_out}: "
+        f"{timings['string parsing'] / timings['integer']:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    main()
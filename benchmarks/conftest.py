@@ -0,0 +1,120 @@
+# %%
+"""
+Shared fixtures for the stage benchmarks. Reports are generated once per session with `tamis_synthetic`.
+
+Report sizes (data rows) are read from TAMIS_BENCH_ROWS, e.g.
+
+    TAMIS_BENCH_ROWS=10000,1000000,100000000 pytest benchmarks/
+"""
+
+import os
+import threading
+import time
+import pytest
+import tamis_synthetic
+from tamis_instrument import current_rss
+
+DEFAULT_BENCH_ROWS = "10000,1000000"
+
+# Sites and POCs of the generated reports: 9 parameters x 2 sites x 2 POCs = 36 series
+BENCH_SITES = [1070, 1071]
+BENCH_POCS = ["01", "02"]
+
+
+def bench_rows() -> list[int]:
+    return [
+        int(rows)
+        for rows in os.environ.get("TAMIS_BENCH_ROWS", DEFAULT_BENCH_ROWS).split(",")
+    ]
+
+
+class PeakMemory:
+    """
+    Samples the process RSS in a background thread and records the peak above the starting RSS.
+    polars allocates outside the Python heap, so tracemalloc would not see most of the memory used.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.start_rss = None
+        self.peak_rss = None
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, current_rss())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        if self.start_rss is not None:
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start_rss is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    @property
+    def peak_mb(self) -> float | None:
+        if self.start_rss is None:
+            return None
+        return (self.peak_rss - self.start_rss) / 1024**2
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Times function with pytest-benchmark and records the numbers that are not timings (peak memory above
+    the starting RSS, input rows) in the benchmark's extra_info. Memory is measured on a separate first
+    run, before the allocator holds on to pages from the timed rounds.
+    """
+
+    def run(function, *args, rows: int = None, rounds: int = 3, **kwargs):
+        with PeakMemory() as peak:
+            function(*args, **kwargs)
+        benchmark.extra_info["peak_rss_mb"] = peak.peak_mb
+
+        result = benchmark.pedantic(
+            function, args=args, kwargs=kwargs, rounds=rounds, iterations=1
+        )
+        if rows is not None:
+            benchmark.extra_info["rows"] = rows
+            benchmark.extra_info["rows_per_s"] = rows / benchmark.stats.stats.min
+        return result
+
+    return run
+
+
+@pytest.fixture(scope="session")
+def report_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("synthetic_reports")
+
+
+@pytest.fixture(scope="session")
+def synthetic_report(report_dir):
+    """Generates (once per session) a synthetic report for each size and delimiter that is requested"""
+
+    reports = {}
+
+    def get(rows: int, delimiter: str = ","):
+        if (rows, delimiter) not in reports:
+            name = {",": "comma", "|": "pipe", "\t": "tab"}[delimiter]
+            reports[rows, delimiter] = tamis_synthetic.write_synthetic_report(
+                report_dir / f"synthetic_{rows}_{name}.txt",
+                rows=rows,
+                sites=BENCH_SITES,
+                pocs=BENCH_POCS,
+                delimiter=delimiter,
+            )
+        return reports[rows, delimiter]
+
+    return get
+
+
+def pytest_generate_tests(metafunc):
+    if "rows" in metafunc.fixturenames:
+        metafunc.parametrize("rows", bench_rows(), ids=lambda rows: f"{rows}rows")
@@ -0,0 +1,155 @@
+# %%
+"""
+Times each stage of `read_tceq_to_pl_dataframe` on synthetic reports, and records the peak memory of each
+stage (extra_info["peak_rss_mb"]).
+
+    pip install -e .[bench]
+    pytest benchmarks/ --benchmark-autosave
+    pytest benchmarks/ --benchmark-compare --benchmark-compare-fail=min:25%
+
+Each stage is timed on the output of the stages before it, which is built once per report outside the timings.
+"""
+
+import polars as pl
+import polars.testing
+import pytest
+import tamis_index
+import tceq_tamis_processor as ttp
+
+DELIMITERS = {"comma": ",", "pipe": "|", "tab": "\t"}
+
+
+def parse_report(
+    filepath, preamble: ttp.TCEQReportPreamble, source: str = "path"
+) -> pl.DataFrame:
+    """
+    The CSV parse of `read_and_extract_tceq_data_to_unformatted_df`, without the datetime build. "path" hands
+    polars the path (as the reader does for plain files); "stream" reads through a Python file object (as for
+    compressed and in-memory reports).
+    """
+    options = dict(
+        has_header=True,
+        separator=preamble.delimiter,
+        schema=ttp.tceq_report_schema(preamble),
+    )
+    if source == "path":
+        return pl.read_csv(filepath, skip_rows=preamble.header_row_number, **options)
+    with open(filepath, "rb") as report:
+        report.seek(preamble.header_offset)
+        return pl.read_csv(report, **options)
+
+
+def convert_datetimes(df: pl.DataFrame) -> pl.DataFrame:
+    """The datetime build, in the timezones `read_tceq_to_pl_dataframe` defaults to"""
+    return ttp.polars_convert_date_and_time_columns_to_datetime(
+        df, tzone_in="Etc/GMT+6", tzone_out="Etc/GMT+6"
+    )
+
+
+def label_and_key(df: pl.DataFrame) -> pl.DataFrame:
+    """The joins before the pivot: reference table labels and the pivot key for each series"""
+    reference_tables = ttp.get_reference_tables()
+    series = ttp.wide_column_labels(
+        df.select(ttp.SERIES_COLUMNS).unique(maintain_order=True), reference_tables
+    ).with_row_index("Column Key")
+    return ttp.label_tceq_codes(df, reference_tables).join(
+        series.select(*ttp.SERIES_COLUMNS, "Column Key"),
+        on=ttp.SERIES_COLUMNS,
+        maintain_order="left",
+    )
+
+
+_stage_inputs = {}
+
+
+def stage_inputs(filepath) -> dict:
+    """Outputs of each stage for a report, built once and shared by the benchmarks"""
+    if filepath not in _stage_inputs:
+        preamble = ttp.read_tceq_preamble(filepath)
+        raw = parse_report(filepath, preamble)
+        long = convert_datetimes(raw)
+        _stage_inputs[filepath] = {
+            "preamble": preamble,
+            "raw": raw,
+            "long": long,
+            "wide": ttp.pivot_tceq_long(long),
+        }
+    return _stage_inputs[filepath]
+
+
+def test_preamble_scan(measure, synthetic_report, rows):
+    filepath = synthetic_report(rows)
+    measure(ttp.read_tceq_preamble, filepath, rounds=20)
+
+
+@pytest.mark.parametrize("source", ["path", "stream"])
+@pytest.mark.parametrize("delimiter", DELIMITERS)
+def test_csv_parse(measure, synthetic_report, rows, delimiter, source):
+    filepath = synthetic_report(rows, DELIMITERS[delimiter])
+    preamble = ttp.read_tceq_preamble(filepath)
+    df = measure(parse_report, filepath, preamble, source, rows=rows)
+    assert df.height == pytest.approx(rows, rel=0.01)
+
+
+def test_datetime_build(measure, synthetic_report, rows):
+    raw = stage_inputs(synthetic_report(rows))["raw"]
+    measure(convert_datetimes, raw, rows=rows)
+
+
+def test_joins(measure, synthetic_report, rows):
+    long = stage_inputs(synthetic_report(rows))["long"]
+    measure(label_and_key, long, rows=rows)
+
+
+def test_pivot(measure, synthetic_report, rows):
+    long = stage_inputs(synthetic_report(rows))["long"]
+    measure(ttp.pivot_tceq_long, long, rows=rows)
+
+
+@pytest.mark.parametrize("saved_file_type", ["parquet", "csv"])
+def test_save(measure, synthetic_report, report_dir, rows, saved_file_type):
+    """Writes the wide output as `read_tceq_to_pl_dataframe(save=True)` does"""
+    wide = stage_inputs(synthetic_report(rows))["wide"]
+    if saved_file_type == "parquet":
+        measure(wide.write_parquet, report_dir / f"wide_{rows}.gzip", rows=rows)
+    else:
+        measure(wide.write_csv, report_dir / f"wide_{rows}.csv", rows=rows)
+
+
+def test_end_to_end(measure, synthetic_report, rows):
+    filepath = synthetic_report(rows)
+    df = measure(ttp.read_tceq_to_pl_dataframe, filepath, rows=rows)
+    polars.testing.assert_frame_equal(df, stage_inputs(filepath)["wide"])
+
+
+@pytest.mark.parametrize("use_index", [False, True], ids=["full", "indexed"])
+def test_read_one_parameter(measure, synthetic_report, rows, use_index):
+    """Reads one of the 9 parameters, with a full parse or only its blocks (index built outside the timings)"""
+    filepath = synthetic_report(rows)
+    if use_index:
+        tamis_index.load_tceq_index(filepath)
+    parameter_cd = stage_inputs(filepath)["raw"]["Parameter Cd"][0]
+    measure(
+        ttp.read_tceq_to_pl_dataframe,
+        filepath,
+        parameter_codes=parameter_cd,
+        use_index=use_index,
+        rows=rows,
+    )
+
+
+def test_build_index(measure, synthetic_report, rows):
+    measure(tamis_index.build_tceq_index, synthetic_report(rows), save=False, rows=rows)
+
+
+@pytest.mark.parametrize("arrow_dtypes", [False, True], ids=["numpy", "arrow"])
+@pytest.mark.parametrize("output", ["wide", "long"])
+def test_to_pandas(measure, synthetic_report, rows, output, arrow_dtypes):
+    """
+    Converts processed records to pandas: NumPy-backed (`pl.DataFrame.to_pandas()`, a copy of every column) or
+    Arrow-backed, sharing the polars memory. Compare the peak_rss_mb of the two.
+    """
+    pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    df = stage_inputs(synthetic_report(rows))[output]
+    measure(ttp.to_pd_dataframe, df, arrow_dtypes=arrow_dtypes, rows=rows)
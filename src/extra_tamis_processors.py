@@ -1,52 +1,72 @@
 # %%
 from pathlib import Path
-import pandas as pd
-import tceq_tamis_processor as tgp
-import importlib
-
-importlib.reload(tgp)
+import polars as pl
 from importlib import resources
 
 
-def pull_extras_data(ref_dir, ref_file):
+def _read_ref_txt(ref_path, schema_overrides=None):
+    # The exports are tab separated and end with a blank line
+    return pl.read_csv(
+        ref_path, separator="\t", schema_overrides=schema_overrides
+    ).filter(~pl.all_horizontal(pl.all().is_null()))
+
+
+def pull_extras_data(ref_dir, ref_file, schema_overrides=None):
+    # ref_dir is either a directory on disk (e.g. fresh exports from TAMIS) or the packaged "ref_files"
+    if Path(ref_dir).is_dir():
+        ref_path = Path(ref_dir) / ref_file
+        return ref_path, _read_ref_txt(ref_path, schema_overrides)
+
     with resources.path(ref_dir, ref_file) as ref_path:
-        return ref_path, pd.read_table(ref_path)
+        return ref_path, _read_ref_txt(ref_path, schema_overrides)
 
 
 #### Extras
-def convert_ref_files_to_csv():
-    """Processes .txt reference files from TCEQ Geotam website to csv for easier reading in main module.
-    The package comes with files that have already been processed. This script is just included as a reference
+def clean_ref_txt_files(ref_dir="ref_files"):
+    """Reads the .txt reference files from the TCEQ Geotam website and renames their columns to match the
+    raw TAMIS data. Returns the (parameter, unit, site) tables and the paths they were read from.
     """
 
-    params, tceq_keys = pull_extras_data("ref_files", "tceq_parameters.txt")
-    units, tceq_units = pull_extras_data("ref_files", "tceq_units.txt")
-    site_info, tceq_site_info = pull_extras_data("ref_files", "tceq_site_locations.txt")
+    params, tceq_keys = pull_extras_data(ref_dir, "tceq_parameters.txt")
+    units, tceq_units = pull_extras_data(ref_dir, "tceq_units.txt")
+    site_info, tceq_site_info = pull_extras_data(
+        ref_dir, "tceq_site_locations.txt", schema_overrides={"CAMS": pl.String}
+    )
 
-    tceq_keys.rename(
-        columns={"Parm Code": "Parameter Cd", "Name": "Parameter Name"}, inplace=True
+    tceq_keys = tceq_keys.rename(
+        {"Parm Code": "Parameter Cd", "Name": "Parameter Name"}
     )
-    tceq_units.rename(
-        columns={
+    tceq_units = tceq_units.rename(
+        {
             "Code": "Unit Cd",
             "Description": "Unit Description",
             "Abbr": "Unit Abbr",
             "Type": "Unit Type",
-        },
-        inplace=True,
+        }
     )
-    tceq_site_info.rename(columns={"CAMS": "Site ID"}, inplace=True)
-    tceq_site_info = tceq_site_info[["Site ID", "Site Name"]]
-    tceq_site_info["Site ID"] = tceq_site_info["Site ID"].str.split(
-        ","
-    )  # Some sites have more than one site ID - this takes care of that
-    tceq_site_info = tceq_site_info.explode("Site ID")
-
-    tceq_site_info["Site ID"] = tceq_site_info["Site ID"].astype(int)
-
-    tceq_keys.to_csv(Path(params).with_suffix(".csv"), index=False)
-    tceq_units.to_csv(Path(units).with_suffix(".csv"), index=False)
-    tceq_site_info.to_csv(Path(site_info).with_suffix(".csv"), index=False)
+    tceq_site_info = (
+        tceq_site_info.select(pl.col("CAMS").alias("Site ID"), "Site Name")
+        # Some sites have more than one site ID - this takes care of that
+        .with_columns(pl.col("Site ID").str.split(","))
+        .explode("Site ID")
+        .with_columns(pl.col("Site ID").str.strip_chars().cast(pl.Int64))
+    )
+
+    return (tceq_keys, tceq_units, tceq_site_info), (params, units, site_info)
+
+
+def convert_ref_files_to_csv():
+    """Processes .txt reference files from TCEQ Geotam website to csv for easier reading in main module.
+    The package comes with files that have already been processed. This script is just included as a reference
+    """
+
+    (tceq_keys, tceq_units, tceq_site_info), (params, units, site_info) = (
+        clean_ref_txt_files()
+    )
+
+    tceq_keys.write_csv(Path(params).with_suffix(".csv"))
+    tceq_units.write_csv(Path(units).with_suffix(".csv"))
+    tceq_site_info.write_csv(Path(site_info).with_suffix(".csv"))
 
 
 if __name__ == "__main__":
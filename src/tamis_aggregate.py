@@ -0,0 +1,310 @@
+# %%
+from __future__ import annotations
+
+import math
+from datetime import timedelta
+import tamis_lazy
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Identify a measurement series in long-format records (see `tceq_tamis_processor.LONG_FORMAT_COLUMNS`)
+LONG_KEY_COLUMNS = [
+    "Site ID",
+    "Site Name",
+    "Parameter Cd",
+    "Parameter Name",
+    "POC",
+    "Dur Cd",
+    "Unit Cd",
+    "Unit Abbr",
+]
+
+# Columns of wide output that are not measurement series
+WIDE_INDEX_COLUMNS = ["Datetime", "Site ID", "Site Name"]
+
+# Wide series are unpivoted into this column, holding the wide column name
+SERIES_COLUMN = "Series"
+
+# A period is complete when at least this fraction of its expected samples is valid (the EPA 75% rule)
+DEFAULT_MIN_COVERAGE = 0.75
+
+SUMMARY_COLUMNS = [
+    "Mean",
+    "Max",
+    "Second Max",
+    "Min",
+    "Std",
+    "Count",
+    "Coverage (%)",
+    "Complete",
+]
+
+
+def _to_long(df: pl.DataFrame | pl.LazyFrame) -> tuple[pl.LazyFrame, list[str]]:
+    """
+    Records in long format, sorted by series and Datetime, and the columns identifying each series.
+    Wide output (one column per series) is unpivoted on the series columns.
+    """
+
+    columns = df.collect_schema().names()
+    lf = df.lazy()
+    if "Value" in columns:
+        keys = [column for column in LONG_KEY_COLUMNS if column in columns]
+        lf = lf.select(*keys, "Datetime", "Value")
+    else:
+        index = [column for column in WIDE_INDEX_COLUMNS if column in columns]
+        keys = [column for column in index if column != "Datetime"] + [SERIES_COLUMN]
+        lf = lf.unpivot(
+            index=index, variable_name=SERIES_COLUMN, value_name="Value"
+        ).select(*keys, "Datetime", "Value")
+
+    return lf.drop_nulls("Value").sort(*keys, "Datetime"), keys
+
+
+def expected_samples(
+    lower: pl.Expr, upper: pl.Expr, sample_every: timedelta
+) -> pl.Expr:
+    """Number of samples taken every sample_every in [lower, upper)"""
+    return (upper - lower).dt.total_microseconds() // (
+        sample_every // timedelta(microseconds=1)
+    )
+
+
+def _same_type(df, result: pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+    return result if isinstance(df, pl.LazyFrame) else result.collect()
+
+
+def summarize(
+    df: pl.DataFrame | pl.LazyFrame,
+    every: str = "1d",
+    min_coverage: float = DEFAULT_MIN_COVERAGE,
+    sample_every: timedelta = timedelta(hours=1),
+    mask_incomplete: bool = True,
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Summarizes every measurement series over calendar periods (days, months, ...) in a single group_by_dynamic,
+    across all sites and parameters at once.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Output of `read_tceq_to_pl_dataframe` (wide or long), `read_tceq_many`, or `scan_tceq`
+
+    every: str
+        Length of the periods, as a polars duration string: "1d", "1w", "1mo", "1y", ...
+        Periods start at midnight in the time zone of the Datetime column (LST for TAMIS data).
+        Default: "1d"
+
+    min_coverage: float
+        Fraction of the expected samples a period needs to be complete.
+        Default: DEFAULT_MIN_COVERAGE (0.75, e.g. 18 of 24 hours for a daily mean)
+
+    sample_every: timedelta
+        Sampling interval of the series, used for the expected number of samples in a period.
+        Default: 1 hour (Dur Cd 1)
+
+    mask_incomplete: bool
+        Set the statistics of incomplete periods to null (Count, Coverage, and Complete are kept).
+        Default: True
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per series and period (of the same type as df), with the series columns ("Series" holding the
+        column name for wide input), "Datetime" (period start), and `SUMMARY_COLUMNS`:
+        Mean, Max, Second Max, Min, Std, Count (valid samples), Coverage (%), and Complete
+
+
+    Example
+    --------
+    ```
+    >>> df = ttp.read_tceq_to_pl_dataframe(filepath)
+    >>> daily = tamis_aggregate.summarize(df, every="1d")
+    >>> monthly = tamis_aggregate.summarize(df, every="1mo")
+    >>> tamis_aggregate.to_wide(daily, "Mean")   # back to one column per series
+    ```
+
+    The columns match the TCEQ monthly summary pages: Max, SH (Second Max), Min, and Cap (Coverage (%)).
+    """
+
+    lf, keys = _to_long(df)
+    statistics = [
+        pl.col("Value").mean().alias("Mean"),
+        pl.col("Value").max().alias("Max"),
+        pl.col("Value").sort(descending=True).slice(1, 1).first().alias("Second Max"),
+        pl.col("Value").min().alias("Min"),
+        pl.col("Value").std().alias("Std"),
+    ]
+    complete = pl.col("Count") >= pl.col("_expected") * min_coverage
+
+    lf = (
+        lf.group_by_dynamic(
+            "Datetime", every=every, group_by=keys, include_boundaries=True
+        )
+        .agg(*statistics, pl.len().cast(pl.UInt32).alias("Count"))
+        .with_columns(
+            expected_samples(
+                pl.col("_lower_boundary"), pl.col("_upper_boundary"), sample_every
+            ).alias("_expected")
+        )
+        .with_columns(
+            (pl.col("Count") / pl.col("_expected") * 100).alias("Coverage (%)"),
+            complete.alias("Complete"),
+        )
+    )
+    if mask_incomplete:
+        lf = lf.with_columns(
+            pl.when(pl.col("Complete")).then(pl.col(stat.meta.output_name()))
+            for stat in statistics
+        )
+
+    return _same_type(df, lf.select(*keys, "Datetime", *SUMMARY_COLUMNS))
+
+
+def rolling_mean(
+    df: pl.DataFrame | pl.LazyFrame,
+    window: str = "8h",
+    min_coverage: float = DEFAULT_MIN_COVERAGE,
+    sample_every: timedelta = timedelta(hours=1),
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Rolling (moving) means of every series, in a single rolling window pass across all sites and parameters.
+    Each window starts at a record and covers window from it, e.g. the 8-hour ozone average of 07:00 covers
+    07:00 to 14:59, as in EPA's 8-hour ozone averages.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Output of `read_tceq_to_pl_dataframe` (wide or long), `read_tceq_many`, or `scan_tceq`
+
+    window: str
+        Length of the window, as a polars duration string.
+        Default: "8h"
+
+    min_coverage, sample_every:
+        See `summarize`. A window with fewer valid samples has a null mean (6 of 8 hours by default).
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per series and window start, with the series columns, "Datetime" (window start),
+        "Mean", and "Count"
+
+
+    Example
+    --------
+    ```
+    >>> eight_hour = tamis_aggregate.rolling_mean(df.select("Datetime", "Site ID", "TCEQ Ozone (ppbv)"))
+    ```
+    """
+
+    lf, keys = _to_long(df)
+    expected = expected_samples(
+        pl.col("Datetime"), pl.col("Datetime").dt.offset_by(window), sample_every
+    )
+
+    lf = (
+        lf.rolling("Datetime", period=window, offset="0h", closed="left", group_by=keys)
+        .agg(
+            pl.col("Value").mean().alias("Mean"),
+            pl.len().cast(pl.UInt32).alias("Count"),
+        )
+        .with_columns(
+            pl.when(pl.col("Count") >= expected * min_coverage).then(pl.col("Mean"))
+        )
+    )
+
+    return _same_type(df, lf.select(*keys, "Datetime", "Mean", "Count"))
+
+
+def daily_max_rolling_mean(
+    df: pl.DataFrame | pl.LazyFrame,
+    window: str = "8h",
+    first_hour: int = 7,
+    last_hour: int = 23,
+    min_coverage: float = DEFAULT_MIN_COVERAGE,
+    sample_every: timedelta = timedelta(hours=1),
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Daily maximum of the rolling means of every series, e.g. the maximum daily 8-hour average (MDA8) used for
+    the ozone standard.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Output of `read_tceq_to_pl_dataframe` (wide or long), `read_tceq_many`, or `scan_tceq`
+
+    window: str
+        Length of the rolling window. See `rolling_mean`.
+        Default: "8h"
+
+    first_hour, last_hour: int
+        Only windows starting from first_hour to last_hour (inclusive, local time) count towards a day.
+        Default: 7 and 23 (the 17 windows of the 2015 ozone standard)
+
+    min_coverage: float
+        Fraction of valid samples a window needs, and fraction of the windows (first_hour to last_hour)
+        a day needs to be complete.
+        Default: DEFAULT_MIN_COVERAGE (0.75: 6 of 8 hours per window, 13 of 17 windows per day)
+
+    sample_every: timedelta
+        See `summarize`
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per series and day, with the series columns, "Datetime" (day start), "Max" (null for incomplete
+        days), "Count" (valid windows), and "Complete"
+
+
+    Example
+    --------
+    ```
+    >>> mda8 = tamis_aggregate.daily_max_rolling_mean(df, window="8h")
+    ```
+    """
+
+    windows = rolling_mean(
+        df.lazy(), window=window, min_coverage=min_coverage, sample_every=sample_every
+    )
+    keys = [
+        column
+        for column in windows.collect_schema().names()
+        if column not in ("Datetime", "Mean", "Count")
+    ]
+    windows_needed = math.ceil((last_hour - first_hour + 1) * min_coverage)
+
+    lf = (
+        windows.drop_nulls("Mean")
+        .filter(pl.col("Datetime").dt.hour().is_between(first_hour, last_hour))
+        .group_by(*keys, pl.col("Datetime").dt.truncate("1d"))
+        .agg(
+            pl.col("Mean").max().alias("Max"),
+            pl.len().cast(pl.UInt32).alias("Count"),
+        )
+        .with_columns((pl.col("Count") >= windows_needed).alias("Complete"))
+        .with_columns(pl.when(pl.col("Complete")).then(pl.col("Max")))
+        .sort(*keys, "Datetime")
+    )
+
+    return _same_type(df, lf.select(*keys, "Datetime", "Max", "Count", "Complete"))
+
+
+def to_wide(
+    summary: pl.DataFrame | pl.LazyFrame, statistic: str = "Mean"
+) -> pl.DataFrame:
+    """
+    Pivots one statistic of `summarize` (or `rolling_mean`/`daily_max_rolling_mean`) of wide input back to one
+    column per series, like the output of `read_tceq_to_pl_dataframe`.
+    """
+
+    summary = summary.lazy().collect()
+    index = [column for column in WIDE_INDEX_COLUMNS if column in summary.columns]
+    return (
+        summary.pivot(SERIES_COLUMN, index=index, values=statistic)
+        .sort(*index[1:], "Datetime")
+        .select(*index, pl.exclude(index))
+    )
@@ -0,0 +1,214 @@
+# %%
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+import tamis_io
+import tamis_lazy
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Bump when the layout of cached frames changes so stale entries are never read
+CACHE_FORMAT_VERSION = 1
+
+# Default size cap for a cache directory. Least recently used entries are evicted past this size.
+DEFAULT_CACHE_MAX_BYTES = 2 * 1024**3
+
+CACHE_SUFFIX = ".arrow"
+
+
+def _file_fingerprint(filepath: str | Path, hash_contents: bool) -> dict:
+    """Identify a report by a hash of its contents, or by its path, size, and modification time"""
+
+    # Compressed reports are hashed decompressed; zip members are stamped with their archive's size and time
+    on_disk = tamis_io.source_path(filepath)
+    if on_disk is None:
+        raise ValueError(
+            f"Only reports on disk can be cached, not {tamis_io.source_name(filepath)}"
+        )
+    if hash_contents:
+        digest = hashlib.blake2b(digest_size=16)
+        with tamis_io.open_report(filepath) as report:
+            for chunk in iter(lambda: report.read(1024 * 1024), b""):
+                digest.update(chunk)
+        return {"content": digest.hexdigest()}
+
+    stat = on_disk.stat()
+    return {
+        "path": str(Path(filepath).resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def cache_key(filepath: str | Path, hash_contents: bool = False, **arguments) -> str:
+    """
+    Builds the cache key for a processed TAMIS report.
+
+    Parameters
+    ----------
+    filepath: str | Path
+        filepath to the raw TAMIS report
+
+    hash_contents: bool
+        Key on a hash of the file contents rather than its path, size, and modification time. Slower,
+        but survives copies and touch-without-change.
+        Default: False
+
+    **arguments:
+        Everything else that changes the processed output (e.g. tzone_in, tzone_out, filters, and the
+        reference table version)
+
+
+    Returns
+    ----------
+    str
+        Hex digest identifying the cache entry
+    """
+
+    key_source = {
+        "format": CACHE_FORMAT_VERSION,
+        "file": _file_fingerprint(filepath, hash_contents),
+        "arguments": arguments,
+    }
+    encoded = json.dumps(key_source, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=20).hexdigest()
+
+
+def _entry_path(cache_dir: str | Path, key: str) -> Path:
+    return Path(cache_dir).expanduser() / f"{key}{CACHE_SUFFIX}"
+
+
+def load_cached(cache_dir: str | Path, key: str) -> pl.DataFrame | None:
+    """
+    Loads a cached frame, memory-mapped, and marks it as recently used.
+
+    Returns None if there is no entry for key.
+    """
+
+    entry = _entry_path(cache_dir, key)
+    try:
+        # Entries are written uncompressed, so polars memory-maps them instead of copying
+        df = pl.read_ipc(entry)
+    except FileNotFoundError:
+        return None
+
+    # Modification time doubles as the last-used time for LRU eviction
+    os.utime(entry)
+    return df
+
+
+def store_cached(
+    cache_dir: str | Path,
+    key: str,
+    df: pl.DataFrame,
+    max_bytes: int = None,
+) -> Path:
+    """
+    Writes a frame to the cache as uncompressed Arrow IPC (so it can be memory-mapped when read back) and
+    evicts least recently used entries until the cache is within max_bytes.
+
+    Parameters
+    ----------
+    cache_dir: str | Path
+        Cache directory. Created if it does not exist.
+
+    key: str
+        Key from `cache_key`
+
+    df: pl.DataFrame
+        Processed frame to cache
+
+    max_bytes: int
+        Size cap for the cache directory.
+        Default: None (DEFAULT_CACHE_MAX_BYTES)
+
+
+    Returns
+    ----------
+    Path
+        Path to the cache entry
+    """
+
+    cache_dir = Path(cache_dir).expanduser()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    entry = _entry_path(cache_dir, key)
+
+    # Write to a temporary file and rename so concurrent readers never see a partial entry
+    tmp_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+    df.write_ipc(tmp_entry, compression="uncompressed")
+    os.replace(tmp_entry, entry)
+
+    evict(cache_dir, DEFAULT_CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+    return entry
+
+
+def evict(cache_dir: str | Path, max_bytes: int) -> int:
+    """
+    Removes least recently used entries until the cache directory holds at most max_bytes.
+
+    Returns the number of entries removed.
+    """
+
+    entries = []
+    for entry in Path(cache_dir).expanduser().glob(f"*{CACHE_SUFFIX}"):
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            # Removed by another process
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, entry))
+    entries.sort()
+
+    total = sum(size for _, size, _ in entries)
+
+    removed = 0
+    for _, size, entry in entries:
+        if total <= max_bytes:
+            break
+        entry.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def cache_info(cache_dir: str | Path) -> pl.DataFrame:
+    """
+    Lists the entries in a cache directory, most recently used first.
+
+    Returns
+    ----------
+    pl.DataFrame
+        One row per entry with "Key", "Size (bytes)", and "Last Used" columns.
+        `cache_info(cache_dir)["Size (bytes)"].sum()` is the total cache size.
+    """
+
+    entries = [
+        {
+            "Key": entry.name.removesuffix(CACHE_SUFFIX),
+            "Size (bytes)": entry.stat().st_size,
+            "Last Used": datetime.fromtimestamp(entry.stat().st_mtime),
+        }
+        for entry in Path(cache_dir).expanduser().glob(f"*{CACHE_SUFFIX}")
+    ]
+
+    return pl.DataFrame(
+        entries,
+        schema={
+            "Key": pl.String,
+            "Size (bytes)": pl.Int64,
+            "Last Used": pl.Datetime("us"),
+        },
+    ).sort("Last Used", descending=True)
+
+
+def clear_cache(cache_dir: str | Path) -> int:
+    """
+    Removes every entry from a cache directory. Returns the number of entries removed.
+    """
+
+    return evict(cache_dir, max_bytes=-1)
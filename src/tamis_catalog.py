@@ -0,0 +1,301 @@
+# %%
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import tamis_lazy
+import tamis_index
+import tamis_instrument
+import tamis_io
+import tceq_tamis_processor as ttp
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Identify the file a catalog entry was read from. Entries of files whose size and modification time are unchanged
+# are reused when the catalog is refreshed (zip members are stamped with their archive's size and time).
+FILE_COLUMNS = ["Path", "Size (bytes)", "Modified (ns)"]
+
+# From the report preamble
+PREAMBLE_COLUMNS = [
+    "Run Date",
+    "Measurements From",
+    "Measurements To",
+    "Sample Duration Cd",
+    "Delimiter",
+]
+
+SERIES_KEY_COLUMNS = ["Site ID", "Parameter Cd", "POC", "Dur Cd"]
+
+CATALOG_COLUMNS = [
+    *FILE_COLUMNS,
+    *PREAMBLE_COLUMNS,
+    *SERIES_KEY_COLUMNS,
+    "Rows",
+    "Start",
+    "End",
+]
+
+
+def _catalog_schema() -> dict:
+    schema = ttp.aqs_rd_schema()
+    return {
+        "Path": pl.String,
+        "Size (bytes)": pl.Int64,
+        "Modified (ns)": pl.Int64,
+        "Run Date": pl.Datetime("us"),
+        "Measurements From": pl.Datetime("us"),
+        "Measurements To": pl.Datetime("us"),
+        "Sample Duration Cd": pl.String,
+        "Delimiter": pl.String,
+        **{column: schema[column] for column in SERIES_KEY_COLUMNS},
+        "Rows": pl.UInt32,
+        "Start": pl.Datetime("us"),
+        "End": pl.Datetime("us"),
+    }
+
+
+def _file_stamp(filepath: Path) -> tuple[int, int]:
+    stat = tamis_io.source_path(filepath).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _catalog_report(filepath: Path) -> pl.DataFrame:
+    """Catalog entries of one report: one row per series, or a single row with null series if it has no records"""
+
+    with tamis_instrument.report(tamis_io.source_name(filepath)):
+        size, modified = _file_stamp(filepath)
+        preamble = ttp.read_tceq_preamble(filepath)
+
+        # Only the code columns and "Date" and "Time" are parsed. Times are kept as written in the report.
+        lf = ttp.scan_tceq(filepath, tzone_in=None, tzone_out=None, preamble=preamble)
+        with tamis_instrument.stage("catalog scan", lf) as stage:
+            series = stage.output(
+                lf.group_by(SERIES_KEY_COLUMNS)
+                .agg(
+                    pl.len().cast(pl.UInt32).alias("Rows"),
+                    pl.col("Datetime").min().alias("Start"),
+                    pl.col("Datetime").max().alias("End"),
+                )
+                .sort(SERIES_KEY_COLUMNS)
+                .collect()
+            )
+
+    report = pl.DataFrame(
+        {
+            "Path": [str(filepath)],
+            "Size (bytes)": [size],
+            "Modified (ns)": [modified],
+            "Run Date": [preamble.run_date],
+            "Measurements From": [preamble.measurements_from],
+            "Measurements To": [preamble.measurements_to],
+            "Sample Duration Cd": [preamble.sample_duration_code],
+            "Delimiter": [preamble.delimiter],
+        },
+        schema={
+            column: dtype
+            for column, dtype in _catalog_schema().items()
+            if column in FILE_COLUMNS + PREAMBLE_COLUMNS
+        },
+    )
+    return report.join(series, how="cross") if series.height else report
+
+
+def build_tceq_catalog(
+    paths_or_glob: str | Path | list,
+    catalog_path: str | Path = None,
+    workers: int = None,
+) -> pl.DataFrame:
+    """
+    Catalogs which sites, parameters, POCs, and dates a collection of TAMIS reports holds, without processing
+    them. Each report's preamble is read, and only its code, "Date", and "Time" columns are scanned.
+
+    Parameters
+    -----------
+    paths_or_glob: str | Path | list
+        Glob pattern, directory, filepath, or list of these. See `resolve_tceq_paths`. Compressed reports and zip
+        bundles are cataloged too.
+
+    catalog_path: str | Path
+        Parquet file the catalog is saved to. If it already exists, entries of reports whose size and
+        modification time are unchanged are reused, so only new and changed reports are scanned; entries of
+        reports no longer found are dropped.
+        Default: None (not saved)
+
+    workers: int
+        Number of reports scanned at the same time.
+        Default: None (ThreadPoolExecutor default, based on the number of CPUs)
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        `CATALOG_COLUMNS`: one row per report and series, with the report's "Path", "Size (bytes)", and
+        "Modified (ns)", its preamble (run date, measurement window, sample duration code, delimiter), the series
+        codes, and the number of records and first and last timestamps of the series ("Start" and "End", as
+        written in the report: naive local time). Reports with no records have a single row with null series.
+
+
+    Example
+    --------
+    ```
+    >>> catalog = tamis_catalog.build_tceq_catalog("/data/tamis", catalog_path="/data/tamis/catalog.parquet")
+    >>> catalog.group_by("Parameter Cd").agg(pl.col("Path").n_unique())
+    ```
+    """
+
+    filepaths = ttp.resolve_tceq_paths(paths_or_glob)
+
+    previous = None
+    if catalog_path is not None and Path(catalog_path).expanduser().is_file():
+        previous = pl.read_parquet(Path(catalog_path).expanduser())
+
+    # Reuse the entries of reports whose size and modification time are unchanged
+    unchanged = pl.DataFrame(schema=_catalog_schema())
+    if previous is not None:
+        stamps = pl.DataFrame(
+            [(str(filepath), *_file_stamp(filepath)) for filepath in filepaths],
+            schema=FILE_COLUMNS,
+            orient="row",
+        )
+        unchanged = previous.join(stamps, on=FILE_COLUMNS, how="semi")
+    known = set(unchanged["Path"])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        scanned = executor.map(
+            _catalog_report,
+            [filepath for filepath in filepaths if str(filepath) not in known],
+        )
+        # Reports without records have no series columns
+        catalog = pl.concat(
+            [pl.DataFrame(schema=_catalog_schema()), unchanged, *scanned],
+            how="diagonal_relaxed",
+        )
+    catalog = catalog.select(CATALOG_COLUMNS).sort("Path", *SERIES_KEY_COLUMNS)
+
+    if catalog_path is not None:
+        # Write to a temporary file and rename so concurrent readers never see a partial catalog
+        catalog_path = Path(catalog_path).expanduser()
+        tmp_path = catalog_path.with_suffix(f".{os.getpid()}.tmp")
+        catalog.write_parquet(tmp_path)
+        os.replace(tmp_path, catalog_path)
+
+    return catalog
+
+
+def query_catalog(
+    catalog: pl.DataFrame | str | Path,
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+) -> list[Path]:
+    """
+    The reports holding records that match the filters of `read_tceq_to_pl_dataframe`, i.e. the only reports
+    that need to be opened for a request.
+
+    Parameters
+    -----------
+    catalog: pl.DataFrame | str | Path
+        Output of `build_tceq_catalog`, or the Parquet file it was saved to
+
+    parameter_codes, site_ids, pocs, start, end:
+        See `filter_tceq`. A report matches if it holds a matching series with records from start to end.
+        Default: None (no filter)
+
+    tzone_in, tzone_out:
+        Timezones the reports will be read with, so naive start and end are read the same way as by
+        `read_tceq_to_pl_dataframe`.
+        Default: Etc/GMT+6
+
+
+    Returns
+    ---------
+    list[Path]
+        Sorted filepaths, ready for `read_tceq_many`
+
+
+    Example
+    --------
+    ```
+    >>> filepaths = tamis_catalog.query_catalog(catalog, parameter_codes=43202, site_ids=1070, start=datetime(2025, 4, 1))
+    >>> df = ttp.read_tceq_many(filepaths, parameter_codes=43202, site_ids=1070, start=datetime(2025, 4, 1))
+    ```
+    """
+
+    if isinstance(catalog, (str, Path)):
+        catalog = pl.read_parquet(Path(catalog).expanduser())
+
+    entries = ttp.filter_tceq(
+        catalog.drop_nulls("Parameter Cd"),
+        parameter_codes=parameter_codes,
+        site_ids=site_ids,
+        pocs=pocs,
+    )
+    if start is not None:
+        entries = entries.filter(
+            pl.col("End") >= tamis_index.report_time(start, tzone_in, tzone_out)
+        )
+    if end is not None:
+        entries = entries.filter(
+            pl.col("Start") < tamis_index.report_time(end, tzone_in, tzone_out)
+        )
+
+    return [Path(path) for path in entries["Path"].unique().sort()]
+
+
+def read_tceq_catalog(
+    catalog: pl.DataFrame | str | Path,
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    **kwargs,
+) -> pl.DataFrame:
+    """
+    Reads the records matching the filters from only the reports that hold them (see `query_catalog`), with
+    `read_tceq_many`.
+
+    Parameters
+    -----------
+    catalog: pl.DataFrame | str | Path
+        Output of `build_tceq_catalog`, or the Parquet file it was saved to
+
+    parameter_codes, site_ids, pocs, start, end, tzone_in, tzone_out, **kwargs:
+        See `read_tceq_many`
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        Output of `read_tceq_many`
+
+
+    Example
+    --------
+    ```
+    >>> df = tamis_catalog.read_tceq_catalog("/data/tamis/catalog.parquet", parameter_codes=[61103, 61104], output="long")
+    ```
+    """
+
+    filters = dict(
+        parameter_codes=parameter_codes,
+        site_ids=site_ids,
+        pocs=pocs,
+        start=start,
+        end=end,
+        tzone_in=tzone_in,
+        tzone_out=tzone_out,
+    )
+    filepaths = query_catalog(catalog, **filters)
+    if not filepaths:
+        raise FileNotFoundError(f"No cataloged TAMIS reports match {filters}")
+
+    return ttp.read_tceq_many(filepaths, **filters, **kwargs)
@@ -0,0 +1,252 @@
+# %%
+"""
+Batch converts TAMIS reports to Parquet, CSV, or Arrow IPC files.
+
+    tamis-convert /data/tamis/downloads/*.txt --out /data/tamis/processed --format parquet --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+import tamis_io
+import tceq_tamis_processor as ttp
+
+OUTPUT_SUFFIXES = {"parquet": ".parquet", "csv": ".csv", "arrow": ".arrow"}
+
+# The options an output was converted with are saved next to it, e.g. "report.parquet.options.json"
+OPTIONS_SUFFIX = ".options.json"
+
+
+def output_path(filepath: Path, out_dir: Path | None, file_format: str) -> Path:
+    """
+    Where a report is converted to: out_dir (or the directory of the report or its zip archive) /
+    <report name without compression suffix>.<format>
+    """
+    out_path = tamis_io.output_path(filepath, OUTPUT_SUFFIXES[file_format])
+    return out_path if out_dir is None else out_dir / out_path.name
+
+
+def colliding_outputs(out_paths: dict) -> dict:
+    """
+    Reports that would be converted to the same file (e.g. "r.txt" and "r.txt.gz", or reports of the same name
+    in different directories converted to one out_dir): report -> the other reports sharing its output
+    """
+
+    by_output = {}
+    for filepath, out_path in out_paths.items():
+        by_output.setdefault(out_path.resolve(), []).append(filepath)
+    return {
+        filepath: [other for other in filepaths if other != filepath]
+        for filepaths in by_output.values()
+        if len(filepaths) > 1
+        for filepath in filepaths
+    }
+
+
+def options_path(out_path: Path) -> Path:
+    """Path of the file recording the options an output was converted with"""
+    return out_path.with_name(out_path.name + OPTIONS_SUFFIX)
+
+
+def is_up_to_date(filepath: Path, out_path: Path, options: dict = None) -> bool:
+    """
+    The output exists and is newer than the report, and (if options are given) was converted with the same
+    options
+    """
+    try:
+        if out_path.stat().st_mtime < tamis_io.source_path(filepath).stat().st_mtime:
+            return False
+        if options is not None:
+            return json.loads(options_path(out_path).read_text()) == options
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return True
+
+
+def convert_report(
+    filepath: Path,
+    out_path: Path,
+    file_format: str = "parquet",
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    output: str = "wide",
+) -> tuple[int, int]:
+    """
+    Converts one report, writing to a temporary file that is renamed into place so an interrupted
+    conversion never leaves a partial output that looks up to date. The options are then saved next to the
+    output (see `options_path`), so outputs converted with other options are not taken as up to date.
+
+    Returns the number of rows written and the size of the report on disk in bytes (compressed, or of the
+    whole archive for zip members).
+    """
+
+    df = ttp.read_tceq_to_pl_dataframe(
+        filepath, tzone_in=tzone_in, tzone_out=tzone_out, output=output
+    )
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    try:
+        if file_format == "parquet":
+            df.write_parquet(tmp_path)
+        elif file_format == "csv":
+            df.write_csv(tmp_path)
+        else:
+            df.write_ipc(tmp_path)
+        os.replace(tmp_path, out_path)
+
+        options = dict(tzone_in=tzone_in, tzone_out=tzone_out, output=output)
+        tmp_path.write_text(json.dumps(options))
+        os.replace(tmp_path, options_path(out_path))
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return df.height, tamis_io.source_path(filepath).stat().st_size
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="tamis-convert",
+        description="Convert TCEQ TAMIS reports to Parquet, CSV, or Arrow IPC files.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="Report files, directories of .txt reports, or globs"
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=None,
+        help="Output directory (default: next to each report)",
+    )
+    parser.add_argument(
+        "--format", choices=list(OUTPUT_SUFFIXES), default="parquet", dest="file_format"
+    )
+    parser.add_argument(
+        "--output",
+        choices=["wide", "long"],
+        default="wide",
+        help="Wide (one column per parameter) or long (one row per measurement) data",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Reports converted at the same time, each in its own process (default: 1)",
+    )
+    parser.add_argument("--tz-in", default="Etc/GMT+6", help="Default: Etc/GMT+6")
+    parser.add_argument("--tz-out", default="Etc/GMT+6", help="Default: Etc/GMT+6")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert reports even if up to date (e.g. after a package update)",
+    )
+    parser.add_argument(
+        "--quiet", "-q", action="store_true", help="Only print failures"
+    )
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point of `tamis-convert`. Returns the exit code: 0 if every report was converted or up to date,
+    1 if any report failed (including reports whose outputs would collide), and 2 if no reports were found.
+    """
+
+    args = _parser().parse_args(argv)
+    started = time.perf_counter()
+
+    filepaths = ttp.resolve_tceq_paths(args.inputs)
+    if not filepaths:
+        print(
+            f"tamis-convert: no reports found matching {args.inputs}", file=sys.stderr
+        )
+        return 2
+
+    out_paths = {
+        filepath: output_path(filepath, args.out, args.file_format)
+        for filepath in filepaths
+    }
+    # Reports sharing an output would overwrite each other, so none of them are converted
+    collisions = colliding_outputs(out_paths)
+
+    # Outputs converted with other options are converted again
+    options = dict(tzone_in=args.tz_in, tzone_out=args.tz_out, output=args.output)
+
+    jobs = {}
+    skipped = 0
+    for filepath, out_path in out_paths.items():
+        if filepath in collisions:
+            continue
+        if not args.force and is_up_to_date(filepath, out_path, options):
+            skipped += 1
+            if not args.quiet:
+                print(f"up to date: {filepath}")
+        else:
+            jobs[filepath] = out_path
+
+    converted = failed = rows = bytes_read = 0
+    for filepath, others in collisions.items():
+        failed += 1
+        print(
+            f"FAILED {filepath}: output {out_paths[filepath]} is also the output of "
+            f"{', '.join(map(str, others))}",
+            file=sys.stderr,
+        )
+
+    convert_kwargs = dict(file_format=args.file_format, **options)
+
+    def finished(filepath, result=None, error=None):
+        nonlocal converted, failed, rows, bytes_read
+        if error is not None:
+            failed += 1
+            print(f"FAILED {filepath}: {error}", file=sys.stderr)
+            return
+        converted += 1
+        rows += result[0]
+        bytes_read += result[1]
+        if not args.quiet:
+            print(f"converted: {filepath} -> {jobs[filepath]} ({result[0]:,} rows)")
+
+    if args.jobs > 1 and len(jobs) > 1:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        # polars is multi-threaded, so workers are spawned rather than forked
+        with ProcessPoolExecutor(
+            max_workers=args.jobs, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = {
+                executor.submit(
+                    convert_report, filepath, out_path, **convert_kwargs
+                ): filepath
+                for filepath, out_path in jobs.items()
+            }
+            for future in as_completed(futures):
+                error = future.exception()
+                finished(futures[future], None if error else future.result(), error)
+    else:
+        for filepath, out_path in jobs.items():
+            try:
+                finished(filepath, convert_report(filepath, out_path, **convert_kwargs))
+            except Exception as error:
+                finished(filepath, error=error)
+
+    seconds = time.perf_counter() - started
+    if not args.quiet or failed:
+        print(
+            f"{converted} converted, {skipped} up to date, {failed} failed in {seconds:.2f} s "
+            f"({converted / seconds:.1f} files/s, {rows / seconds:,.0f} rows/s, "
+            f"{bytes_read / 1024**2 / seconds:.1f} MB/s)"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
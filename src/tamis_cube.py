@@ -0,0 +1,283 @@
+# %%
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
+import tamis_lazy
+import tamis_instrument
+import tamis_io
+import tceq_tamis_processor as ttp
+
+if TYPE_CHECKING:
+    import numpy as np
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Codes identifying the series of axis 1 of a cube
+CUBE_SERIES_COLUMNS = ttp.SERIES_COLUMNS
+
+
+@dataclass(frozen=True)
+class TCEQCube:
+    """
+    TAMIS records on a regular time grid, as a dense (site x series x time) NumPy array.
+
+    Attributes
+    ----------
+    values: np.ndarray
+        Values, shape (len(sites), len(series), len(times)). NaN where there is no record.
+
+    missing: np.ndarray
+        Boolean mask of the same shape, True where there is no valid value
+
+    sites: dict
+        Site ID -> index on axis 0
+
+    series: dict
+        (Parameter Cd, POC, Dur Cd, Unit Cd) -> index on axis 1 (see `CUBE_SERIES_COLUMNS`)
+
+    times: pl.Series
+        Datetime of each index on axis 2 (start of each time step)
+    """
+
+    values: np.ndarray
+    missing: np.ndarray
+    sites: dict
+    series: dict
+    times: pl.Series
+
+    def parameter_index(self, parameter_cd: int) -> int:
+        """Index on axis 1 of the series of a parameter. Raises KeyError if there is not exactly one."""
+
+        indices = [
+            index for key, index in self.series.items() if key[0] == parameter_cd
+        ]
+        if len(indices) != 1:
+            raise KeyError(
+                f"Parameter {parameter_cd} has {len(indices)} series in the cube; index them with `series`"
+            )
+        return indices[0]
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "Exporting cubes needs NumPy: pip install tceq_tamis_processor[numpy]"
+        ) from None
+    return numpy
+
+
+def _time_bound(value: datetime, time_zone: str | None) -> datetime:
+    """A bound of the time axis in the timezone of the records. Naive bounds are read in that timezone."""
+
+    bound = pl.Series([value])
+    if time_zone is None:
+        return bound.dt.replace_time_zone(None).item() if value.tzinfo else value
+    if value.tzinfo is None:
+        return bound.dt.replace_time_zone(time_zone).item()
+    return bound.dt.convert_time_zone(time_zone).item()
+
+
+def _allocate(np, shape: tuple, dtype, fill, out: Path | None) -> np.ndarray:
+    if out is None:
+        return np.full(shape, fill, dtype=dtype)
+    array = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+    array.fill(fill)
+    return array
+
+
+def missing_path(out: str | Path) -> Path:
+    """Path the missing mask of a cube saved to out is saved to: "cube.npy" -> "cube_missing.npy" """
+    out = Path(out).expanduser()
+    return out.with_name(f"{out.stem}_missing.npy")
+
+
+def to_cube(
+    source: str | Path | bytes | BinaryIO | pl.DataFrame | pl.LazyFrame,
+    every: str = "1h",
+    start: datetime = None,
+    end: datetime = None,
+    dtype: str = "float64",
+    out: str | Path = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+) -> TCEQCube:
+    """
+    Scatters TAMIS records into a dense (site x series x time) NumPy array on a regular time grid, in one
+    vectorised pass over the long-format records. The sparse wide DataFrame is never built, and gaps need no
+    upsampling: every time step of the grid has a slot.
+
+    Parameters
+    -----------
+    source: str | Path | bytes | BinaryIO | pl.DataFrame | pl.LazyFrame
+        - a TAMIS report (see `read_tceq_to_pl_dataframe`). The time grid covers the report's measurement window.
+        - long-format records with "Site ID", "Parameter Cd", "POC", "Dur Cd", "Unit Cd", "Datetime", and "Value"
+          columns, e.g. from `scan_tceq`, `read_tceq_to_pl_dataframe(output="long")`, or
+          `read_tceq_many(output="long")`. The time grid covers the records.
+
+    every: str
+        Time step of the grid, as a polars duration string.
+        Default: "1h"
+
+    start, end: datetime
+        Time grid from start up to (not including) end. Naive datetimes are read in the timezone of the records.
+        Default: None (the measurement window of the report, or the first and last records)
+
+    dtype: str
+        dtype of the values: "float64" or "float32" (half the memory)
+        Default: "float64"
+
+    out: str | Path
+        Save the values to this .npy file, memory-mapped, so the cube can be larger than RAM. The missing mask is
+        saved next to it (see `missing_path`). Load them with `np.load(out, mmap_mode="r")`.
+        Default: None (in memory)
+
+    tzone_in, tzone_out, parameter_codes, site_ids, pocs:
+        See `read_tceq_to_pl_dataframe`. The timezones only apply to reports.
+
+
+    Returns
+    ---------
+    TCEQCube
+        The values, the missing mask, and the Site ID and series code -> axis index mappings and time axis.
+        Sites are sorted; series are in the order they appear in the records (the column order of wide output).
+
+
+    Example
+    --------
+    ```
+    >>> cube = tamis_cube.to_cube(filepath, dtype="float32")
+    >>> cube.values.shape
+    (1, 47, 360)
+    >>> ethane = cube.values[cube.sites[1070], cube.parameter_index(43202)]
+    >>> tamis_cube.to_cube(ttp.scan_tceq(filepath), out="/data/cube.npy")
+    ```
+
+    Records between grid points are placed at the grid point before them. A grid cell receiving more than one
+    record raises ValueError: average finer data first, e.g. with `tamis_aggregate.summarize(df, every=every)`.
+    When no records match the filters, the cube has no sites or series; without start and end there is no time
+    grid to build, and ValueError is raised.
+    """
+
+    np = _numpy()
+    if out is not None:
+        out = Path(out).expanduser()
+
+    if isinstance(source, (pl.DataFrame, pl.LazyFrame)):
+        lf = source.lazy()
+    else:
+        if not tamis_io.is_plain_file(source):
+            # Decompress once: the preamble and the records are read from the same bytes
+            with tamis_io.open_report(source) as report:
+                source = report.read()
+        preamble = ttp.read_tceq_preamble(source)
+        lf = ttp.scan_tceq(
+            source, tzone_in=tzone_in, tzone_out=tzone_out, preamble=preamble
+        )
+        # The measurement window is in report time. Reports without one fall back to the records.
+        if preamble.measurements_from is not None:
+            window = pl.Series([preamble.measurements_from, preamble.measurements_to])
+            if tzone_in is not None:
+                window = window.dt.replace_time_zone(tzone_in)
+                if tzone_out is not None:
+                    window = window.dt.convert_time_zone(tzone_out)
+            start = window[0] if start is None else start
+            end = window[1] if end is None else end
+
+    time_zone = lf.collect_schema()["Datetime"].time_zone
+    start = None if start is None else _time_bound(start, time_zone)
+    end = None if end is None else _time_bound(end, time_zone)
+    lf = ttp.filter_tceq(
+        lf,
+        parameter_codes=parameter_codes,
+        site_ids=site_ids,
+        pocs=pocs,
+        start=start,
+        end=end,
+    )
+
+    with tamis_instrument.stage("collect records", lf) as stage:
+        records = stage.output(
+            lf.select("Site ID", *CUBE_SERIES_COLUMNS, "Datetime", "Value").collect()
+        )
+
+    if records.is_empty() and (start is None or end is None):
+        raise ValueError(
+            "No records match the filters, so the time grid has no bounds. "
+            "Pass start and end for an empty cube."
+        )
+    if start is None:
+        start = records["Datetime"].min()
+    if end is None:
+        end = records.select(pl.col("Datetime").max().dt.offset_by(every)).item()
+    times = pl.datetime_range(
+        start, end, every, closed="left", time_unit="us", eager=True
+    ).alias("Datetime")
+
+    sites = (
+        records.select(pl.col("Site ID").unique().sort())
+        .with_row_index("_site")
+        .with_columns(pl.col("_site").cast(pl.Int64))
+    )
+    series = (
+        records.select(CUBE_SERIES_COLUMNS)
+        .unique(maintain_order=True)
+        .with_row_index("_series")
+        .with_columns(pl.col("_series").cast(pl.Int64))
+    )
+    shape = (sites.height, series.height, times.len())
+
+    with tamis_instrument.stage("scatter", records) as stage:
+        # Position of every record in the flattened cube. Records are placed at the grid point at or before them.
+        step = pl.Series(
+            times.search_sorted(records["Datetime"], side="right"), dtype=pl.Int64
+        )
+        cells = (
+            records.with_columns((step - 1).alias("_time"))
+            .join(sites, on="Site ID", maintain_order="left")
+            .join(series, on=CUBE_SERIES_COLUMNS, maintain_order="left")
+            .select(
+                (
+                    (pl.col("_site") * shape[1] + pl.col("_series")) * shape[2]
+                    + pl.col("_time")
+                ).alias("Cell"),
+                "Value",
+            )
+        )
+        if cells["Cell"].is_duplicated().any():
+            raise ValueError(
+                f"More than one record falls in a {every} time step of the grid. Average them first, "
+                f"e.g. with tamis_aggregate.summarize(df, every={every!r})"
+            )
+
+        values = _allocate(np, shape, dtype, np.nan, out)
+        missing = _allocate(
+            np, shape, bool, True, None if out is None else missing_path(out)
+        )
+        cell = cells["Cell"].to_numpy()
+        value = cells["Value"].cast(pl.Float64).to_numpy()
+        values.reshape(-1)[cell] = value
+        missing.reshape(-1)[cell] = np.isnan(value)
+        stage.output(cells)
+
+    if out is not None:
+        values.flush()
+        missing.flush()
+
+    return TCEQCube(
+        values=values,
+        missing=missing,
+        sites=dict(sites.select("Site ID", "_site").iter_rows()),
+        series={
+            row[:-1]: row[-1]
+            for row in series.select(*CUBE_SERIES_COLUMNS, "_series").iter_rows()
+        },
+        times=times,
+    )
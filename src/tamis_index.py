@@ -0,0 +1,425 @@
+# %%
+from __future__ import annotations
+
+import contextlib
+import os
+from datetime import datetime
+from pathlib import Path
+import tamis_lazy
+import tamis_instrument
+import tamis_io
+import tceq_tamis_processor as ttp
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Sidecar index of a report: "2025_site_48.txt" -> "2025_site_48.txt.index.arrow"
+INDEX_SUFFIX = ".index.arrow"
+
+# Records of one (site, parameter, POC, duration) series are written one after another in RD reports
+BLOCK_KEY_COLUMNS = ["Site ID", "Parameter Cd", "POC", "Dur Cd"]
+
+INDEX_COLUMNS = [*BLOCK_KEY_COLUMNS, "Offset", "Length", "Rows", "Start", "End"]
+
+
+def index_path(filepath: str | Path) -> Path:
+    """Path of the sidecar index of a report"""
+    filepath = Path(filepath).expanduser()
+    return filepath.with_name(filepath.name + INDEX_SUFFIX)
+
+
+def _data_offset(filepath: Path, preamble: ttp.TCEQReportPreamble) -> int:
+    """Byte offset of the first record, just past the column header line"""
+    with open(filepath, "rb") as report:
+        report.seek(preamble.header_offset)
+        return preamble.header_offset + len(report.readline())
+
+
+def build_tceq_index(
+    filepath: str | Path,
+    preamble: ttp.TCEQReportPreamble = None,
+    save: bool = True,
+) -> pl.DataFrame:
+    """
+    Indexes the blocks of a report in one pass: the byte range, row count, and first and last timestamps of every
+    contiguous run of records of one site, parameter, POC, and duration.
+
+    Parameters
+    -----------
+    filepath: str | Path
+        filepath to an uncompressed TAMIS report. Compressed reports cannot be seeked into, so are not indexed.
+
+    preamble: TCEQReportPreamble
+        Already-parsed preamble of the report.
+        Default: None (read with `read_tceq_preamble`)
+
+    save: bool
+        Write the index next to the report (see `index_path`), where `load_tceq_index` finds it. If the
+        directory is not writable (e.g. a read-only archive), the index is returned without being saved.
+        Default: True
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        One row per block, in file order, with `INDEX_COLUMNS`: the `BLOCK_KEY_COLUMNS`, "Offset" and "Length"
+        (bytes from the start of the report), "Rows", and "Start" and "End" (first and last timestamps, as
+        written in the report: naive local time)
+
+
+    Example
+    --------
+    ```
+    >>> tamis_index.build_tceq_index(filepath)
+    ┌─────────┬──────────────┬─────┬────────┬────────┬────────┬──────┬─────────────────────┬─────────────────────┐
+    │ Site ID ┆ Parameter Cd ┆ POC ┆ Dur Cd ┆ Offset ┆ Length ┆ Rows ┆ Start               ┆ End                 │
+    ╞═════════╪══════════════╪═════╪════════╪════════╪════════╪══════╪═════════════════════╪═════════════════════╡
+    │ 1070    ┆ 43202        ┆ 01  ┆ 1      ┆ 886    ┆ 20179  ┆ 273  ┆ 2025-04-07 00:00:00 ┆ 2025-04-21 23:00:00 │
+    │ …       ┆ …            ┆ …   ┆ …      ┆ …      ┆ …      ┆ …    ┆ …                   ┆ …                   │
+    ```
+    """
+
+    filepath = Path(filepath).expanduser()
+    if not tamis_io.is_plain_file(filepath):
+        raise ValueError(
+            f"Only uncompressed reports on disk can be indexed, not {filepath}"
+        )
+    if preamble is None:
+        preamble = ttp.read_tceq_preamble(filepath)
+
+    data_offset = _data_offset(filepath, preamble)
+    schema = ttp.aqs_rd_schema()
+    positions = {
+        column: preamble.column_names.index(column)
+        for column in [*BLOCK_KEY_COLUMNS, "Date", "Time"]
+    }
+    key_fields = _field_span(positions, BLOCK_KEY_COLUMNS)
+    time_fields = _field_span(positions, ["Date", "Time"])
+
+    with tamis_instrument.stage("build index") as stage:
+        # Lines are read whole (reports never hold the unit separator), so the length of each in bytes is known.
+        # polars drops line endings, including the carriage return of CRLF reports.
+        newline = 2 if _ends_with_crlf(filepath, preamble) else 1
+        lines = pl.read_csv(
+            filepath,
+            has_header=False,
+            separator="\x1f",
+            quote_char=None,
+            skip_rows=preamble.header_row_number + 1,
+            schema={"Line": pl.String},
+        )
+
+        # Only the text of the key fields and of "Date" and "Time" is cut out of each line. Fields are decoded for
+        # the first record of each block only, and "YYYYMMDD<delimiter>HH:MM" text sorts chronologically.
+        spans = pl.col("Line").str.extract_groups(
+            _span_pattern(preamble.delimiter, [key_fields, time_fields])
+        )
+        blocks = (
+            lines.select(
+                spans.struct.field("1").alias("_key"),
+                spans.struct.field("2").alias("_time"),
+                (
+                    pl.col("Line").str.len_bytes().fill_null(0).cast(pl.Int64) + newline
+                ).alias("Length"),
+            )
+            .with_columns(
+                (data_offset + pl.col("Length").cum_sum() - pl.col("Length")).alias(
+                    "Offset"
+                )
+            )
+            .group_by(pl.col("_key").rle_id().alias("_block"), maintain_order=True)
+            .agg(
+                pl.col("_key").first(),
+                pl.col("Offset").first(),
+                pl.col("Length").sum(),
+                pl.len().cast(pl.UInt32).alias("Rows"),
+                pl.col("_time").min().alias("_start"),
+                pl.col("_time").max().alias("_end"),
+            )
+        )
+
+        key = pl.col("_key").str.split_exact(
+            preamble.delimiter, key_fields[1] - key_fields[0]
+        )
+        index = blocks.select(
+            *(
+                key.struct.field(f"field_{positions[column] - key_fields[0]}")
+                .cast(schema[column])
+                .alias(column)
+                for column in BLOCK_KEY_COLUMNS
+            ),
+            "Offset",
+            "Length",
+            "Rows",
+            *(
+                _span_datetime(
+                    blocks[f"_{bound.lower()}"],
+                    preamble.delimiter,
+                    positions,
+                    time_fields,
+                ).alias(bound)
+                for bound in ("Start", "End")
+            ),
+        )
+        stage.output(index)
+
+    # A line the reader does not see (e.g. a lone carriage return) would shift every offset after it
+    if data_offset + index["Length"].sum() != filepath.stat().st_size:
+        raise ValueError(
+            f"{filepath} has line endings that cannot be indexed: the lines do not add up to the file size"
+        )
+
+    if save:
+        # Write to a temporary file and rename so concurrent readers never see a partial index
+        sidecar = index_path(filepath)
+        tmp_sidecar = sidecar.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            index.write_ipc(tmp_sidecar)
+            os.replace(tmp_sidecar, sidecar)
+        except OSError:
+            # e.g. a read-only archive: the index is only used from memory, and rebuilt on the next read
+            with contextlib.suppress(OSError):
+                tmp_sidecar.unlink(missing_ok=True)
+
+    return index
+
+
+def _field_span(positions: dict, columns: list[str]) -> tuple[int, int]:
+    """First and last field positions covering columns"""
+    return (
+        min(positions[column] for column in columns),
+        max(positions[column] for column in columns),
+    )
+
+
+def _span_pattern(delimiter: str, spans: list[tuple[int, int]]) -> str:
+    """
+    Regex capturing the text of the fields first to last (delimiters included) of each (first, last) span of a
+    line as one group
+    """
+
+    # The delimiter as a hex escape, which is literal inside and outside character classes
+    delimiter = "".join(f"\\x{{{ord(character):X}}}" for character in delimiter)
+    firsts, lasts = {first for first, _ in spans}, {last for _, last in spans}
+
+    pattern = "^"
+    for position in range(max(lasts) + 1):
+        if position:
+            pattern += delimiter
+        if position in firsts:
+            pattern += "("
+        pattern += f"[^{delimiter}]*"
+        if position in lasts:
+            pattern += ")"
+    return pattern
+
+
+def _span_datetime(
+    span: pl.Series, delimiter: str, positions: dict, time_fields: tuple[int, int]
+) -> pl.Series:
+    """Naive Datetime from "Date" and "Time" span text (see `_span_pattern`)"""
+
+    fields = span.str.split_exact(delimiter, time_fields[1] - time_fields[0])
+    times = pl.DataFrame(
+        {
+            "Date": fields.struct.field(
+                f"field_{positions['Date'] - time_fields[0]}"
+            ).cast(pl.Int32),
+            "Time": fields.struct.field(f"field_{positions['Time'] - time_fields[0]}"),
+        }
+    )
+    return ttp.polars_convert_date_and_time_columns_to_datetime(times)["Datetime"]
+
+
+def _ends_with_crlf(filepath: Path, preamble: ttp.TCEQReportPreamble) -> bool:
+    with open(filepath, "rb") as report:
+        report.seek(preamble.header_offset)
+        return report.readline().endswith(b"\r\n")
+
+
+def load_tceq_index(
+    filepath: str | Path,
+    preamble: ttp.TCEQReportPreamble = None,
+    build: bool = True,
+) -> pl.DataFrame | None:
+    """
+    Loads the sidecar index of a report. An index older than the report, or not covering all of it (e.g. after
+    new records were appended), is rebuilt.
+
+    Parameters
+    -----------
+    filepath: str | Path
+        filepath to an uncompressed TAMIS report
+
+    preamble: TCEQReportPreamble
+        See `build_tceq_index`
+
+    build: bool
+        Build (and save) the index if it is missing or out of date.
+        Default: True
+
+
+    Returns
+    ---------
+    pl.DataFrame | None
+        The index (see `build_tceq_index`), or None if there is no up-to-date index and build is False
+    """
+
+    filepath = Path(filepath).expanduser()
+    sidecar = index_path(filepath)
+    try:
+        if sidecar.stat().st_mtime >= filepath.stat().st_mtime:
+            index = pl.read_ipc(sidecar)
+            if index.select(
+                pl.col("Offset").last() + pl.col("Length").last()
+            ).item() == (filepath.stat().st_size):
+                return index
+    except FileNotFoundError:
+        pass
+
+    if not build:
+        return None
+    return build_tceq_index(filepath, preamble=preamble)
+
+
+def report_time(value: datetime, tzone_in: str, tzone_out: str) -> pl.Expr:
+    """
+    A bound on the Datetime column of records read with tzone_in and tzone_out (naive bounds are in its timezone,
+    as in `filter_tceq`), as naive report time: the time written in the report, as in the "Start" and "End"
+    columns of an index or a catalog (see `tamis_catalog`)
+    """
+
+    bound = pl.lit(value)
+    aware = getattr(value, "tzinfo", None) is not None
+    if tzone_in is None:
+        return bound.dt.replace_time_zone(None) if aware else bound
+
+    column_zone = tzone_in if tzone_out is None else tzone_out
+    if aware:
+        bound = bound.dt.convert_time_zone(column_zone)
+    else:
+        bound = bound.dt.replace_time_zone(column_zone)
+    return bound.dt.convert_time_zone(tzone_in).dt.replace_time_zone(None)
+
+
+def select_blocks(
+    index: pl.DataFrame,
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+) -> pl.DataFrame:
+    """
+    Blocks of an index that can hold records matching the filters of `filter_tceq`: blocks of the requested codes
+    whose time span overlaps [start, end). tzone_in and tzone_out are those the records will be read with, so
+    naive bounds are read the same way as by `filter_tceq`.
+    """
+
+    blocks = ttp.filter_tceq(
+        index, parameter_codes=parameter_codes, site_ids=site_ids, pocs=pocs
+    )
+    if start is not None:
+        blocks = blocks.filter(pl.col("End") >= report_time(start, tzone_in, tzone_out))
+    if end is not None:
+        blocks = blocks.filter(pl.col("Start") < report_time(end, tzone_in, tzone_out))
+    return blocks
+
+
+def read_blocks(
+    filepath: str | Path,
+    blocks: pl.DataFrame,
+    preamble: ttp.TCEQReportPreamble = None,
+) -> bytes:
+    """
+    The preamble and column headers of a report followed by only the records in blocks, read by seeking to each
+    block. Adjacent blocks are read together. The result reads like a report, e.g. with `scan_tceq`.
+    """
+
+    filepath = Path(filepath).expanduser()
+    if preamble is None:
+        preamble = ttp.read_tceq_preamble(filepath)
+
+    ranges = []
+    for offset, length in blocks.sort("Offset").select("Offset", "Length").iter_rows():
+        if ranges and ranges[-1][0] + ranges[-1][1] == offset:
+            ranges[-1][1] += length
+        else:
+            ranges.append([offset, length])
+
+    with open(filepath, "rb") as report:
+        parts = [report.read(_data_offset(filepath, preamble))]
+        for offset, length in ranges:
+            report.seek(offset)
+            parts.append(report.read(length))
+
+    return b"".join(parts)
+
+
+def indexed_report(
+    filepath: str | Path,
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    preamble: ttp.TCEQReportPreamble = None,
+) -> Path | bytes:
+    """
+    A report cut down to the blocks that can hold records matching the filters, using (and, if needed, building)
+    its sidecar index. This is what `read_tceq_to_pl_dataframe(use_index=True)` parses.
+
+    Parameters
+    -----------
+    filepath: str | Path
+        filepath to a TAMIS report
+
+    parameter_codes, site_ids, pocs, start, end, tzone_in, tzone_out:
+        See `read_tceq_to_pl_dataframe`
+
+
+    Returns
+    ---------
+    Path | bytes
+        The matching blocks with the report's preamble (see `read_blocks`), or filepath itself if the report
+        cannot be indexed (compressed, archived, or in memory) or every block matches
+
+
+    Example
+    --------
+    ```
+    >>> report = tamis_index.indexed_report(filepath, parameter_codes=[43202, 61103, 61104])
+    >>> df = ttp.format_tceq_data(ttp.scan_tceq(report).filter(pl.col("Parameter Cd").is_in([43202, 61103, 61104])))
+    ```
+
+    The records are filtered at block level only, so filter the parsed records again (as
+    `read_tceq_to_pl_dataframe` does) when the time span of a block reaches past start or end.
+    """
+
+    if not tamis_io.is_plain_file(filepath):
+        return filepath
+    if preamble is None:
+        preamble = ttp.read_tceq_preamble(filepath)
+
+    with tamis_instrument.stage("index lookup") as stage:
+        index = load_tceq_index(filepath, preamble=preamble)
+        blocks = stage.output(
+            select_blocks(
+                index,
+                parameter_codes=parameter_codes,
+                site_ids=site_ids,
+                pocs=pocs,
+                start=start,
+                end=end,
+                tzone_in=tzone_in,
+                tzone_out=tzone_out,
+            )
+        )
+    if blocks.height == index.height:
+        return filepath
+
+    with tamis_instrument.stage("read blocks"):
+        return read_blocks(filepath, blocks, preamble=preamble)
@@ -0,0 +1,299 @@
+# %%
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable, Iterator
+import tamis_lazy
+
+pl = tamis_lazy.lazy_import("polars")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Observers called with a StageEvent at the end of every instrumented stage. Stages are only timed while
+# there is at least one observer.
+_observers = []
+_observers_lock = threading.Lock()
+
+# Report being processed, attached to the events of the stages it runs
+_current_file = ContextVar("tamis_current_file", default=None)
+
+logger = logging.getLogger("tamis.stages")
+
+
+@dataclass(frozen=True)
+class StageEvent:
+    """
+    Timing and size of one processing stage (e.g. "read_csv" or "pivot") of one report.
+
+    Row counts are None for lazy frames, whose rows are not known until they are collected. RSS values are
+    None on platforms without /proc/self/statm.
+    """
+
+    stage: str
+    filepath: str | None
+    seconds: float
+    rows_in: int | None
+    columns_in: int | None
+    rows_out: int | None
+    columns_out: int | None
+    rss_delta: int | None
+    rss: int | None
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes (Linux only, None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return None
+
+
+def _shape(df) -> tuple:
+    if isinstance(df, pl.DataFrame):
+        return df.height, df.width
+    if isinstance(df, pl.LazyFrame):
+        return None, len(df.collect_schema())
+    return None, None
+
+
+class _Stage:
+    __slots__ = (
+        "name",
+        "rows_in",
+        "columns_in",
+        "rows_out",
+        "columns_out",
+        "_start",
+        "_rss",
+    )
+
+    def __init__(self, name: str, df_in):
+        self.name = name
+        self.rows_in, self.columns_in = _shape(df_in)
+        self.rows_out = self.columns_out = None
+
+    def output(self, df):
+        """Records the shape of the stage's output and returns it unchanged"""
+        self.rows_out, self.columns_out = _shape(df)
+        return df
+
+    def __enter__(self):
+        self._rss = current_rss()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            return
+        rss = current_rss()
+        filepath = _current_file.get()
+        event = StageEvent(
+            stage=self.name,
+            filepath=None if filepath is None else str(filepath),
+            seconds=seconds,
+            rows_in=self.rows_in,
+            columns_in=self.columns_in,
+            rows_out=self.rows_out,
+            columns_out=self.columns_out,
+            rss_delta=None if rss is None else rss - self._rss,
+            rss=rss,
+        )
+        for observer in tuple(_observers):
+            observer(event)
+
+
+class _NullStage:
+    """Stand-in for _Stage while instrumentation is disabled, so disabled stages cost one function call"""
+
+    __slots__ = ()
+
+    def output(self, df):
+        return df
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enabled() -> bool:
+    """Whether any observer is registered"""
+    return bool(_observers)
+
+
+def stage(name: str, df_in=None) -> _Stage | _NullStage:
+    """
+    Context manager that times a processing stage and reports it to the registered observers. Call
+    `.output(df)` on it to record the shape of the stage's output. Does nothing if no observer is registered.
+
+    ```
+    >>> with tamis_instrument.stage("read_csv") as s:
+    ...     df = s.output(pl.read_csv(report))
+    ```
+    """
+
+    if not _observers:
+        return _NULL_STAGE
+    return _Stage(name, df_in)
+
+
+@contextmanager
+def report(filepath: str | Path) -> Iterator[None]:
+    """Attaches filepath to the events of the stages run inside the context"""
+
+    if not _observers:
+        yield
+        return
+    token = _current_file.set(filepath)
+    try:
+        yield
+    finally:
+        _current_file.reset(token)
+
+
+def add_observer(
+    callback: Callable[[StageEvent], None],
+) -> Callable[[StageEvent], None]:
+    """Registers callback to be called with a StageEvent at the end of every stage. Returns callback."""
+    with _observers_lock:
+        _observers.append(callback)
+    return callback
+
+
+def remove_observer(callback: Callable[[StageEvent], None]) -> None:
+    with _observers_lock:
+        _observers.remove(callback)
+
+
+@contextmanager
+def observe(callback: Callable[[StageEvent], None]) -> Iterator[Callable]:
+    """Registers callback for the duration of the context"""
+
+    add_observer(callback)
+    try:
+        yield callback
+    finally:
+        remove_observer(callback)
+
+
+def _log_event(event: StageEvent, level: int = logging.INFO) -> None:
+    logger.log(
+        level,
+        "%s: %.4f s, rows %s -> %s, columns %s -> %s, RSS %+.1f MB%s",
+        event.stage,
+        event.seconds,
+        event.rows_in,
+        event.rows_out,
+        event.columns_in,
+        event.columns_out,
+        (event.rss_delta or 0) / 1024**2,
+        "" if event.filepath is None else f" ({Path(event.filepath).name})",
+    )
+
+
+@contextmanager
+def log_stages(level: int = logging.INFO) -> Iterator[None]:
+    """
+    Logs every stage to the "tamis.stages" logger for the duration of the context.
+
+    ```
+    >>> logging.basicConfig(level=logging.INFO)
+    >>> with tamis_instrument.log_stages():
+    ...     df = ttp.read_tceq_to_pl_dataframe(filepath)
+    INFO:tamis.stages:preamble scan: 0.0002 s, rows None -> None, columns None -> None, RSS +0.0 MB (report.txt)
+    INFO:tamis.stages:unique series: 0.0048 s, rows None -> 48, columns 29 -> 4, RSS +5.2 MB (report.txt)
+    ...
+    ```
+    """
+
+    with observe(lambda event: _log_event(event, level)):
+        yield
+
+
+class StageSummary:
+    """Events collected by `collect_stages`"""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event: StageEvent) -> None:
+        with self._lock:
+            self.events.append(event)
+
+    def to_frame(self) -> pl.DataFrame:
+        """One row per stage run"""
+        return pl.DataFrame(
+            [
+                {field.name: getattr(event, field.name) for field in fields(StageEvent)}
+                for event in self.events
+            ],
+            schema={
+                "stage": pl.String,
+                "filepath": pl.String,
+                "seconds": pl.Float64,
+                "rows_in": pl.Int64,
+                "columns_in": pl.Int64,
+                "rows_out": pl.Int64,
+                "columns_out": pl.Int64,
+                "rss_delta": pl.Int64,
+                "rss": pl.Int64,
+            },
+        )
+
+    def summary(self) -> pl.DataFrame:
+        """One row per stage, in the order stages first ran, totalled over every run and report"""
+        return (
+            self.to_frame()
+            .group_by("stage", maintain_order=True)
+            .agg(
+                pl.len().alias("calls"),
+                pl.col("filepath").drop_nulls().n_unique().alias("files"),
+                pl.col("seconds").sum().alias("total_seconds"),
+                pl.col("seconds").mean().alias("mean_seconds"),
+                pl.col("seconds").max().alias("max_seconds"),
+                pl.col("rows_in").sum().alias("rows_in"),
+                pl.col("rows_out").sum().alias("rows_out"),
+                (pl.col("rss_delta").max() / 1024**2).alias("max_rss_delta_mb"),
+            )
+            .with_columns(
+                (pl.col("total_seconds") / pl.col("total_seconds").sum()).alias("share")
+            )
+        )
+
+    def __str__(self) -> str:
+        with pl.Config(tbl_rows=-1, tbl_cols=-1, float_precision=4):
+            return str(self.summary())
+
+
+@contextmanager
+def collect_stages() -> Iterator[StageSummary]:
+    """
+    Collects the stages of everything run inside the context, e.g. a nightly run over many reports,
+    into a StageSummary.
+
+    ```
+    >>> with tamis_instrument.collect_stages() as stages:
+    ...     for filepath in filepaths:
+    ...         ttp.read_tceq_to_pl_dataframe(filepath)
+    >>> print(stages)                  # totals per stage
+    >>> stages.to_frame()              # one row per stage of each report
+    ```
+    """
+
+    summary = StageSummary()
+    with observe(summary):
+        yield summary
@@ -0,0 +1,266 @@
+# %%
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+# Leading bytes of compressed and archived reports
+_MAGIC_NUMBERS = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+    b"\x28\xb5\x2f\xfd": "zstd",
+    b"PK\x03\x04": "zip",
+}
+_MAGIC_SIZE = max(len(magic) for magic in _MAGIC_NUMBERS)
+
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+
+# Files picked up when a directory of reports is read
+REPORT_PATTERNS = (
+    "*.txt",
+    *(f"*.txt{suffix}" for suffix in COMPRESSED_SUFFIXES),
+    "*.zip",
+)
+
+
+class _PrefixedReader(io.RawIOBase):
+    """Raw stream returning prefix, then the rest of stream. Closing it leaves stream open."""
+
+    def __init__(self, prefix: bytes, stream: BinaryIO):
+        self._prefix = memoryview(prefix)
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def readall(self) -> bytes:
+        prefix, self._prefix = self._prefix, memoryview(b"")
+        return bytes(prefix) + self._stream.read()
+
+
+def split_zip_member(path: str | Path) -> tuple[Path, str] | None:
+    """
+    Splits a path into a zip archive inside a path, e.g. "bundle.zip/2025_site_48.txt" ->
+    (Path("bundle.zip"), "2025_site_48.txt"). Returns None if path does not point into a zip archive.
+    """
+
+    path = Path(path)
+    if path.exists():
+        return None
+    for archive in path.parents:
+        if archive.suffix.lower() == ".zip" and archive.is_file():
+            return archive, path.relative_to(archive).as_posix()
+    return None
+
+
+def zip_members(archive: str | Path) -> list[Path]:
+    """Paths ("bundle.zip/<member>") of the files in a zip archive, in archive order"""
+
+    with zipfile.ZipFile(archive) as bundle:
+        return [
+            Path(archive) / name for name in bundle.namelist() if not name.endswith("/")
+        ]
+
+
+def source_path(source) -> Path | None:
+    """The file on disk holding a report (the archive for zip members), or None for in-memory reports"""
+
+    if not isinstance(source, (str, Path)):
+        return None
+    member = split_zip_member(source)
+    return Path(source) if member is None else member[0]
+
+
+def source_name(source) -> str:
+    """Name of a report for messages and instrumentation"""
+
+    if isinstance(source, (str, Path)):
+        return str(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)} bytes>"
+    return str(getattr(source, "name", "<stream>"))
+
+
+def output_path(source, suffix: str) -> Path:
+    """
+    Path of a file named after a report with suffix, next to the report (or its zip archive),
+    e.g. "2025_site_48.txt.gz" -> "2025_site_48.parquet"
+    """
+
+    on_disk = source_path(source)
+    if on_disk is None:
+        raise ValueError(
+            f"{source_name(source)} is not a file on disk: there is no path to save next to"
+        )
+    name = Path(source).name
+    for compressed_suffix in COMPRESSED_SUFFIXES:
+        if name.lower().endswith(compressed_suffix):
+            name = name[: -len(compressed_suffix)]
+            break
+    return on_disk.parent / Path(name).with_suffix(suffix).name
+
+
+def _peek(stream: BinaryIO, size: int) -> tuple[bytes, BinaryIO]:
+    """The first size bytes of stream without consuming them, and the stream to read from afterwards"""
+
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size], stream
+    if stream.seekable():
+        head = stream.read(size)
+        stream.seek(-len(head), io.SEEK_CUR)
+        return head, stream
+    head = stream.read(size)
+    return head, io.BufferedReader(_PrefixedReader(head, stream))
+
+
+def _open_zstd(stream: BinaryIO) -> BinaryIO:
+    try:
+        # Python 3.14+
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "Reading zstd-compressed reports needs the zstandard package: "
+                "pip install tceq_tamis_processor[zstd]"
+            ) from None
+        return io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(
+                stream, read_across_frames=True, closefd=False
+            )
+        )
+    return zstd.ZstdFile(stream)
+
+
+def compression(stream: BinaryIO) -> tuple[str | None, BinaryIO]:
+    """
+    Detects the compression of a binary stream from its leading bytes. Returns "gzip", "bz2", "xz", "zstd",
+    "zip", or None (plain text), and the stream to read from afterwards.
+    """
+
+    head, stream = _peek(stream, _MAGIC_SIZE)
+    for magic, kind in _MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return kind, stream
+    return None, stream
+
+
+def _decompressed(stream: BinaryIO, name: str, stack: ExitStack) -> BinaryIO:
+    kind, stream = compression(stream)
+    if kind is None:
+        return stream
+    if kind == "gzip":
+        return stack.enter_context(gzip.GzipFile(fileobj=stream, mode="rb"))
+    if kind == "bz2":
+        return stack.enter_context(bz2.BZ2File(stream))
+    if kind == "xz":
+        return stack.enter_context(lzma.LZMAFile(stream))
+    if kind == "zstd":
+        return stack.enter_context(_open_zstd(stream))
+
+    # zip archives are read from their central directory at the end, so they need a seekable stream
+    if not stream.seekable():
+        stream = io.BytesIO(stream.read())
+    archive = stack.enter_context(zipfile.ZipFile(stream))
+    members = [member for member in archive.namelist() if not member.endswith("/")]
+    if len(members) != 1:
+        raise ValueError(
+            f"{name} holds {len(members)} files {members[:5]}; "
+            f"read one with the path {name}/<member> (see `tamis_io.zip_members`)"
+        )
+    return _decompressed(
+        stack.enter_context(archive.open(members[0])),
+        f"{name}/{members[0]}",
+        stack,
+    )
+
+
+@contextmanager
+def open_report(source: str | Path | bytes | BinaryIO) -> Iterator[BinaryIO]:
+    """
+    Opens a TAMIS report for binary reading, decompressing it on the fly.
+
+    Parameters
+    -----------
+    source: str | Path | bytes | BinaryIO
+        - filepath of a plain, gzip (.gz), bzip2 (.bz2), xz (.xz), or zstd (.zst) report, or of a zip archive
+          holding a single report. The compression is detected from the file contents, not the name.
+        - path to a report inside a zip archive, e.g. "bundle.zip/2025_site_48.txt"
+        - the (possibly compressed) report contents as bytes
+        - a binary file-like object (e.g. an HTTP response); it is read from its current position
+          and is not closed
+
+
+    Returns
+    ---------
+    BinaryIO
+        The decompressed report. Decompression is streamed: nothing is written to disk, and only what is read is
+        held in memory.
+
+
+    Example
+    --------
+    ```
+    >>> with tamis_io.open_report("archive/2025_site_48.txt.zst") as report:
+    ...     report.readline()
+    b'AQS Raw Data (RD) Transaction Report, Version 1.6, 3/11/2011\\n'
+    ```
+    """
+
+    with ExitStack() as stack:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            stream = io.BytesIO(source)
+        elif isinstance(source, (str, Path)):
+            path = Path(source).expanduser()
+            member = split_zip_member(path)
+            if member is None:
+                stream = stack.enter_context(open(path, "rb"))
+            else:
+                archive = stack.enter_context(zipfile.ZipFile(member[0]))
+                stream = stack.enter_context(archive.open(member[1]))
+        else:
+            stream = source
+        yield _decompressed(stream, source_name(source), stack)
+
+
+def is_plain_file(source) -> bool:
+    """Whether source is the filepath of an uncompressed report, which can be scanned by path"""
+
+    if not isinstance(source, (str, Path)) or not Path(source).expanduser().is_file():
+        return False
+    with open(Path(source).expanduser(), "rb") as report:
+        return compression(report)[0] is None
+
+
+def resume_at(report: BinaryIO, consumed: bytes, offset: int) -> BinaryIO:
+    """
+    Positions a report stream at byte offset, after the bytes in consumed were read from the start of it.
+    Plain files and in-memory reports are seeked. Other streams replay the rest of consumed before the rest of
+    the stream: seeking back in a decompressing stream decompresses again from the start, or fails if the
+    compressed stream cannot seek.
+    """
+
+    if isinstance(report, io.BytesIO) or isinstance(
+        getattr(report, "raw", None), io.FileIO
+    ):
+        report.seek(offset - len(consumed), io.SEEK_CUR)
+        return report
+    return io.BufferedReader(_PrefixedReader(consumed[offset:], report))
@@ -0,0 +1,32 @@
+# %%
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns module `name` without executing it until one of its attributes is first used, so that heavy
+    dependencies (polars takes ~0.25 s to import) are only loaded by code paths that need them.
+
+    If the module is already imported, it is returned as is.
+
+    ```
+    >>> pl = lazy_import("polars")     # nothing imported yet
+    >>> pl.DataFrame({"a": [1]})       # polars is imported here
+    ```
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,178 @@
+# %%
+from __future__ import annotations
+
+import functools
+import operator
+import tamis_lazy
+
+pl = tamis_lazy.lazy_import("polars")
+
+QUALIFIER_COLUMNS = [f"Qual Cd {number}" for number in range(1, 11)]
+
+QUALIFIER_MASK_COLUMN = "Qual Mask"
+
+# AQS exceptional event flags: "R" codes request exclusion of the value as an exceptional event, "I" codes only
+# inform that the value was affected by an event. Both use the same letter for an event (e.g. "RT"/"IT"
+# wildfire, "RJ"/"IJ" high winds); only the letters AQS assigns get a bit.
+REQUEST_EXCLUSION_CODES = [f"R{letter}" for letter in "ABCDEFGHIJKLMNOPQRSTU"]
+INFORMATIONAL_CODES = [f"I{letter}" for letter in "ABCDEFGHIJKLMNOPQRST"]
+EXCEPTIONAL_EVENT_CODES = REQUEST_EXCLUSION_CODES + INFORMATIONAL_CODES
+
+# AQS quality assurance qualifiers (e.g. "1" deviation from a CFR/critical criteria requirement, "5" outlier,
+# "9" negative value detected, zero reported). AQS assigns no "8".
+QA_CODES = ["1", "2", "3", "4", "5", "6", "7", "9"]
+
+# Other AQS qualifiers QA workflows filter on most: detection limits ("MD" below the MDL, "ND" not detected,
+# "SQ" between the MDL and the sample quantitation limit), lab estimates ("LJ", "LK" biased high, "LL" biased
+# low), "QX" failed QC criteria, "V" validated value, and sampler out of spec ("W" flow rate, "X" filter
+# temperature, "Y" elapsed time)
+DATA_QUALITY_CODES = ["MD", "ND", "SQ", "LJ", "LK", "LL", "QX", "V", "W", "X", "Y"]
+
+# Bit of every known qualifier code in the mask (bits 0-59). Bits are part of the stored format: only ever
+# add codes in the free bits 60-62, never reorder them.
+QUALIFIER_BITS = {
+    code: bit
+    for bit, code in enumerate(
+        REQUEST_EXCLUSION_CODES + INFORMATIONAL_CODES + QA_CODES + DATA_QUALITY_CODES
+    )
+}
+
+# "Null Data Cd" is not folded into the mask: a record has at most one null data code, which explains why it
+# has no value rather than qualifying one, and it stays a categorical column of its own.
+
+# Set for any code not in QUALIFIER_BITS
+OTHER_QUALIFIER_BIT = 63
+
+
+def qualifier_codes() -> pl.DataFrame:
+    """
+    Lookup table of the qualifier codes with their own bit in the qualifier mask.
+    Codes that are not in the table all set OTHER_QUALIFIER_BIT.
+    """
+
+    qualifier_types = (
+        ["Request Exclusion"] * len(REQUEST_EXCLUSION_CODES)
+        + ["Informational"] * len(INFORMATIONAL_CODES)
+        + ["Quality Assurance"] * len(QA_CODES)
+        + ["Data Quality"] * len(DATA_QUALITY_CODES)
+    )
+    return pl.DataFrame(
+        {
+            "Qual Cd": list(QUALIFIER_BITS),
+            "Bit": list(QUALIFIER_BITS.values()),
+            "Qualifier Type": qualifier_types,
+        },
+        schema={"Qual Cd": pl.String, "Bit": pl.UInt8, "Qualifier Type": pl.String},
+    )
+
+
+def qualifier_mask(codes: str | list[str]) -> int:
+    """
+    Mask with the bits of codes set. Raises a ValueError for codes without their own bit, since they
+    would match every unknown code.
+    """
+
+    if isinstance(codes, str):
+        codes = [codes]
+    unknown = [code for code in codes if code not in QUALIFIER_BITS]
+    if unknown:
+        raise ValueError(
+            f"No qualifier bit for {unknown}. Unknown codes all set bit {OTHER_QUALIFIER_BIT}"
+            " (see `has_unknown_qualifier`)."
+        )
+    return functools.reduce(
+        operator.or_, (1 << QUALIFIER_BITS[code] for code in codes), 0
+    )
+
+
+def qualifier_mask_expr(columns: list[str] = QUALIFIER_COLUMNS) -> pl.Expr:
+    """
+    UInt64 expression folding the qualifier code columns into one bitmask (0 when a record has no qualifiers)
+    """
+
+    bits = {code: 1 << bit for code, bit in QUALIFIER_BITS.items()}
+    return functools.reduce(
+        operator.or_,
+        (
+            pl.when(pl.col(column).is_null())
+            .then(pl.lit(0, dtype=pl.UInt64))
+            .otherwise(
+                pl.col(column)
+                .cast(pl.String)
+                .replace_strict(
+                    bits, default=1 << OTHER_QUALIFIER_BIT, return_dtype=pl.UInt64
+                )
+            )
+            for column in columns
+        ),
+    ).alias(QUALIFIER_MASK_COLUMN)
+
+
+def fold_qualifiers(df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Replaces the "Qual Cd 1" ... "Qual Cd 10" columns of raw TAMIS records with a single UInt64 "Qual Mask"
+    column. Ten categorical columns take 40 bytes per record; the mask takes 8.
+
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Raw TAMIS records with any of the qualifier code columns
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        Records of the same type as df, with "Qual Mask" in place of the qualifier code columns
+
+
+    Example
+    --------
+    ```
+    >>> df = tamis_qualifiers.fold_qualifiers(ttp.read_and_extract_tceq_data_to_unformatted_df(filepath))
+    >>> df.filter(~tamis_qualifiers.has_any_qualifier(tamis_qualifiers.EXCEPTIONAL_EVENT_CODES))
+    ```
+    """
+
+    columns = [
+        column for column in QUALIFIER_COLUMNS if column in df.collect_schema().names()
+    ]
+    if not columns:
+        return df.with_columns(pl.lit(0, dtype=pl.UInt64).alias(QUALIFIER_MASK_COLUMN))
+    return df.with_columns(qualifier_mask_expr(columns)).drop(columns)
+
+
+def has_any_qualifier(
+    codes: str | list[str], column: str = QUALIFIER_MASK_COLUMN
+) -> pl.Expr:
+    """Boolean expression: the record has at least one of codes"""
+    return (pl.col(column) & qualifier_mask(codes)) != 0
+
+
+def has_all_qualifiers(
+    codes: str | list[str], column: str = QUALIFIER_MASK_COLUMN
+) -> pl.Expr:
+    """Boolean expression: the record has every one of codes"""
+    mask = qualifier_mask(codes)
+    return (pl.col(column) & mask) == mask
+
+
+def has_unknown_qualifier(column: str = QUALIFIER_MASK_COLUMN) -> pl.Expr:
+    """Boolean expression: the record has a code without its own bit"""
+    return (pl.col(column) & (1 << OTHER_QUALIFIER_BIT)) != 0
+
+
+def decode_qualifiers(column: str = QUALIFIER_MASK_COLUMN) -> pl.Expr:
+    """
+    List of the known codes set in the mask (in bit order), e.g. for display. Unknown codes are listed as "?".
+    """
+
+    labels = {**QUALIFIER_BITS, "?": OTHER_QUALIFIER_BIT}
+    return (
+        pl.concat_list(
+            pl.when((pl.col(column) & (1 << bit)) != 0).then(pl.lit(code))
+            for code, bit in labels.items()
+        )
+        .list.drop_nulls()
+        .alias(column)
+    )
@@ -0,0 +1,414 @@
+# %%
+from __future__ import annotations
+
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+import tamis_lazy
+import tamis_instrument
+import tamis_units
+import tceq_tamis_processor as ttp
+
+pl = tamis_lazy.lazy_import("polars")
+
+DEFAULT_PARTITION_BY = ("Site ID", "Year", "Month")
+
+# Small row groups sorted by Datetime let readers skip most of a file for short datetime ranges,
+# using the min/max statistics written for every row group
+DEFAULT_ROW_GROUP_SIZE = 32_768
+
+# A record in a long-format store is identified by these columns. With normalized units, the unit is left out.
+STORE_KEY_COLUMNS = ["Site ID", "Parameter Cd", "POC", "Dur Cd", "Unit Cd", "Datetime"]
+
+PARQUET_COMPRESSION = "zstd"
+PARQUET_COMPRESSION_LEVEL = 6
+
+
+def record_key(normalize_units: bool | dict = False) -> list[str]:
+    """
+    Columns identifying a record. Without unit normalization, a record reported in two units is two records
+    (with one wide column each); with it, they are the same measurement.
+    """
+
+    if normalize_units:
+        return [column for column in STORE_KEY_COLUMNS if column != "Unit Cd"]
+    return list(STORE_KEY_COLUMNS)
+
+
+def add_partition_columns(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Adds "Year" and "Month" columns derived from "Datetime" (in the timezone of the Datetime column).
+    """
+
+    return df.with_columns(
+        pl.col("Datetime").dt.year().alias("Year"),
+        pl.col("Datetime").dt.month().alias("Month"),
+    )
+
+
+def partition_path(root: str | Path, partition_by: tuple, keys: tuple) -> Path:
+    """
+    Hive-style partition directory: root/<column>=<value>/...
+    """
+
+    return Path(root).joinpath(
+        *(f"{column}={key}" for column, key in zip(partition_by, keys))
+    )
+
+
+def write_parquet_atomic(
+    df: pl.DataFrame, path: Path, row_group_size: int = None
+) -> Path:
+    """
+    Writes df to path with the dataset's compression and statistics settings. The file is written under a
+    temporary name and renamed into place, so readers never see a partially written file.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    df.write_parquet(
+        tmp_path,
+        compression=PARQUET_COMPRESSION,
+        compression_level=PARQUET_COMPRESSION_LEVEL,
+        statistics=True,
+        row_group_size=(
+            DEFAULT_ROW_GROUP_SIZE if row_group_size is None else row_group_size
+        ),
+    )
+    os.replace(tmp_path, path)
+    return path
+
+
+def write_tceq_dataset(
+    df: pl.DataFrame,
+    root: str | Path,
+    partition_by: tuple = DEFAULT_PARTITION_BY,
+    row_group_size: int = None,
+) -> list[Path]:
+    """
+    Appends processed TAMIS records to a hive-partitioned Parquet dataset.
+
+    Each call adds one new file to every partition it touches, named so that appends never overwrite
+    existing data. Files are written with zstd compression, sorted by "Datetime", in small row groups
+    with min/max statistics so datetime-range queries can skip row groups as well as partitions.
+
+
+    Parameters
+    -----------
+    df: pl.DataFrame
+        Processed TAMIS records in long (`format_tceq_long`) or wide (`read_tceq_to_pl_dataframe`) format.
+        Must have "Datetime" and "Site ID" columns.
+
+    root: str | Path
+        Root directory of the dataset. Created if it does not exist.
+
+    partition_by: tuple
+        Columns to partition by. "Year" and "Month" are derived from "Datetime" if not already present.
+        Default: ("Site ID", "Year", "Month")
+
+    row_group_size: int
+        Rows per Parquet row group.
+        Default: None (DEFAULT_ROW_GROUP_SIZE)
+
+
+    Returns
+    ---------
+    list[Path]
+        The files written, one per partition
+
+
+    Example
+    --------
+    ```
+    >>> df = ttp.read_tceq_to_pl_dataframe(filepath)
+    >>> tamis_store.write_tceq_dataset(df, "/data/tamis/dataset")
+    >>> lf = tamis_store.scan_tceq_dataset("/data/tamis/dataset")
+    >>> ttp.filter_tceq(lf, site_ids=1070, start=datetime(2025, 4, 10)).collect()
+    ```
+    """
+
+    if "Year" not in df.columns or "Month" not in df.columns:
+        df = add_partition_columns(df)
+
+    # One file name per append so concurrent or repeated appends never collide
+    file_name = f"part-{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.parquet"
+
+    written = []
+    sort_by = [
+        column for column in ("Datetime", "Parameter Cd") if column in df.columns
+    ]
+    with tamis_instrument.stage("write dataset", df):
+        for keys, partition in df.partition_by(
+            list(partition_by), as_dict=True, include_key=False
+        ).items():
+            written.append(
+                write_parquet_atomic(
+                    partition.sort(sort_by),
+                    partition_path(root, partition_by, keys) / file_name,
+                    row_group_size=row_group_size,
+                )
+            )
+
+    return written
+
+
+def scan_tceq_dataset(root: str | Path) -> pl.LazyFrame:
+    """
+    Lazily scans a dataset written by `write_tceq_dataset`. Filters on partition columns prune whole
+    directories and filters on "Datetime" skip row groups using their statistics.
+
+    Files with different columns (e.g. wide data for sites measuring different parameters) are combined,
+    with missing columns filled with nulls.
+    """
+
+    files = sorted(Path(root).rglob("*.parquet"))
+    if not files:
+        raise FileNotFoundError(f"No Parquet files found in {root}")
+
+    # Union of the file schemas (read from the Parquet footers only), in order of first appearance
+    schema = {}
+    for file in files:
+        for column, dtype in pl.read_parquet_schema(file).items():
+            schema.setdefault(column, dtype)
+
+    # Partition columns get the dtypes they had before they were written to directory names
+    # (e.g. Int32 "Site ID") rather than inferred ones
+    partition_dtypes = {
+        **ttp.aqs_rd_schema(),
+        "Year": pl.Int32,
+        "Month": pl.Int8,
+    }
+    partition_columns = [
+        part.split("=")[0]
+        for part in files[0].relative_to(root).parent.parts
+        if "=" in part
+    ]
+
+    return pl.scan_parquet(
+        files,
+        schema=schema,
+        hive_partitioning=True,
+        hive_schema={
+            column: partition_dtypes[column]
+            for column in partition_columns
+            if column in partition_dtypes
+        },
+        missing_columns="insert",
+    )
+
+
+def stored_partitions(
+    root: str | Path, partition_by: tuple, schema: dict
+) -> list[tuple]:
+    """
+    Keys of every partition directory in a dataset, cast to the dtypes in schema (column -> dtype)
+    """
+
+    root = Path(root)
+    keys = []
+    for directory in root.glob("/".join(f"{column}=*" for column in partition_by)):
+        values = [part.split("=", 1)[1] for part in directory.relative_to(root).parts]
+        keys.append(
+            tuple(
+                pl.Series([value]).cast(schema[column]).item()
+                for column, value in zip(partition_by, values)
+            )
+        )
+    return keys
+
+
+def _window_months(start: datetime, end: datetime) -> set:
+    """(Year, Month) of every month overlapping the window from start up to (not including) end"""
+
+    first = pl.Series([start]).dt.truncate("1mo").item()
+    months = pl.datetime_range(first, end, "1mo", closed="left", eager=True)
+    return set(zip(months.dt.year(), months.dt.month()))
+
+
+def _overlaps_window(keys: dict, sites: set, months: set) -> bool:
+    """If a partition may hold records of one of the sites inside the months of a window"""
+
+    if "Site ID" in keys and keys["Site ID"] not in sites:
+        return False
+    if "Year" in keys and "Month" in keys:
+        return (keys["Year"], keys["Month"]) in months
+    if "Year" in keys:
+        return keys["Year"] in {year for year, _ in months}
+    return True
+
+
+def update_store(
+    store: str | Path,
+    new_report: str | Path,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    replace_window: bool = False,
+    partition_by: tuple = DEFAULT_PARTITION_BY,
+    site_ids: int | list[int] = None,
+    parameter_codes: int | list[int] = None,
+    normalize_units: bool | dict = False,
+    **kwargs,
+) -> pl.DataFrame:
+    """
+    Upserts a newly downloaded TAMIS report into a long-format store (see `write_tceq_dataset` and
+    `tceq_tamis_processor.format_tceq_long`), rewriting only the partitions the report touches.
+
+    Records in the report replace stored records with the same site, parameter, POC, duration code, unit, and
+    datetime (e.g. values revised by late validation); all other stored records are kept. Partitions the
+    report does not touch (or, with replace_window, whose window it does not cover) are not read or rewritten.
+
+
+    Parameters
+    -----------
+    store: str | Path
+        Root directory of a long-format dataset. Created if it does not exist.
+
+    new_report: str | Path
+        filepath to the newly downloaded TAMIS report
+
+    tzone_in, tzone_out, **kwargs:
+        See `tceq_tamis_processor.read_tceq_to_pl_dataframe`. Should match the settings the store was built with.
+
+    replace_window: bool
+        Treat the report as the complete record of its sites and parameters inside its measurement window
+        ("Measurements reported from ... up to but not including ..."): stored records of those sites and
+        parameters inside the window that the report does not include are removed, in every partition
+        overlapping the window, including partitions and series the report has no records for. Use when the
+        report only includes valid data and values may have been invalidated since the last download.
+        Default: False
+
+    partition_by: tuple
+        Partition columns of the store.
+        Default: ("Site ID", "Year", "Month")
+
+    site_ids, parameter_codes: int | list[int]
+        Sites and parameters the report was downloaded for. Only their records are upserted, and with
+        replace_window only their stored records are removed from the window.
+        Default: None (the sites with records in the report, and every parameter)
+
+    normalize_units: bool | dict
+        Convert the report's values to one unit per unit type before the upsert (see
+        `tceq_tamis_processor.read_tceq_to_pl_dataframe`). Records are then matched regardless of their unit, so
+        use it only on stores built with the same setting.
+        Default: False
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        One row per rewritten partition with its keys and the number of stored rows before and after the update
+
+
+    Example
+    --------
+    ```
+    >>> tamis_store.update_store("/data/tamis/store", "/downloads/kc_autogc_week_42.txt")
+    shape: (1, 5)
+    ┌─────────┬──────┬───────┬─────────────┬────────────┐
+    │ Site ID ┆ Year ┆ Month ┆ Rows Before ┆ Rows After │
+    │ ---     ┆ ---  ┆ ---   ┆ ---         ┆ ---        │
+    │ i64     ┆ i64  ┆ i64   ┆ i64         ┆ i64        │
+    ╞═════════╪══════╪═══════╪═════════════╪════════════╡
+    │ 1070    ┆ 2025 ┆ 10    ┆ 31620       ┆ 34860      │
+    └─────────┴──────┴───────┴─────────────┴────────────┘
+    ```
+    """
+
+    preamble = ttp.read_tceq_preamble(new_report)
+    lf = ttp.scan_tceq(
+        new_report, tzone_in=tzone_in, tzone_out=tzone_out, preamble=preamble, **kwargs
+    )
+
+    # The measurement window is given in the report's local time, and compared in the timezone of the records
+    window = []
+    if preamble.measurements_from is not None and preamble.measurements_to is not None:
+        bounds = pl.Series([preamble.measurements_from, preamble.measurements_to])
+        time_zone = lf.collect_schema()["Datetime"].time_zone
+        if tzone_in is not None:
+            bounds = bounds.dt.replace_time_zone(tzone_in)
+            bounds = (
+                bounds.dt.replace_time_zone(None)
+                if time_zone is None
+                else bounds.dt.convert_time_zone(time_zone)
+            )
+        window = [
+            pl.col("Datetime").is_between(
+                pl.lit(bounds[0]), pl.lit(bounds[1]), closed="left"
+            )
+        ]
+        lf = lf.filter(*window)
+    lf = ttp.filter_tceq(lf, parameter_codes=parameter_codes, site_ids=site_ids)
+    if normalize_units:
+        lf = tamis_units.normalize_units(
+            lf, targets=None if normalize_units is True else normalize_units
+        )
+
+    df_new = add_partition_columns(ttp.format_tceq_long(lf).collect())
+    new_partitions = df_new.partition_by(list(partition_by), as_dict=True)
+    partitions = set(new_partitions)
+
+    stale = None
+    if replace_window and window:
+        # Every stored partition overlapping the window is checked, since a month or series invalidated in
+        # full has no records in the report
+        sites = (
+            set(df_new["Site ID"]) if site_ids is None else set(ttp._as_list(site_ids))
+        )
+        months = _window_months(bounds[0], bounds[1])
+        partitions |= {
+            keys
+            for keys in stored_partitions(store, partition_by, df_new.schema)
+            if _overlaps_window(dict(zip(partition_by, keys)), sites, months)
+        }
+        stale = window[0] & pl.col("Site ID").is_in(list(sites))
+        if parameter_codes is not None:
+            stale &= pl.col("Parameter Cd").is_in(ttp._as_list(parameter_codes))
+
+    summary = []
+    for keys in sorted(partitions):
+        partition_new = new_partitions.get(keys)
+        partition_dir = partition_path(store, partition_by, keys)
+        old_files = sorted(partition_dir.glob("*.parquet"))
+
+        frames = []
+        rows_before = 0
+        if old_files:
+            # Partition columns are stored in the directory names, not the files
+            partition_old = pl.read_parquet(old_files).with_columns(
+                pl.lit(key, dtype=df_new.schema[column]).alias(column)
+                for column, key in zip(partition_by, keys)
+            )
+            rows_before = partition_old.height
+            if stale is not None:
+                partition_old = partition_old.filter(~stale)
+            frames.append(partition_old)
+
+        if partition_new is None:
+            # Partitions the report has no records for are only rewritten if records were removed
+            if not frames or frames[0].height == rows_before:
+                continue
+        else:
+            # New records go last so they win when de-duplicating on the record key
+            frames.append(partition_new)
+
+        partition = pl.concat(frames, how="diagonal_relaxed").unique(
+            subset=record_key(normalize_units), keep="last", maintain_order=True
+        )
+        written = []
+        if not partition.is_empty():
+            written = write_tceq_dataset(partition, store, partition_by=partition_by)
+
+        # Only remove the old files once the rewritten partition is in place
+        for old_file in old_files:
+            if old_file not in written:
+                old_file.unlink()
+
+        summary.append(
+            dict(
+                zip(partition_by, keys),
+                **{"Rows Before": rows_before, "Rows After": partition.height},
+            )
+        )
+
+    return pl.DataFrame(summary)
@@ -0,0 +1,267 @@
+# %%
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterator
+import tamis_lazy
+import tceq_tamis_processor as ttp
+import tamis_io
+import tamis_store
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Default peak memory budget for streaming a report
+DEFAULT_MEMORY_BUDGET = 512 * 1024**2
+
+# Parsed, datetime-converted, and labelled records take several times the size of the text they came from.
+# Each batch reads memory_budget / _BUDGET_TO_BATCH_RATIO bytes of text.
+_BUDGET_TO_BATCH_RATIO = 8
+
+_MIN_BATCH_BYTES = 1024 * 1024
+
+# Labelled batches are buffered until they hold memory_budget / _BUDGET_TO_BUFFER_RATIO bytes, then written
+# together, so each partition gets one file per flush rather than one per batch
+_BUDGET_TO_BUFFER_RATIO = 4
+
+DEFAULT_PARTITION_BY = tamis_store.DEFAULT_PARTITION_BY
+
+
+def iter_tceq_batches(
+    filepath: str | Path | bytes | BinaryIO,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    batch_bytes: int = None,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+    **kwargs,
+) -> Iterator[pl.DataFrame]:
+    """
+    Reads a TAMIS report in batches of whole lines and yields labelled, long-format frames
+    (see `tceq_tamis_processor.format_tceq_long`), so reports larger than memory can be processed.
+
+    Parameters
+    -----------
+    filepath: str | Path | bytes | BinaryIO
+        filepath or Path (e.g. returned from pathlib.Path()) to TAMIS report to read. Compressed, archived, and
+        in-memory reports are read too, see `tamis_io.open_report`.
+
+    tzone_in: str
+        Timezone code for date and times being read in. TCEQ TAMIS data is presented in LST.
+        Default: Etc/GMT+6
+
+    tzone_out: str
+        Timezone code output data is converted to.
+        Default: Etc/GMT+6
+
+    memory_budget: int
+        Approximate peak memory, in bytes, used for each batch.
+        Default: DEFAULT_MEMORY_BUDGET (512 MB)
+
+    batch_bytes: int
+        Bytes of report text read per batch. Overrides the size derived from memory_budget.
+        Default: None
+
+    value_dtype, schema_overrides:
+        See `tceq_tamis_processor.read_and_extract_tceq_data_to_unformatted_df`
+
+    **kwargs: str
+        Additional arguments passed to tzone conversion.
+        See `tceq_tamis_processor.polars_convert_date_and_time_columns_to_datetime`.
+
+
+    Yields
+    ---------
+    pl.DataFrame
+        Labelled records in long format. Every batch has the same schema.
+
+
+    Example
+    --------
+    ```
+    >>> for batch in tamis_streaming.iter_tceq_batches(filepath, memory_budget=256 * 1024**2):
+    ...     totals.append(batch.group_by("Parameter Name").agg(pl.col("Value").sum()))
+    ```
+    """
+
+    if batch_bytes is None:
+        batch_bytes = max(memory_budget // _BUDGET_TO_BATCH_RATIO, _MIN_BATCH_BYTES)
+
+    reference_tables = ttp.get_reference_tables()
+
+    # Compressed reports are decompressed batch by batch as they are read
+    with tamis_io.open_report(filepath) as report:
+        preamble, raw = ttp.read_tceq_preamble_from_stream(
+            report, tamis_io.source_name(filepath)
+        )
+        schema = ttp.tceq_report_schema(preamble, value_dtype, schema_overrides)
+
+        report = tamis_io.resume_at(report, raw, preamble.header_offset)
+        header_line = report.readline()
+
+        while True:
+            chunk = report.read(batch_bytes)
+            if not chunk.strip():
+                break
+
+            # Finish the last (partial) line so every batch holds whole records
+            chunk += report.readline()
+
+            # The fixed schema keeps batches stackable (e.g. when qualifier codes first appear mid-report)
+            df = pl.read_csv(
+                header_line + chunk,
+                has_header=True,
+                separator=preamble.delimiter,
+                schema=schema,
+            )
+
+            df = ttp.polars_convert_date_and_time_columns_to_datetime(
+                df, tzone_in=tzone_in, tzone_out=tzone_out, **kwargs
+            )
+
+            yield ttp.format_tceq_long(df, reference_tables=reference_tables)
+
+
+def _append_long_batches(
+    filepath, out_dir, partition_by, tzone_in, tzone_out, memory_budget, **kwargs
+) -> set:
+    """Stream a report into a long-format dataset. Returns the partition keys written."""
+
+    def flush(buffered: list) -> None:
+        if buffered:
+            tamis_store.write_tceq_dataset(
+                pl.concat(buffered), out_dir, partition_by=partition_by
+            )
+            buffered.clear()
+
+    flush_bytes = memory_budget // _BUDGET_TO_BUFFER_RATIO
+    partition_keys = set()
+    buffered, buffered_bytes = [], 0
+    for batch in iter_tceq_batches(
+        filepath,
+        tzone_in=tzone_in,
+        tzone_out=tzone_out,
+        memory_budget=memory_budget,
+        **kwargs,
+    ):
+        batch = tamis_store.add_partition_columns(batch)
+        partition_keys |= set(batch.select(partition_by).unique().iter_rows())
+        buffered.append(batch)
+        buffered_bytes += batch.estimated_size()
+        if buffered_bytes >= flush_bytes:
+            flush(buffered)
+            buffered_bytes = 0
+    flush(buffered)
+
+    return partition_keys
+
+
+def convert_tceq_to_parquet(
+    filepath: str | Path,
+    out_dir: str | Path,
+    output: str = "long",
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    partition_by: tuple = DEFAULT_PARTITION_BY,
+    **kwargs,
+) -> Path:
+    """
+    Converts a TAMIS report to a hive-partitioned Parquet dataset in bounded memory.
+
+    The report is read in batches (see `iter_tceq_batches`). Batches are buffered until they fill a quarter of
+    memory_budget and then appended together to the partitions they touch (see `tamis_store.write_tceq_dataset`),
+    so peak memory stays near memory_budget regardless of the size of the report, and each partition is written
+    as a few large files rather than one small file per batch.
+
+
+    Parameters
+    -----------
+    filepath: str | Path
+        filepath or Path (e.g. returned from pathlib.Path()) to TAMIS report to convert
+
+    out_dir: str | Path
+        Directory the dataset is written to
+
+    output: str
+        Options: "long" or "wide"
+        "long" writes one row per measurement (see `tceq_tamis_processor.LONG_FORMAT_COLUMNS`).
+        "wide" writes the format returned by `read_tceq_to_pl_dataframe`. Wide partitions are pivoted one
+        at a time from the long batches, so each partition (by default one site-month) must fit in memory.
+        Default: "long"
+
+    tzone_in, tzone_out, memory_budget, **kwargs:
+        See `iter_tceq_batches`
+
+    partition_by: tuple
+        Columns to partition by. "Year" and "Month" are derived from "Datetime".
+        Default: ("Site ID", "Year", "Month")
+
+
+    Returns
+    ---------
+    Path
+        out_dir. Read it back with `tamis_store.scan_tceq_dataset(out_dir)`.
+
+
+    Example
+    --------
+    ```
+    >>> tamis_streaming.convert_tceq_to_parquet(filepath, "/data/tamis/statewide_2024", memory_budget=1024**3)
+    Processed file saved to: /data/tamis/statewide_2024
+    ```
+    """
+
+    if output not in ("long", "wide"):
+        raise ValueError(f'output must be "long" or "wide", not "{output}"')
+
+    out_dir = Path(out_dir)
+    if output == "long":
+        _append_long_batches(
+            filepath,
+            out_dir,
+            partition_by,
+            tzone_in,
+            tzone_out,
+            memory_budget,
+            **kwargs,
+        )
+
+    else:
+        # Long batches are staged next to out_dir, then pivoted one partition at a time
+        # (partition pruning keeps the others on disk)
+        out_dir.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(
+            dir=out_dir.parent, prefix=".tamis_long_"
+        ) as long_dir:
+            partition_keys = _append_long_batches(
+                filepath,
+                long_dir,
+                partition_by,
+                tzone_in,
+                tzone_out,
+                memory_budget,
+                **kwargs,
+            )
+
+            lf_long = tamis_store.scan_tceq_dataset(long_dir)
+            for keys in sorted(partition_keys):
+                df_long = lf_long.filter(
+                    pl.col(column) == key for column, key in zip(partition_by, keys)
+                ).collect()
+                df_wide = ttp.pivot_tceq_long(df_long)
+
+                # Put back the partition columns dropped by the pivot (e.g. Year and Month)
+                df_wide = df_wide.with_columns(
+                    pl.lit(key).cast(df_long.schema[column]).alias(column)
+                    for column, key in zip(partition_by, keys)
+                    if column not in df_wide.columns
+                )
+                tamis_store.write_tceq_dataset(
+                    df_wide, out_dir, partition_by=partition_by
+                )
+
+    print(f"Processed file saved to: {out_dir}")
+
+    return out_dir
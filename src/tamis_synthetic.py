@@ -0,0 +1,279 @@
+# %%
+import argparse
+import zlib
+import polars as pl
+from datetime import datetime, timedelta
+from pathlib import Path
+import tceq_tamis_processor as ttp
+
+# (Parameter Cd, Unit Cd, Meth Cd) of parameters commonly pulled from auto-GC sites
+DEFAULT_PARAMETERS = [
+    (43202, 8, 128),  # Ethane (ppbv)
+    (43203, 8, 128),  # Ethylene (ppbv)
+    (43204, 8, 128),  # Propane (ppbv)
+    (43214, 8, 128),  # Isobutane (ppbv)
+    (45201, 8, 128),  # Benzene (ppbv)
+    (45202, 8, 128),  # Toluene (ppbv)
+    (61103, 12, 20),  # Wind Speed - Resultant (mph)
+    (61104, 14, 20),  # Wind Direction - Resultant (deg)
+    (62101, 15, 40),  # Outdoor Temperature (Deg F)
+]
+
+NULL_DATA_CODES = ["AN", "BF", "AZ", "BA"]
+QUALIFIER_CODES = ["IT", "IH", "RT", "1", "QX"]
+
+_DELIMITER_LABELS = {",": ",", "|": "|", "\t": "Tab"}
+_CAUTION = "  Caution!  This report does not use the pipe (|) delimiter required in AQS Transaction reports."
+
+_AQS_DATETIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Rows built and written at a time
+DEFAULT_BLOCK_ROWS = 1_000_000
+
+
+def synthetic_preamble(
+    delimiter: str, start: datetime, end: datetime, run_date: datetime = None
+) -> str:
+    """
+    The lines above the column headers of a TAMIS AQS RD transaction report, as TAMIS writes them.
+    """
+
+    if run_date is None:
+        run_date = end
+    caution = "" if delimiter == "|" else _CAUTION
+
+    return (
+        "AQS Raw Data (RD) Transaction Report, Version 1.6, 3/11/2011\n"
+        "Run By: TAMIS User\n"
+        f"Run Date: {run_date:{_AQS_DATETIME_FORMAT}},  Run Time: {3:9.2f} seconds\n"
+        f"Fields Delimited by: {_DELIMITER_LABELS[delimiter]}  Action: I{caution}\n"
+        f"Measurements reported from: {start:{_AQS_DATETIME_FORMAT}} "
+        f"up to but not including: {end:{_AQS_DATETIME_FORMAT}}\n"
+        "Sample Duration Code: 1  Report in AQS Units: N\n"
+        "Report only valid data: Y  Validation levels included (0,1,2,3): 3\n"
+        "Only allow AQS codes: N  Column headings included: Y\n"
+        "Report Missing Measurements: N  Check for Negative Measurements: N\n"
+        "Comment: \n"
+    )
+
+
+def _pick(codes: list, selector: pl.Expr) -> pl.Expr:
+    """One of codes, chosen by a hash-derived integer expression"""
+    return selector.mod(len(codes)).replace_strict(
+        dict(enumerate(codes)), return_dtype=pl.String
+    )
+
+
+def _synthetic_block(
+    site_id: int,
+    parameter: tuple,
+    poc: str,
+    duration_code: str,
+    start: datetime,
+    first_hour: int,
+    hours: int,
+    null_fraction: float,
+    qualifier_fraction: float,
+    seed: int,
+) -> pl.DataFrame:
+    """Rows of one measurement series for hours [first_hour, first_hour + hours)"""
+
+    parameter_code, unit_code, method_code = parameter
+    # Stable across processes, unlike hash()
+    series_seed = zlib.crc32(
+        f"{seed}/{site_id}/{parameter_code}/{poc}/{duration_code}".encode()
+    )
+
+    # Deterministic pseudo-random streams from hashing the hour index
+    hour = pl.int_range(first_hour, first_hour + hours, dtype=pl.Int64)
+    noise = hour.hash(series_seed)
+    missing = hour.hash(series_seed + 1) % 1_000_000 < int(null_fraction * 1_000_000)
+    qualified = hour.hash(series_seed + 2) % 1_000_000 < int(
+        qualifier_fraction * 1_000_000
+    )
+
+    value_max = 360 if unit_code == 14 else 100
+    datetimes = pl.lit(start) + pl.duration(hours=hour)
+
+    return pl.select(
+        pl.lit("RD").alias("Transaction Type"),
+        pl.lit("I").alias("Action"),
+        pl.lit(48).alias("State Cd"),
+        pl.lit(255).alias("County Cd"),
+        pl.lit(site_id).alias("Site ID"),
+        pl.lit(parameter_code).alias("Parameter Cd"),
+        pl.lit(poc).alias("POC"),
+        pl.lit(duration_code).alias("Dur Cd"),
+        pl.lit(f"{unit_code:03d}").alias("Unit Cd"),
+        pl.lit(f"{method_code:03d}").alias("Meth Cd"),
+        datetimes.dt.strftime("%Y%m%d").alias("Date"),
+        datetimes.dt.strftime("%H:%M").alias("Time"),
+        pl.when(~missing)
+        .then((noise % (value_max * 10_000)).cast(pl.Float64) / 10_000)
+        .alias("Value"),
+        pl.when(missing).then(_pick(NULL_DATA_CODES, noise)).alias("Null Data Cd"),
+        pl.lit(None, dtype=pl.String).alias("Col Freq"),
+        pl.lit(None, dtype=pl.String).alias("Mon Protocol ID"),
+        pl.when(qualified & ~missing)
+        .then(_pick(QUALIFIER_CODES, noise // 7))
+        .alias("Qual Cd 1"),
+        *(
+            pl.lit(None, dtype=pl.String).alias(f"Qual Cd {number}")
+            for number in range(2, 11)
+        ),
+        pl.lit(None, dtype=pl.String).alias("Alternate MDL"),
+        pl.lit(None, dtype=pl.String).alias("Uncertainty Value"),
+    )
+
+
+def write_synthetic_report(
+    filepath: str | Path,
+    rows: int = None,
+    sites: list[int] = (1070,),
+    parameters: list[tuple] = None,
+    pocs: list[str] = ("01",),
+    start: datetime = datetime(2025, 1, 1),
+    hours: int = 24 * 7,
+    delimiter: str = ",",
+    duration_code: str = "1",
+    null_fraction: float = 0.01,
+    qualifier_fraction: float = 0.01,
+    seed: int = 0,
+    block_rows: int = DEFAULT_BLOCK_ROWS,
+) -> Path:
+    """
+    Writes a realistic synthetic TAMIS AQS RD transaction report, for testing and benchmarking the reader
+    at sizes beyond the sample reports.
+
+    Rows are ordered like TAMIS reports (by site, parameter, POC, then time) and are written a block at a
+    time, so reports of any size can be generated in bounded memory. Values, missing measurements (with
+    null data codes), and qualifier codes are pseudo-random but reproducible for a given seed.
+
+
+    Parameters
+    -----------
+    filepath: str | Path
+        Where to write the report
+
+    rows: int
+        Approximate number of data rows. Overrides hours (hours = rows / number of series).
+        Default: None (use hours)
+
+    sites: list[int]
+        Site IDs (CAMS numbers). Default: (1070,)
+
+    parameters: list[tuple]
+        (Parameter Cd, Unit Cd, Meth Cd) of each parameter.
+        Default: None (DEFAULT_PARAMETERS)
+
+    pocs: list[str]
+        POCs reported for every parameter. Default: ("01",)
+
+    start: datetime
+        First hour of the measurement window (LST). Default: 2025-01-01 00:00
+
+    hours: int
+        Length of the measurement window in hours. Default: 168 (one week)
+
+    delimiter: str
+        Options: ",", "|", or "\\t". Default: ","
+
+    duration_code: str
+        AQS sample duration code. Default: "1" (hourly)
+
+    null_fraction: float
+        Fraction of measurements reported as missing, with a null data code. Default: 0.01
+
+    qualifier_fraction: float
+        Fraction of measurements with a qualifier code. Default: 0.01
+
+    seed: int
+        Seed for the values and codes. Default: 0
+
+    block_rows: int
+        Rows built and written at a time. Default: DEFAULT_BLOCK_ROWS (1,000,000)
+
+
+    Returns
+    ---------
+    Path
+        filepath
+
+
+    Example
+    --------
+    ```
+    >>> tamis_synthetic.write_synthetic_report("/tmp/report_1m.txt", rows=1_000_000, sites=[1070, 1071])
+    >>> df = ttp.read_tceq_to_pl_dataframe("/tmp/report_1m.txt")
+    ```
+    """
+
+    if delimiter not in _DELIMITER_LABELS:
+        raise ValueError(f'delimiter must be ",", "|", or "\\t", not "{delimiter}"')
+
+    if parameters is None:
+        parameters = DEFAULT_PARAMETERS
+
+    series = [
+        (site_id, parameter, poc)
+        for site_id in sites
+        for parameter in parameters
+        for poc in pocs
+    ]
+    if rows is not None:
+        hours = max(-(-rows // len(series)), 1)
+
+    filepath = Path(filepath)
+    end = start + timedelta(hours=hours)
+
+    with open(filepath, "wb") as report:
+        report.write(synthetic_preamble(delimiter, start, end).encode())
+        report.write((delimiter.join(ttp.aqs_rd_schema()) + "\n").encode())
+
+        for site_id, parameter, poc in series:
+            for first_hour in range(0, hours, block_rows):
+                _synthetic_block(
+                    site_id,
+                    parameter,
+                    poc,
+                    duration_code,
+                    start,
+                    first_hour,
+                    min(block_rows, hours - first_hour),
+                    null_fraction,
+                    qualifier_fraction,
+                    seed,
+                ).write_csv(report, include_header=False, separator=delimiter)
+
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic TAMIS AQS RD transaction report"
+    )
+    parser.add_argument("filepath")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sites", type=int, nargs="+", default=[1070])
+    parser.add_argument("--pocs", nargs="+", default=["01"])
+    parser.add_argument("--delimiter", choices=[",", "|", "tab"], default=",")
+    parser.add_argument("--null-fraction", type=float, default=0.01)
+    parser.add_argument("--qualifier-fraction", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_synthetic_report(
+        args.filepath,
+        rows=args.rows,
+        sites=args.sites,
+        pocs=args.pocs,
+        delimiter="\t" if args.delimiter == "tab" else args.delimiter,
+        null_fraction=args.null_fraction,
+        qualifier_fraction=args.qualifier_fraction,
+        seed=args.seed,
+    )
+    print(f"Synthetic report saved to: {args.filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+# %%
+from __future__ import annotations
+
+import functools
+import tamis_lazy
+import tceq_tamis_processor as ttp
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Unit Cd -> (Unit Cd of the base unit, scale, offset): value in the base unit = value * scale + offset.
+# Units convert to each other when they share a base unit. Units not listed are never converted.
+UNIT_CONVERSIONS = {
+    # Temperature (Deg C)
+    17: (17, 1.0, 0.0),
+    15: (17, 5 / 9, -32 * 5 / 9),  # Deg F
+    # Speed (mph)
+    12: (12, 1.0, 0.0),
+    13: (12, 1.150779, 0.0),  # Knots
+    # Volume mixing ratio (ppbv)
+    8: (8, 1.0, 0.0),
+    932: (8, 1.0, 0.0),  # ppb
+    7: (8, 1000.0, 0.0),  # ppmv
+    # Carbon mixing ratio (ppb C)
+    78: (78, 1.0, 0.0),
+    101: (78, 1000.0, 0.0),  # ppm C
+    # Absolute pressure (Millibars)
+    16: (16, 1.0, 0.0),
+    59: (16, 1.333224, 0.0),  # mm (Hg)
+    # Rainfall (mm (rain))
+    29: (29, 1.0, 0.0),
+    21: (29, 25.4, 0.0),  # in. (rain)
+    # Mass concentration at local conditions (ug/m3)
+    933: (933, 1.0, 0.0),
+    934: (933, 1000.0, 0.0),  # mg/m3
+    # Mass concentration at 25 C (ug/m3 (25 C))
+    1: (1, 1.0, 0.0),
+    3: (1, 0.001, 0.0),  # ng/m3 (25 C)
+}
+
+# Base units of carbon and volume mixing ratios: ppb C = ppbv * carbon number of the compound
+CARBON_BASE_UNIT = 78
+VOLUME_BASE_UNIT = 8
+
+# Unit Type (see the units reference table) -> Unit Cd values of that type are converted to
+DEFAULT_UNIT_TARGETS = {
+    "Temp": 17,  # Deg C
+    "Speed": 12,  # mph
+    "VolRatio": 8,  # ppbv
+    "CarbonVolRatio": 8,  # ppbv, for compounds with a carbon number
+    "PressureAbs": 16,  # Millibars
+}
+
+
+@functools.cache
+def _packaged_carbon_numbers() -> dict:
+    table = ttp.pull_ref_info("ref_files", "tceq_carbon_numbers.csv")
+    return dict(table.select("Parameter Cd", "Carbon Number").iter_rows())
+
+
+def get_carbon_numbers() -> dict:
+    """
+    Parameter Cd -> number of carbon atoms of the compound, for the hydrocarbons measured by auto-GCs.
+    From the packaged tceq_carbon_numbers.csv, read once per process.
+    """
+
+    return _packaged_carbon_numbers()
+
+
+def unit_conversions(
+    targets: dict = None, reference_tables: ttp.TCEQReferenceTables = None
+) -> pl.DataFrame:
+    """
+    The conversion applied to each unit code by `normalize_units`.
+
+    Parameters
+    -----------
+    targets: dict
+        Unit Type -> Unit Cd values of that type are converted to. Types not listed are left as they are.
+        Default: None (DEFAULT_UNIT_TARGETS)
+
+    reference_tables: TCEQReferenceTables
+        Unit types are taken from reference_tables.unit_types.
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        One row per converted unit: "Unit Cd", "Target Unit Cd", "Scale", "Offset", and "Carbon Power"
+        (converted value = (value * Scale + Offset) * carbon number ** Carbon Power)
+    """
+
+    if targets is None:
+        targets = DEFAULT_UNIT_TARGETS
+    if reference_tables is None:
+        reference_tables = ttp.get_reference_tables()
+
+    rows = []
+    for unit_cd, (base, scale, offset) in UNIT_CONVERSIONS.items():
+        target = targets.get(reference_tables.unit_types.get(unit_cd))
+        if target is None or target == unit_cd:
+            continue
+        if target not in UNIT_CONVERSIONS:
+            raise ValueError(
+                f"Unit Cd {target} ({reference_tables.unit_abbrs.get(target)}) has no conversions; "
+                f"choose one of {sorted(UNIT_CONVERSIONS)}"
+            )
+
+        target_base, target_scale, target_offset = UNIT_CONVERSIONS[target]
+        if target_base == base:
+            carbon_power = 0
+        elif (base, target_base) == (CARBON_BASE_UNIT, VOLUME_BASE_UNIT):
+            carbon_power = -1
+        elif (base, target_base) == (VOLUME_BASE_UNIT, CARBON_BASE_UNIT):
+            carbon_power = 1
+        else:
+            raise ValueError(
+                f"Cannot convert {reference_tables.unit_abbrs.get(unit_cd)} to "
+                f"{reference_tables.unit_abbrs.get(target)}"
+            )
+
+        rows.append(
+            (
+                unit_cd,
+                target,
+                scale / target_scale,
+                (offset - target_offset) / target_scale,
+                carbon_power,
+            )
+        )
+
+    return pl.DataFrame(
+        rows,
+        schema={
+            "Unit Cd": pl.Int16,
+            "Target Unit Cd": pl.Int16,
+            "Scale": pl.Float64,
+            "Offset": pl.Float64,
+            "Carbon Power": pl.Int8,
+        },
+        orient="row",
+    )
+
+
+def normalize_units(
+    df: pl.DataFrame | pl.LazyFrame,
+    targets: dict = None,
+    reference_tables: ttp.TCEQReferenceTables = None,
+    carbon_numbers: dict = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Converts every value to the target unit of its unit type (e.g. Deg F to Deg C, ppmv to ppbv, ppb C to ppbv)
+    in a single expression keyed on "Unit Cd", and replaces the "Unit Cd" of converted values. Run on records
+    before they are pivoted, a parameter reported in different units ends up in one wide column.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Unformatted TAMIS records with "Parameter Cd", "Unit Cd", and "Value" columns (e.g. from `scan_tceq`)
+
+    targets: dict
+        Unit Type -> target Unit Cd. See `unit_conversions`.
+        Default: None (DEFAULT_UNIT_TARGETS: Deg C, mph, ppbv, and Millibars)
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+    carbon_numbers: dict
+        Parameter Cd -> carbon number, for converting between carbon (ppb C, ppm C) and volume mixing ratios.
+        Values of compounds without a carbon number keep their carbon units.
+        Default: None (`get_carbon_numbers()`)
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        df (of the same type) with converted "Value" and "Unit Cd" columns
+
+
+    Example
+    --------
+    ```
+    >>> lf = tamis_units.normalize_units(ttp.scan_tceq(filepath), targets={"Temp": 15})   # Deg C to Deg F
+    >>> df = ttp.read_tceq_to_pl_dataframe(filepath, normalize_units=True)
+    ```
+    """
+
+    if carbon_numbers is None:
+        carbon_numbers = get_carbon_numbers()
+    conversions = unit_conversions(targets, reference_tables)
+    if conversions.is_empty():
+        return df
+
+    schema = df.collect_schema()
+    unit = pl.col("Unit Cd")
+
+    def per_unit(column: str, default):
+        return unit.replace_strict(
+            conversions["Unit Cd"],
+            conversions[column],
+            default=default,
+            return_dtype=conversions.schema[column],
+        )
+
+    carbon_power = per_unit("Carbon Power", 0)
+    carbon_number = pl.col("Parameter Cd").replace_strict(
+        carbon_numbers, default=None, return_dtype=pl.Float64
+    )
+    # Carbon units convert to volume units only for compounds with a carbon number
+    convertible = (carbon_power == 0) | carbon_number.is_not_null()
+
+    value = (pl.col("Value") * per_unit("Scale", 1.0) + per_unit("Offset", 0.0)) * (
+        carbon_number.fill_null(1.0).pow(carbon_power)
+    )
+    return df.with_columns(
+        pl.when(convertible)
+        .then(value)
+        .otherwise(pl.col("Value"))
+        .cast(schema["Value"])
+        .alias("Value"),
+        pl.when(convertible)
+        .then(per_unit("Target Unit Cd", unit))
+        .otherwise(unit)
+        .cast(schema["Unit Cd"])
+        .alias("Unit Cd"),
+    )
@@ -0,0 +1,290 @@
+# %%
+from __future__ import annotations
+
+from datetime import timedelta
+import tamis_lazy
+import tamis_aggregate
+
+pl = tamis_lazy.lazy_import("polars")
+
+# Wind speed parameter code -> wind direction parameter code measured with it
+WIND_PARAMETER_PAIRS = {
+    61101: 61102,  # Wind Speed - Scalar, Wind Direction - Scalar
+    61103: 61104,  # Wind Speed - Resultant, Wind Direction - Resultant
+}
+
+# Columns of long-format records a speed and a direction must share to be paired ("Parameter Cd" is the speed's)
+WIND_KEY_COLUMNS = ["Site ID", "Site Name", "POC", "Dur Cd", "Parameter Cd"]
+
+# Wind speed bins (in the speed's units) of `wind_rose`
+DEFAULT_SPEED_BREAKS = [2, 5, 10, 15, 20]
+
+
+def _same_type(df, result: pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+    return result if isinstance(df, pl.LazyFrame) else result.collect()
+
+
+def wind_components(df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Pairs every wind speed record with the direction measured at the same site, POC, duration, and time (see
+    `WIND_PARAMETER_PAIRS`), and splits it into u (eastward) and v (northward) components. All sites and pairs
+    are paired in a single join.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Long-format records: `read_tceq_to_pl_dataframe(output="long")`, `read_tceq_many(output="long")`,
+        or `scan_tceq`. Other parameters are ignored.
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per paired record (of the same type as df), with the `WIND_KEY_COLUMNS` present in df
+        ("Parameter Cd" is the speed's), "Unit Cd" and "Unit Abbr" of the speed, "Datetime",
+        "Wind Speed", "Wind Direction" (degrees the wind blows from), "U", and "V"
+
+
+    Example
+    --------
+    ```
+    >>> df = ttp.read_tceq_to_pl_dataframe(filepath, output="long")
+    >>> tamis_wind.wind_components(df)
+    ```
+    """
+
+    columns = df.collect_schema().names()
+    lf = df.lazy()
+    keys = [column for column in WIND_KEY_COLUMNS if column in columns]
+    units = [column for column in ("Unit Cd", "Unit Abbr") if column in columns]
+    join_keys = [column for column in keys if column != "Site Name"] + ["Datetime"]
+
+    speed = lf.filter(pl.col("Parameter Cd").is_in(list(WIND_PARAMETER_PAIRS))).select(
+        *keys, *units, "Datetime", pl.col("Value").alias("Wind Speed")
+    )
+    # Directions are keyed on the code of the speed they pair with
+    direction = lf.filter(
+        pl.col("Parameter Cd").is_in(list(WIND_PARAMETER_PAIRS.values()))
+    ).select(
+        *(column for column in join_keys if column not in ("Parameter Cd", "Datetime")),
+        pl.col("Parameter Cd").replace_strict(
+            {code: speed_code for speed_code, code in WIND_PARAMETER_PAIRS.items()},
+            return_dtype=lf.collect_schema()["Parameter Cd"],
+        ),
+        "Datetime",
+        pl.col("Value").alias("Wind Direction"),
+    )
+
+    # Meteorological convention: the direction is where the wind blows from, so the components point away from it
+    radians = pl.col("Wind Direction").radians()
+    lf = (
+        speed.join(direction, on=join_keys, how="inner")
+        .drop_nulls(["Wind Speed", "Wind Direction"])
+        .with_columns(
+            (-pl.col("Wind Speed") * radians.sin()).alias("U"),
+            (-pl.col("Wind Speed") * radians.cos()).alias("V"),
+        )
+        .select(
+            *keys,
+            *units,
+            "Datetime",
+            "Wind Speed",
+            "Wind Direction",
+            "U",
+            "V",
+        )
+    )
+
+    return _same_type(df, lf)
+
+
+def _direction_from_components(u: pl.Expr, v: pl.Expr) -> pl.Expr:
+    """Direction (degrees, 0-360) the wind with components u and v blows from"""
+    return (pl.arctan2(-u, -v).degrees() + 360) % 360
+
+
+def vector_average(
+    df: pl.DataFrame | pl.LazyFrame,
+    every: str = "1h",
+    min_coverage: float = tamis_aggregate.DEFAULT_MIN_COVERAGE,
+    sample_every: timedelta = timedelta(hours=1),
+    mask_incomplete: bool = True,
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Vector-averaged (resultant) wind speed and direction over calendar periods, for every site and wind pair in one
+    group_by_dynamic. Vector averages are computed from the mean u and v components, so directions either side
+    of north average to north rather than south.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Long-format records (see `wind_components`), or the output of `wind_components`
+
+    every: str
+        Length of the periods, as a polars duration string ("1h", "1d", "1mo", ...).
+        Default: "1h"
+
+    min_coverage, sample_every, mask_incomplete:
+        Completeness rules, see `tamis_aggregate.summarize`.
+        Default: 75% of hourly samples
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per site, wind pair, and period, with "Datetime" (period start), "Resultant Speed",
+        "Resultant Direction", "Scalar Speed" (mean of the speeds), "Direction Std" (Yamartino estimate of
+        the standard deviation of the direction, degrees), "U", "V", "Count", and "Complete"
+
+
+    Example
+    --------
+    ```
+    >>> daily = tamis_wind.vector_average(ttp.read_tceq_to_pl_dataframe(filepath, output="long"), every="1d")
+    ```
+
+    Daily resultants of the hourly resultants match the "Res" columns of the TCEQ monthly summary pages.
+    """
+
+    if "U" not in df.collect_schema().names():
+        df = wind_components(df)
+    lf = df.lazy()
+    keys = [
+        column
+        for column in lf.collect_schema().names()
+        if column in WIND_KEY_COLUMNS + ["Unit Cd", "Unit Abbr"]
+    ]
+
+    radians = pl.col("Wind Direction").radians()
+    statistics = {
+        "Resultant Speed": (pl.col("U").pow(2) + pl.col("V").pow(2)).sqrt(),
+        "Resultant Direction": _direction_from_components(pl.col("U"), pl.col("V")),
+        "Scalar Speed": pl.col("Scalar Speed"),
+        "Direction Std": (
+            pl.col("_epsilon").arcsin()
+            * (1 + (2 / 3**0.5 - 1) * pl.col("_epsilon").pow(3))
+        ).degrees(),
+        "U": pl.col("U"),
+        "V": pl.col("V"),
+    }
+
+    lf = (
+        lf.sort(*keys, "Datetime")
+        .group_by_dynamic(
+            "Datetime", every=every, group_by=keys, include_boundaries=True
+        )
+        .agg(
+            pl.col("U", "V").mean(),
+            pl.col("Wind Speed").mean().alias("Scalar Speed"),
+            # Yamartino: from the mean of the unit vectors
+            (1 - (radians.sin().mean().pow(2) + radians.cos().mean().pow(2)))
+            .clip(0, 1)
+            .sqrt()
+            .alias("_epsilon"),
+            pl.len().cast(pl.UInt32).alias("Count"),
+        )
+        .with_columns(
+            (
+                pl.col("Count")
+                >= tamis_aggregate.expected_samples(
+                    pl.col("_lower_boundary"), pl.col("_upper_boundary"), sample_every
+                )
+                * min_coverage
+            ).alias("Complete")
+        )
+        .with_columns(statistic.alias(name) for name, statistic in statistics.items())
+    )
+    if mask_incomplete:
+        lf = lf.with_columns(
+            pl.when(pl.col("Complete")).then(pl.col(name)) for name in statistics
+        )
+
+    return _same_type(
+        df, lf.select(*keys, "Datetime", *statistics, "Count", "Complete")
+    )
+
+
+def _speed_bins(speed: pl.Expr, breaks: list[float]) -> pl.Expr:
+    """Speed bins closed on the left, labelled "[-inf, 2)", "[2, 5)", ..., as an Enum in bin order"""
+
+    edges = [float("-inf"), *sorted(breaks), float("inf")]
+    labels = [f"[{lower:g}, {upper:g})" for lower, upper in zip(edges, edges[1:])]
+    speed_bin = pl.when(speed.is_null()).then(None)
+    for upper, label in zip(edges[1:-1], labels):
+        speed_bin = speed_bin.when(speed < upper).then(pl.lit(label))
+    return speed_bin.otherwise(pl.lit(labels[-1])).cast(pl.Enum(labels))
+
+
+def wind_rose(
+    df: pl.DataFrame | pl.LazyFrame,
+    every: str = None,
+    sectors: int = 16,
+    speed_breaks: list[float] = DEFAULT_SPEED_BREAKS,
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Wind rose frequency tables: how often the wind blew from each direction sector in each speed bin, for every
+    site and wind pair, over the whole record or per period.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Long-format records (see `wind_components`), or the output of `wind_components`
+
+    every: str
+        One table per period of this length (polars duration string, e.g. "1mo").
+        Default: None (one table for all records)
+
+    sectors: int
+        Number of direction sectors. Sectors are centred on north, e.g. 16 sectors of 22.5 degrees, the first
+        from 348.75 to 11.25 degrees.
+        Default: 16
+
+    speed_breaks: list[float]
+        Edges of the speed bins, in the units of the speed. Bins include their lower edge.
+        Default: DEFAULT_SPEED_BREAKS ([2, 5, 10, 15, 20] -> "[-inf, 2)", "[2, 5)", ..., "[20, inf)")
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        One row per site, wind pair, (period,) direction sector, and speed bin with any records: "Sector"
+        (centre of the sector, degrees), "Speed Bin" (an Enum of the bin labels, in bin order), "Count", and
+        "Frequency (%)" (of the records of the site, pair, and period)
+
+
+    Example
+    --------
+    ```
+    >>> rose = tamis_wind.wind_rose(df, every="1mo", sectors=8)
+    >>> rose.pivot("Speed Bin", index="Sector", values="Frequency (%)")
+    ```
+    """
+
+    if "U" not in df.collect_schema().names():
+        df = wind_components(df)
+    lf = df.lazy()
+    columns = lf.collect_schema().names()
+    keys = [column for column in WIND_KEY_COLUMNS if column in columns]
+    if every is not None:
+        lf = lf.with_columns(pl.col("Datetime").dt.truncate(every))
+        keys.append("Datetime")
+
+    width = 360 / sectors
+    lf = (
+        lf.with_columns(
+            (((pl.col("Wind Direction") + width / 2) % 360 // width) * width).alias(
+                "Sector"
+            ),
+            _speed_bins(pl.col("Wind Speed"), speed_breaks).alias("Speed Bin"),
+        )
+        .group_by(*keys, "Sector", "Speed Bin")
+        .agg(pl.len().cast(pl.UInt32).alias("Count"))
+        .with_columns(
+            (pl.col("Count") / pl.col("Count").sum().over(keys) * 100).alias(
+                "Frequency (%)"
+            )
+        )
+        .sort(*keys, "Sector", "Speed Bin")
+    )
+
+    return _same_type(df, lf)
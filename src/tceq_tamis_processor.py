@@ -1,8 +1,327 @@
 # %%
-import polars as pl
+from __future__ import annotations
+
+import glob
+import hashlib
+import importlib.util
+import re
+import threading
+import zipfile
+import tamis_lazy
+import tamis_cache
+import tamis_index
+import tamis_instrument
+import tamis_io
+import tamis_qualifiers
+import tamis_store
+import tamis_units
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO
 from importlib import resources
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+# polars is imported when first used, so importing this module (e.g. to start the CLI) stays cheap
+pl = tamis_lazy.lazy_import("polars")
+
+# Number of bytes read from the start of a report when looking for the preamble.
+# TAMIS preambles are ~1 KB, so a single read almost always covers them.
+PREAMBLE_READ_SIZE = 8192
+
+_PREAMBLE_DATETIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+
+# Date and time formats of AQS RD reports, which have a fast integer conversion path
+AQS_DATE_FORMAT = "%Y%m%d"
+AQS_TIME_FORMAT = "%H:%M"
+
+# Arguments of `polars_convert_date_and_time_columns_to_datetime` the readers pass on through **kwargs
+DATETIME_ARGUMENTS = ("date_column", "date_format", "time_column", "time_format")
+
+# Timezones with a fixed UTC offset (e.g. "Etc/GMT+6", "UTC"), which can be applied arithmetically
+_FIXED_OFFSET_TZONE = re.compile(r"(?:Etc/)?(?:UTC|GMT)([+-]\d{1,2})?")
+
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+# Bump whenever `aqs_rd_schema` changes, so cached and stored frames can tell which schema they were read with
+AQS_RD_SCHEMA_VERSION = 1
+
+# Columns of labelled TAMIS records in long format (one row per measurement)
+LONG_FORMAT_COLUMNS = [
+    "Datetime",
+    "Site ID",
+    "Site Name",
+    "Parameter Cd",
+    "Parameter Name",
+    "POC",
+    "Dur Cd",
+    "Unit Cd",
+    "Unit Abbr",
+    "Meth Cd",
+    "Value",
+    "Null Data Cd",
+]
+
+# Codes identifying one measurement series (one instrument and averaging time for a parameter) at a site.
+# Wide output has one column per series.
+SERIES_COLUMNS = ["Parameter Cd", "POC", "Dur Cd", "Unit Cd"]
+
+
+@dataclass(frozen=True)
+class TCEQReportPreamble:
+    """
+    Metadata parsed from the preamble (the lines above the column headers) of a TCEQ TAMIS report.
+
+    Attributes
+    ----------
+    delimiter: str
+        Character string used to delimit the data columns
+
+    header_row_number: int
+        Number of rows from the start of the report that the data column headers are located
+
+    header_offset: int
+        Byte offset from the start of the report to the data column header line
+
+    report_title: str
+        First line of the report (e.g., "AQS Raw Data (RD) Transaction Report, Version 1.6, 3/11/2011")
+
+    run_by: str | None
+        "Run By" field
+
+    run_date: datetime | None
+        Date and time the report was generated
+
+    run_time_seconds: float | None
+        Time TAMIS took to generate the report
+
+    action: str | None
+        AQS transaction action code (e.g., "I" for insert)
+
+    measurements_from: datetime | None
+        Start of the measurement window (inclusive)
+
+    measurements_to: datetime | None
+        End of the measurement window (exclusive)
+
+    sample_duration_code: str | None
+        AQS sample duration code requested for the report
+
+    report_in_aqs_units: bool | None
+
+    report_only_valid_data: bool | None
+
+    validation_levels: str | None
+        Validation levels included in the report
+
+    only_allow_aqs_codes: bool | None
+
+    column_headings_included: bool | None
+
+    report_missing_measurements: bool | None
+
+    check_for_negative_measurements: bool | None
+
+    comment: str | None
+        Free-text comment added to the report request
+
+    column_names: tuple[str] | None
+        Names of the data columns, from the column header line
+    """
+
+    delimiter: str
+    header_row_number: int
+    header_offset: int
+    report_title: str = None
+    run_by: str = None
+    run_date: datetime = None
+    run_time_seconds: float = None
+    action: str = None
+    measurements_from: datetime = None
+    measurements_to: datetime = None
+    sample_duration_code: str = None
+    report_in_aqs_units: bool = None
+    report_only_valid_data: bool = None
+    validation_levels: str = None
+    only_allow_aqs_codes: bool = None
+    column_headings_included: bool = None
+    report_missing_measurements: bool = None
+    check_for_negative_measurements: bool = None
+    comment: str = None
+    column_names: tuple = None
+
+
+def _search_preamble(pattern: str, text: str) -> str | None:
+    """Return the first capture group of pattern in text, or None if it is not found"""
+    match = re.search(pattern, text)
+    return match.group(1).strip() if match else None
+
+
+def _preamble_flag(pattern: str, text: str) -> bool | None:
+    """Convert a Y/N preamble field to a bool"""
+    value = _search_preamble(pattern, text)
+    return None if value is None else value.upper() == "Y"
+
+
+def _preamble_datetime(value: str | None) -> datetime | None:
+    return (
+        None if value is None else datetime.strptime(value, _PREAMBLE_DATETIME_FORMAT)
+    )
+
+
+def parse_tceq_preamble(raw: bytes) -> TCEQReportPreamble:
+    """
+    Parses the preamble of a TCEQ TAMIS report from the leading bytes of the report.
+
+    Parameters
+    ----------
+    raw: bytes
+        Leading bytes of a TAMIS report. Must include the full data column header line.
+
+
+    Returns
+    ----------
+    TCEQReportPreamble
+        Report metadata, including the delimiter and the byte offset of the column header line
+
+
+    Raises
+    ----------
+    ValueError
+        If the column header line (containing "State Cd") is not found in raw
+    """
+
+    header_index = raw.find(b"State Cd")
+    if header_index == -1 or raw.find(b"\n", header_index) == -1:
+        raise ValueError(
+            'Could not find the data column headers ("State Cd") in the TAMIS report preamble'
+        )
+
+    header_offset = raw.rfind(b"\n", 0, header_index) + 1
+    header_row_number = raw.count(b"\n", 0, header_offset)
+    text = raw[:header_offset].decode("utf-8", errors="replace")
+
+    delimiter = _search_preamble(r"Fields Delimited by: (\S+)", text)
+    if delimiter == "Tab":
+        delimiter = "\t"
+
+    header_line = (
+        raw[header_offset : raw.find(b"\n", header_index)]
+        .decode("utf-8", errors="replace")
+        .rstrip("\r")
+    )
+
+    # The delimiter line is sometimes missing. Fall back to sniffing the header line.
+    if delimiter is None:
+        delimiter = next(d for d in ("|", "\t", ",") if d in header_line)
+
+    window = re.search(
+        r"Measurements reported from:\s*(\S+ \S+)\s+up to but not including:\s*(\S+ \S+)",
+        text,
+    )
+    run_time = _search_preamble(r"Run Time:\s*([\d.]+)", text)
+
+    return TCEQReportPreamble(
+        delimiter=delimiter,
+        header_row_number=header_row_number,
+        header_offset=header_offset,
+        report_title=text.splitlines()[0].strip() if header_row_number else None,
+        run_by=_search_preamble(r"Run By:(.*)", text),
+        run_date=_preamble_datetime(
+            _search_preamble(r"Run Date:\s*(\d+/\d+/\d+ \d+:\d+:\d+)", text)
+        ),
+        run_time_seconds=None if run_time is None else float(run_time),
+        action=_search_preamble(r"Action: (\S+)", text),
+        measurements_from=_preamble_datetime(window.group(1)) if window else None,
+        measurements_to=_preamble_datetime(window.group(2)) if window else None,
+        sample_duration_code=_search_preamble(r"Sample Duration Code: (\S+)", text),
+        report_in_aqs_units=_preamble_flag(r"Report in AQS Units: (\S+)", text),
+        report_only_valid_data=_preamble_flag(r"Report only valid data: (\S+)", text),
+        validation_levels=_search_preamble(
+            r"Validation levels included \([\d,]*\): (\S+)", text
+        ),
+        only_allow_aqs_codes=_preamble_flag(r"Only allow AQS codes: (\S+)", text),
+        column_headings_included=_preamble_flag(
+            r"Column headings included: (\S+)", text
+        ),
+        report_missing_measurements=_preamble_flag(
+            r"Report Missing Measurements: (\S+)", text
+        ),
+        check_for_negative_measurements=_preamble_flag(
+            r"Check for Negative Measurements: (\S+)", text
+        ),
+        comment=_search_preamble(r"Comment:(.*)", text),
+        column_names=tuple(name.strip() for name in header_line.split(delimiter)),
+    )
+
+
+def read_tceq_preamble_from_stream(
+    report, name: str
+) -> tuple[TCEQReportPreamble, bytes]:
+    """
+    Parses the preamble from an open binary report stream. Returns the preamble and the bytes read,
+    which run past the column header line (see `tamis_io.resume_at`).
+    """
+
+    raw = report.read(PREAMBLE_READ_SIZE)
+    while True:
+        try:
+            return parse_tceq_preamble(raw), raw
+        except ValueError:
+            more = report.read(len(raw))
+            # Stop once the whole report has been read
+            if not more:
+                raise ValueError(
+                    f"{name} does not look like a TAMIS report: no data column headers found"
+                ) from None
+            raw += more
+
+
+def read_tceq_preamble(filepath: str | Path | bytes | BinaryIO) -> TCEQReportPreamble:
+    """
+    Reads the preamble of a TCEQ TAMIS report in a single pass over the first few KB of the file.
+
+    Parameters
+    ----------
+    filepath: str | Path | bytes | BinaryIO
+        filepath to TAMIS data to open and parse. Compressed reports, zip archive members, and in-memory reports
+        are read too, see `tamis_io.open_report`.
+
+
+    Returns
+    ----------
+    TCEQReportPreamble
+        Report metadata, including the delimiter, the byte offset of the column header line,
+        the run date, and the measurement window
+
+
+    Example
+    ---------
+    ```
+    >>> preamble = ttp.read_tceq_preamble(filepath)
+    >>> preamble.delimiter
+    ','
+    >>> preamble.header_row_number, preamble.header_offset
+    (10, 608)
+    >>> preamble.measurements_from, preamble.measurements_to
+    (datetime.datetime(2025, 4, 7, 0, 0), datetime.datetime(2025, 4, 22, 0, 0))
+    ```
+
+    Notes
+    -------
+    The file is opened read-only and only the first PREAMBLE_READ_SIZE bytes are read (decompressed), unless the
+    preamble is unusually long, in which case the read size is doubled until the column header line is found.
+    """
+
+    with (
+        tamis_instrument.stage("preamble scan"),
+        tamis_io.open_report(filepath) as report,
+    ):
+        return read_tceq_preamble_from_stream(report, tamis_io.source_name(filepath))[0]
+
 
 def get_TCEQ_header_row_number(filepath: str | Path) -> int:
     """
@@ -45,10 +364,7 @@ def get_TCEQ_header_row_number(filepath: str | Path) -> int:
     ```
     """
 
-    with open(filepath, "r+") as pracfile:
-        for line_index, line in enumerate(pracfile):
-            if "State Cd" in line:
-                return line_index
+    return read_tceq_preamble(filepath).header_row_number
 
 
 def get_delimiter(filepath: str | Path) -> str:
@@ -108,33 +424,209 @@ def get_delimiter(filepath: str | Path) -> str:
     ```
     """
 
-    with open(filepath, "r+") as pracfile:
-        for line_index, line in enumerate(pracfile):
-            if "Fields Delimited by: " in line:
-                delimiter = line.split("Fields Delimited by: ")[1].split()[0]
-                if delimiter == "Tab":
-                    delimiter = "\t"
+    return read_tceq_preamble(filepath).delimiter
+
+
+def aqs_rd_schema(value_dtype: pl.DataType = None) -> dict:
+    """
+    Explicit dtypes for the columns of an AQS Raw Data (RD) transaction report, as exported by TAMIS.
+
+    Codes that are labels rather than numbers (e.g. "POC" and "Dur Cd") are read as categoricals so
+    leading zeros are kept ("01") and repeated values are stored once. Numeric codes use the smallest
+    integer width that holds them, and only "Time" is left as a string. Reading with a fixed schema skips
+    dtype inference and gives every report the same dtypes, so reports concatenate without casts.
+
+    The schema is versioned by `AQS_RD_SCHEMA_VERSION`.
+
+
+    Parameters
+    -----------
+    value_dtype: pl.DataType
+        dtype of "Value", "Alternate MDL", and "Uncertainty Value". pl.Float32 halves the memory used by
+        values at the cost of precision beyond ~7 significant digits.
+        Default: None (pl.Float64)
+
+
+    Returns
+    ---------
+    dict
+        column name -> polars dtype, in report column order
+
+
+    Example
+    --------
+    ```
+    >>> ttp.aqs_rd_schema()["POC"]
+    Categorical
+    >>> ttp.aqs_rd_schema(value_dtype=pl.Float32)["Value"]
+    Float32
+    ```
+    """
+
+    if value_dtype is None:
+        value_dtype = pl.Float64
+
+    return {
+        "Transaction Type": pl.Categorical,
+        "Action": pl.Categorical,
+        "State Cd": pl.UInt8,
+        "County Cd": pl.UInt16,
+        "Site ID": pl.Int32,
+        "Parameter Cd": pl.Int32,
+        "POC": pl.Categorical,
+        "Dur Cd": pl.Categorical,
+        "Unit Cd": pl.Int16,
+        "Meth Cd": pl.Int16,
+        "Date": pl.Int32,
+        "Time": pl.String,
+        "Value": value_dtype,
+        "Null Data Cd": pl.Categorical,
+        "Col Freq": pl.Categorical,
+        "Mon Protocol ID": pl.Categorical,
+        **{f"Qual Cd {number}": pl.Categorical for number in range(1, 11)},
+        "Alternate MDL": value_dtype,
+        "Uncertainty Value": value_dtype,
+    }
+
+
+def tceq_report_schema(
+    preamble: TCEQReportPreamble,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+) -> dict:
+    """
+    Schema for reading the data columns of a report: `aqs_rd_schema` for the columns in the report's header
+    line, with schema_overrides applied. Columns the AQS schema does not know are read as strings.
+    """
+
+    schema = aqs_rd_schema(value_dtype=value_dtype)
+    if schema_overrides:
+        schema.update(schema_overrides)
+
+    return {column: schema.get(column, pl.String) for column in preamble.column_names}
+
+
+def _fixed_offset_to_utc(tzone: str) -> int | None:
+    """Microseconds to add to a local time in tzone to get UTC, or None if tzone observes DST"""
+
+    match = _FIXED_OFFSET_TZONE.fullmatch(tzone)
+    if match is None:
+        return None
+
+    # POSIX-style signs: Etc/GMT+6 is 6 hours behind UTC
+    return int(match.group(1) or 0) * 3_600_000_000
+
+
+def _aqs_date_and_time_columns(date_column: str, time_column: str) -> list[pl.Expr]:
+    """
+    Date and Time expressions for YYYYMMDD integer dates and "HH:MM" times. Dates are built with integer
+    arithmetic instead of being formatted and parsed as strings.
+    """
+
+    date = pl.col(date_column)
+    month = date // 100 % 100
+
+    # Days since 1970-01-01 (H. Hinnant's days_from_civil). Years start in March so leap days fall at the
+    # end of the year, and each operand appears once to keep the expression tree small.
+    year = date // 10_000 - (month <= 2).cast(pl.Int32)
+    days = (
+        365 * year
+        + year // 4
+        - year // 100
+        + year // 400
+        + (153 * ((month + 9) % 12) + 2) // 5
+        + date % 100
+        - 719_469
+    )
+
+    return [
+        days.cast(pl.Date).alias(date_column),
+        # Few distinct times per report, and polars caches repeated string conversions
+        pl.col(time_column).str.to_time(format=AQS_TIME_FORMAT).alias(time_column),
+    ]
+
+
+def _combine_date_and_time_columns(
+    date_column: str, time_column: str, tzone_in: str, tzone_out: str
+) -> pl.Expr:
+    """
+    Datetime expression from Date and Time columns, built from their integer representations. Fixed-offset
+    timezones are applied as a plain offset rather than a per-value timezone lookup.
+    """
+
+    local = (
+        pl.col(date_column).cast(pl.Int64) * _MICROSECONDS_PER_DAY
+        + pl.col(time_column).cast(pl.Int64) // 1_000
+    )
+
+    offset = None if tzone_in is None else _fixed_offset_to_utc(tzone_in)
+    if tzone_in is None:
+        datetime_ = local.cast(pl.Datetime("us"))
+    elif offset is not None:
+        # Shift to UTC directly; converting the timezone afterwards only changes metadata
+        datetime_ = (
+            (local + offset)
+            .cast(pl.Datetime("us", "UTC"))
+            .dt.convert_time_zone(tzone_in)
+        )
+    else:
+        datetime_ = local.cast(pl.Datetime("us")).dt.replace_time_zone(tzone_in)
+
+    if tzone_in is not None and tzone_out is not None:
+        datetime_ = datetime_.dt.convert_time_zone(tzone_out)
+
+    return datetime_.alias("Datetime")
+
+
+def _parse_date_and_time_columns(
+    df: pl.DataFrame | pl.LazyFrame,
+    date_column: str,
+    date_format: str,
+    time_column: str,
+    time_format: str,
+    tzone_in: str,
+    tzone_out: str,
+) -> pl.DataFrame | pl.LazyFrame:
+    """Generic conversion for any date and time formats, by parsing the columns as strings"""
+
+    # Pull in dataframe, convert date and time columns to strings, convert to date and time objects, and merge to datetime column
+    df = df.with_columns(pl.col(date_column, time_column).cast(str))
+    df = df.with_columns(pl.col(date_column).str.to_date(format=date_format))
+    df = df.with_columns(pl.col(time_column).str.to_time(format=time_format))
+    df = df.with_columns(
+        pl.col(date_column).dt.combine(pl.col(time_column)).alias("Datetime")
+    )
+
+    # Only add tzone info if tzone_in is not None
+    # Only convert tzone if both tzone_in and tzone_out is specified
+    if tzone_in is not None:
+        df = df.with_columns(pl.col("Datetime").dt.replace_time_zone(tzone_in))
+
+        if tzone_out is not None:
+            df = df.with_columns(pl.col("Datetime").dt.convert_time_zone(tzone_out))
+
+    df = df.with_columns(pl.exclude(date_column, time_column))
 
-                return delimiter
+    return df
 
 
 def polars_convert_date_and_time_columns_to_datetime(
-    df: pl.DataFrame,
+    df: pl.DataFrame | pl.LazyFrame,
     date_column: str = "Date",
-    date_format: str = "%Y%m%d",
+    date_format: str = AQS_DATE_FORMAT,
     time_column: str = "Time",
-    time_format: str = "%H:%M",
+    time_format: str = AQS_TIME_FORMAT,
     tzone_in: str = None,
     tzone_out: str = None,
-) -> pl.DataFrame:
+) -> pl.DataFrame | pl.LazyFrame:
     """
     Create combined datetime column with tzone info from individual date and time columns in a polars dataframe
 
 
     Parameters
     -----------
-    df: pl.Dataframe
-        Polars dataframe with individual date and time columns to convert
+    df: pl.Dataframe | pl.LazyFrame
+        Polars dataframe with individual date and time columns to convert. LazyFrames stay lazy.
 
     date_column: str
         Name of column containing date information
@@ -160,7 +652,7 @@ def polars_convert_date_and_time_columns_to_datetime(
     Returns
     ---------
 
-    pl.Dataframe
+    pl.Dataframe | pl.LazyFrame
         The original polars dataframe now with a new "Datetime" column
 
 
@@ -219,27 +711,31 @@ def polars_convert_date_and_time_columns_to_datetime(
     -------
     Etc/GMT+6 is the timezone covering most of Texas. Stations near El-Paso will be Etc/GMT+7.
 
-    """
-
-    # Pull in dataframe, convert date and time columns to strings, convert to date and time objects, and merge to datetime column
-    df = df.with_columns(pl.col(date_column, time_column).cast(str))
-    df = df.with_columns(pl.col(date_column).str.to_date(format=date_format))
-    df = df.with_columns(pl.col(time_column).str.to_time(format=time_format))
-    df = df.with_columns(
-        pl.col(date_column).dt.combine(pl.col(time_column)).alias("Datetime")
-    )
-
-    # Only add tzone info if tzone_in is not None
-    # Only convert tzone if both tzone_in and tzone_out is specified
-    if tzone_in is not None:
-        df = df.with_columns(pl.col("Datetime").dt.replace_time_zone(tzone_in))
+    AQS dates (integer YYYYMMDD with the default date_format) and "HH:MM" times are converted with integer
+    arithmetic instead of string parsing, and fixed-offset timezones (e.g. Etc/GMT+6) are applied as a plain
+    offset.
+    Any other formats or column dtypes are parsed as strings. Both give identical results, but the integer
+    path does not check that dates exist (20250230 becomes 2025-03-02).
 
-        if tzone_out is not None:
-            df = df.with_columns(pl.col("Datetime").dt.convert_time_zone(tzone_out))
+    """
 
-    df = df.with_columns(pl.exclude(date_column, time_column))
+    schema = df.collect_schema()
+    if (
+        date_format == AQS_DATE_FORMAT
+        and time_format == AQS_TIME_FORMAT
+        and schema[date_column].is_integer()
+        and schema[time_column] == pl.String
+    ):
+        df = df.with_columns(_aqs_date_and_time_columns(date_column, time_column))
+        return df.with_columns(
+            _combine_date_and_time_columns(
+                date_column, time_column, tzone_in, tzone_out
+            )
+        )
 
-    return df
+    return _parse_date_and_time_columns(
+        df, date_column, date_format, time_column, time_format, tzone_in, tzone_out
+    )
 
 
 def pl_drop_col_if_all_null(df: pl.DataFrame) -> pl.DataFrame:
@@ -317,10 +813,55 @@ def pl_drop_col_if_all_null(df: pl.DataFrame) -> pl.DataFrame:
     return df
 
 
+def _read_tceq_csv(
+    filepath: str | Path | bytes | BinaryIO,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+) -> pl.DataFrame:
+    """
+    Parses the records of a report with the schema from its preamble.
+
+    Plain files are handed to polars by path and read by polars' own file reader, skipping the preamble lines
+    with skip_rows: the data never passes through a Python file object, which polars would copy in full through
+    .read(). Skipping the dozen preamble lines is negligible next to the parse. Other sources are decompressed
+    into polars from the stream the preamble was parsed from, positioned at the header line.
+    """
+
+    if tamis_io.is_plain_file(filepath):
+        preamble = read_tceq_preamble(filepath)
+        with tamis_instrument.stage("read_csv") as stage:
+            return stage.output(
+                pl.read_csv(
+                    Path(filepath).expanduser(),
+                    has_header=True,
+                    separator=preamble.delimiter,
+                    skip_rows=preamble.header_row_number,
+                    schema=tceq_report_schema(preamble, value_dtype, schema_overrides),
+                )
+            )
+
+    name = tamis_io.source_name(filepath)
+    with tamis_io.open_report(filepath) as report:
+        with tamis_instrument.stage("preamble scan"):
+            preamble, raw = read_tceq_preamble_from_stream(report, name)
+        with tamis_instrument.stage("read_csv") as stage:
+            return stage.output(
+                pl.read_csv(
+                    tamis_io.resume_at(report, raw, preamble.header_offset),
+                    has_header=True,
+                    separator=preamble.delimiter,
+                    schema=tceq_report_schema(preamble, value_dtype, schema_overrides),
+                )
+            )
+
+
 def read_and_extract_tceq_data_to_unformatted_df(
-    filepath: str | Path,
+    filepath: str | Path | bytes | BinaryIO,
     tzone_in: str = "Etc/GMT+6",
     tzone_out: str = "Etc/GMT+6",
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+    qualifier_mask: bool = False,
     **kwargs,
 ) -> pl.DataFrame:
     """
@@ -330,9 +871,11 @@ def read_and_extract_tceq_data_to_unformatted_df(
 
     Parameters
     -----------
-    filepath: str | Path
+    filepath: str | Path | bytes | BinaryIO
         filepath or Path (e.g. returned from pathlib.Path()) to TAMIS
-        report to read and process
+        report to read and process. Also accepts gzip/bzip2/xz/zstd-compressed reports, zip archives,
+        members of zip archives ("bundle.zip/report.txt"), and reports in memory (bytes or binary file-like
+        objects), which are decompressed as they are read. See `tamis_io.open_report`.
 
     tzone_in: str
         Timezone code for date and times being read in. TCEQ TAMIS data is presented in LST.
@@ -342,6 +885,19 @@ def read_and_extract_tceq_data_to_unformatted_df(
         Timezone code output data is converted to.
         Default: ETC/GMT+6 -- the timezone covering most of Texas. Stations near El-Paso will be ETC/GMT+7.
 
+    value_dtype: pl.DataType
+        dtype of the "Value" column. See `aqs_rd_schema`.
+        Default: None (pl.Float64)
+
+    schema_overrides: dict
+        column name -> dtype, replacing the dtypes from `aqs_rd_schema` for those columns.
+        Default: None
+
+    qualifier_mask: bool
+        Replace the "Qual Cd 1" ... "Qual Cd 10" columns with a single UInt64 "Qual Mask" column.
+        "Null Data Cd" is kept as a column of its own. See `tamis_qualifiers.fold_qualifiers`.
+        Default: False
+
     **kwargs: str
         Additional arguments passed to tzone conversion. See `polars_convert_data_and_time_columns_to_datetime`.
 
@@ -388,8 +944,8 @@ def read_and_extract_tceq_data_to_unformatted_df(
     ┌─────────────┬────────┬──────────┬───────────┬───┬────────────┬──────────┬──────────┬─────────────┐
     │ Transaction ┆ Action ┆ State Cd ┆ County Cd ┆ … ┆ Date       ┆ Time     ┆ Value    ┆ Datetime    │
     │ Type        ┆ ---    ┆ ---      ┆ ---       ┆   ┆ ---        ┆ ---      ┆ ---      ┆ ---         │
-    │ ---         ┆ str    ┆ i64      ┆ i64       ┆   ┆ date       ┆ time     ┆ f64      ┆ datetime[μs │
-    │ str         ┆        ┆          ┆           ┆   ┆            ┆          ┆          ┆ ,           │
+    │ ---         ┆ cat    ┆ u8       ┆ u16       ┆   ┆ date       ┆ time     ┆ f64      ┆ datetime[μs │
+    │ cat         ┆        ┆          ┆           ┆   ┆            ┆          ┆          ┆ ,           │
     │             ┆        ┆          ┆           ┆   ┆            ┆          ┆          ┆ Etc/GMT+6]  │
     ╞═════════════╪════════╪══════════╪═══════════╪═══╪════════════╪══════════╪══════════╪═════════════╡
     │ RD          ┆ I      ┆ 48       ┆ 255       ┆ … ┆ 2025-04-07 ┆ 00:00:00 ┆ 55.055   ┆ 2025-04-07  │
@@ -433,22 +989,129 @@ def read_and_extract_tceq_data_to_unformatted_df(
 
     """
 
-    # Read in table
-    TCEQ_HEADER = get_TCEQ_header_row_number(filepath)
-    DELIM = get_delimiter(filepath)
-    df = pl.read_csv(filepath, has_header=True, separator=DELIM, skip_rows=TCEQ_HEADER)
+    with tamis_instrument.report(tamis_io.source_name(filepath)):
+        # Read in table, starting at the column header line found while parsing the preamble
+        df = _read_tceq_csv(filepath, value_dtype, schema_overrides)
 
-    # drop columns if all values are null
-    df = pl_drop_col_if_all_null(df)
+        if qualifier_mask:
+            with tamis_instrument.stage("fold qualifiers", df) as stage:
+                df = stage.output(tamis_qualifiers.fold_qualifiers(df))
 
-    # Get datetime columns
-    df = polars_convert_date_and_time_columns_to_datetime(
-        df, tzone_in=tzone_in, tzone_out=tzone_out, **kwargs
-    )
+        # drop columns if all values are null
+        with tamis_instrument.stage("drop null columns", df) as stage:
+            df = stage.output(pl_drop_col_if_all_null(df))
+
+        # Get datetime columns
+        with tamis_instrument.stage("datetime conversion", df) as stage:
+            df = stage.output(
+                polars_convert_date_and_time_columns_to_datetime(
+                    df, tzone_in=tzone_in, tzone_out=tzone_out, **kwargs
+                )
+            )
 
     return df
 
 
+def scan_tceq(
+    filepath: str | Path | bytes | BinaryIO,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    preamble: TCEQReportPreamble = None,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+    qualifier_mask: bool = False,
+    **kwargs,
+) -> pl.LazyFrame:
+    """
+    Lazily scans a TCEQ TAMIS report (.txt). The lazy equivalent of `read_and_extract_tceq_data_to_unformatted_df`.
+
+    Nothing is read until the LazyFrame is collected. Filters on the raw code columns (e.g. "Parameter Cd",
+    "Site ID", "POC") are pushed down into the CSV scan, and only the columns that are used are parsed.
+    Filters on "Datetime" are applied straight after the datetime conversion.
+
+
+    Parameters
+    -----------
+    filepath: str | Path | bytes | BinaryIO
+        filepath or Path (e.g. returned from pathlib.Path()) to TAMIS
+        report to scan. Compressed, archived, and in-memory reports (see `tamis_io.open_report`) are
+        decompressed into memory when the LazyFrame is created, since only plain files can be scanned by path.
+
+    tzone_in: str
+        Timezone code for date and times being read in. TCEQ TAMIS data is presented in LST.
+        Default: Etc/GMT+6
+
+    tzone_out: str
+        Timezone code output data is converted to.
+        Default: Etc/GMT+6
+
+    preamble: TCEQReportPreamble
+        Already-parsed preamble of the report, to avoid reading it twice.
+        Default: None (read with `read_tceq_preamble`)
+
+    value_dtype, schema_overrides, qualifier_mask:
+        See `read_and_extract_tceq_data_to_unformatted_df`
+
+    **kwargs: str
+        Additional arguments passed to tzone conversion. See `polars_convert_date_and_time_columns_to_datetime`.
+
+
+    Returns
+    ---------
+    pl.LazyFrame
+        LazyFrame in long format containing TAMIS records described by parameter and unit codes
+
+
+    Example
+    --------
+    ```
+    >>> lf = ttp.scan_tceq(filepath)
+    >>> ethane = lf.filter(pl.col("Parameter Cd") == 43202).select("Datetime", "Value").collect()
+    ```
+
+    Only the "Parameter Cd", "Date", "Time", and "Value" columns of the ethane rows are parsed.
+
+    The LazyFrame can also be passed to `format_tceq_data` to get the wide, labelled output of
+    `read_tceq_to_pl_dataframe`:
+    ```
+    >>> df = ttp.format_tceq_data(lf.filter(pl.col("Parameter Cd").is_in([43202, 61103, 61104])))
+    ```
+
+    See also
+    ---------
+    `filter_tceq`, `format_tceq_data`
+    """
+
+    if tamis_io.is_plain_file(filepath):
+        if preamble is None:
+            preamble = read_tceq_preamble(filepath)
+        source, skip_rows = filepath, preamble.header_row_number
+    else:
+        # Decompress once, parsing the preamble from the same stream
+        with tamis_io.open_report(filepath) as report:
+            scanned, raw = read_tceq_preamble_from_stream(
+                report, tamis_io.source_name(filepath)
+            )
+            if preamble is None:
+                preamble = scanned
+            source = tamis_io.resume_at(report, raw, scanned.header_offset).read()
+        skip_rows = 0
+
+    lf = pl.scan_csv(
+        source,
+        has_header=True,
+        separator=preamble.delimiter,
+        skip_rows=skip_rows,
+        schema=tceq_report_schema(preamble, value_dtype, schema_overrides),
+    )
+    if qualifier_mask:
+        lf = tamis_qualifiers.fold_qualifiers(lf)
+
+    return polars_convert_date_and_time_columns_to_datetime(
+        lf, tzone_in=tzone_in, tzone_out=tzone_out, **kwargs
+    )
+
+
 def pull_ref_info(ref_dir: str | Path, ref_file: str) -> resources.path:
     """
     Use pathlib.resources to pull reference file for for labeling raw TAMIS data
@@ -458,28 +1121,543 @@ def pull_ref_info(ref_dir: str | Path, ref_file: str) -> resources.path:
         return pl.read_csv(ref_path)
 
 
+REFERENCE_FILES = ("tceq_parameters", "tceq_units", "tceq_site_locations")
+
+
+@dataclass(frozen=True)
+class TCEQReferenceTables:
+    """
+    Parameter, unit, and site code look-up tables plus compact code -> label mappings built from them.
+
+    Attributes
+    ----------
+    parameters: pl.DataFrame
+        "Parameter Cd", "Parameter Name"
+
+    units: pl.DataFrame
+        "Unit Description", "Unit Abbr", "Unit Cd", "Unit Type"
+
+    sites: pl.DataFrame
+        "Site ID", "Site Name". One row per site ID -- IDs shared by more than one site name have their
+        names joined with " / ".
+
+    parameter_names: dict[int, str]
+        Parameter Cd -> Parameter Name
+
+    unit_abbrs: dict[int, str]
+        Unit Cd -> Unit Abbr
+
+    unit_types: dict[int, str]
+        Unit Cd -> Unit Type
+
+    site_names: dict[int, str]
+        Site ID -> Site Name
+
+    version: str
+        Short hash of the table contents
+
+    source: str
+        Where the tables were loaded from
+
+    loaded_at: datetime
+        When the tables were loaded
+    """
+
+    parameters: pl.DataFrame
+    units: pl.DataFrame
+    sites: pl.DataFrame
+    parameter_names: dict
+    unit_abbrs: dict
+    unit_types: dict
+    site_names: dict
+    version: str
+    source: str
+    loaded_at: datetime
+
+
+def _build_reference_tables(
+    tceq_param_codes: pl.DataFrame,
+    tceq_unit_codes: pl.DataFrame,
+    tceq_site_info_codes: pl.DataFrame,
+    source: str,
+) -> TCEQReferenceTables:
+    """Build the code -> label mappings and version stamp for a set of reference tables"""
+
+    tceq_site_info_codes = tceq_site_info_codes.group_by(
+        "Site ID", maintain_order=True
+    ).agg(pl.col("Site Name").unique(maintain_order=True).str.join(" / "))
+
+    digest = hashlib.blake2b(digest_size=8)
+    for table in (tceq_param_codes, tceq_unit_codes, tceq_site_info_codes):
+        digest.update(table.write_csv().encode())
+
+    return TCEQReferenceTables(
+        parameters=tceq_param_codes,
+        units=tceq_unit_codes,
+        sites=tceq_site_info_codes,
+        parameter_names=dict(
+            tceq_param_codes.select("Parameter Cd", "Parameter Name").iter_rows()
+        ),
+        unit_abbrs=dict(tceq_unit_codes.select("Unit Cd", "Unit Abbr").iter_rows()),
+        unit_types=dict(tceq_unit_codes.select("Unit Cd", "Unit Type").iter_rows()),
+        site_names=dict(tceq_site_info_codes.iter_rows()),
+        version=digest.hexdigest(),
+        source=source,
+        loaded_at=datetime.now(),
+    )
+
+
+_reference_tables = None
+_reference_tables_lock = threading.RLock()
+
+
+def refresh_reference_tables(
+    ref_dir: str | Path = None, from_txt: bool = False
+) -> TCEQReferenceTables:
+    """
+    (Re)loads the process-wide reference tables used to label raw TAMIS data.
+
+    Parameters
+    ----------
+    ref_dir: str | Path
+        Directory holding tceq_parameters, tceq_units, and tceq_site_locations files.
+        Default: None (the tables packaged with the processor)
+
+    from_txt: bool
+        Load the raw .txt exports downloaded from the TAMIS References and Site list pages
+        (see `extra_tamis_processors.clean_ref_txt_files`) rather than the processed .csv files.
+        Default: False
+
+
+    Returns
+    ----------
+    TCEQReferenceTables
+        The newly loaded tables. Every later call to `get_reference_tables` returns them.
+
+
+    Example
+    ----------
+    ```
+    >>> ttp.get_reference_tables().version
+    '4f0c9c1b6a2e8d53'
+    >>> ttp.refresh_reference_tables("/path/to/new/tamis/exports", from_txt=True).version
+    '91d2e07f3c5ab816'
+    ```
+    """
+
+    global _reference_tables
+
+    if from_txt:
+        # Imported here as the .txt exports are only needed when the packaged tables are rebuilt
+        import extra_tamis_processors
+
+        tables, _ = extra_tamis_processors.clean_ref_txt_files(
+            "ref_files" if ref_dir is None else ref_dir
+        )
+    elif ref_dir is None:
+        tables = [pull_ref_info("ref_files", f"{name}.csv") for name in REFERENCE_FILES]
+    else:
+        tables = [
+            pl.read_csv(Path(ref_dir) / f"{name}.csv") for name in REFERENCE_FILES
+        ]
+
+    source = "packaged" if ref_dir is None else str(ref_dir)
+    source = f"{source} ({'txt' if from_txt else 'csv'})"
+    reference_tables = _build_reference_tables(*tables, source=source)
+
+    with _reference_tables_lock:
+        _reference_tables = reference_tables
+
+    return reference_tables
+
+
+def get_reference_tables() -> TCEQReferenceTables:
+    """
+    Returns the process-wide reference tables, loading the packaged tables on first use.
+    """
+
+    if _reference_tables is None:
+        # Re-entrant lock, so concurrent first readers wait for a single load
+        with _reference_tables_lock:
+            if _reference_tables is None:
+                return refresh_reference_tables()
+
+    return _reference_tables
+
+
 def get_clean_reference_info() -> tuple:
     """
-    Pulls in TAMIS parameter, unit, and site codes for labeling raw TAMIS data"""
+    Pulls in TAMIS parameter, unit, and site codes for labeling raw TAMIS data.
+    The tables are only read once per process -- see `get_reference_tables`."""
+
+    reference_tables = get_reference_tables()
+
+    return reference_tables.parameters, reference_tables.units, reference_tables.sites
+
+
+def get_reference_version() -> str:
+    """
+    Short hash of the reference tables in use. Changes whenever any of the tables are updated.
+    """
+
+    return get_reference_tables().version
+
+
+def label_tceq_codes(
+    df: pl.DataFrame | pl.LazyFrame, reference_tables: TCEQReferenceTables = None
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Adds "Parameter Name", "Unit Abbr", and "Site Name" columns by mapping the code columns through the
+    reference tables. Records whose parameter, unit, or site code is not in the tables are dropped.
+    Labels are categoricals, so each distinct label is only stored once.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Unformatted TAMIS records with "Parameter Cd", "Unit Cd", and "Site ID" columns
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        Labelled records, of the same type as df
+    """
+
+    if reference_tables is None:
+        reference_tables = get_reference_tables()
+
+    labels = {
+        "Parameter Name": ("Parameter Cd", reference_tables.parameter_names),
+        "Unit Abbr": ("Unit Cd", reference_tables.unit_abbrs),
+        "Site Name": ("Site ID", reference_tables.site_names),
+    }
+
+    with tamis_instrument.stage("label codes", df) as stage:
+        df = df.with_columns(
+            pl.col(code_column)
+            .replace_strict(mapping, default=None, return_dtype=pl.Categorical)
+            .alias(label)
+            for label, (code_column, mapping) in labels.items()
+        )
+
+        return stage.output(df.drop_nulls(list(labels)))
+
+
+def _as_list(values) -> list:
+    """Allow a single value wherever a list of values is accepted"""
+    if isinstance(values, (str, int)):
+        return [values]
+    return list(values)
+
+
+def _datetime_bound(value: datetime, time_zone: str | None) -> pl.Expr:
+    """Literal for comparing against the Datetime column. Naive bounds are read in the column's timezone"""
+    bound = pl.lit(value)
+    if time_zone is not None and getattr(value, "tzinfo", None) is None:
+        bound = bound.dt.replace_time_zone(time_zone)
+    elif time_zone is not None:
+        bound = bound.dt.convert_time_zone(time_zone)
+    return bound
+
+
+def filter_tceq(
+    df: pl.DataFrame | pl.LazyFrame,
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Filters unformatted TAMIS records (e.g. from `scan_tceq`) by parameter code, site ID, POC, and datetime range.
+    When given a LazyFrame the filters are pushed down to the CSV scan.
+
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Unformatted TAMIS records with "Parameter Cd", "Site ID", "POC", and "Datetime" columns
+
+    parameter_codes: int | list[int]
+        AQS parameter code(s) to keep (e.g. 43202 for ethane). Default: None (keep all)
+
+    site_ids: int | list[int]
+        TCEQ site ID(s) (CAMS number) to keep. Default: None (keep all)
+
+    pocs: int | str | list[int | str]
+        Parameter occurrence code(s) to keep, e.g. 1 or "01". Default: None (keep all)
+
+    start: datetime
+        Keep records at or after start. Naive datetimes are read in the timezone of the "Datetime" column.
+        Default: None
+
+    end: datetime
+        Keep records before end. Naive datetimes are read in the timezone of the "Datetime" column.
+        Default: None
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        Filtered records, of the same type as df
+    """
+
+    predicates = []
+    if parameter_codes is not None:
+        predicates.append(pl.col("Parameter Cd").is_in(_as_list(parameter_codes)))
+    if site_ids is not None:
+        predicates.append(pl.col("Site ID").is_in(_as_list(site_ids)))
+    if pocs is not None:
+        # POC is a categorical code as written in the report (usually zero-padded, e.g. "01")
+        poc_codes = {str(poc) for poc in _as_list(pocs)}
+        poc_codes |= {poc.zfill(2) for poc in poc_codes}
+        predicates.append(pl.col("POC").is_in(sorted(poc_codes)))
+
+    if start is not None or end is not None:
+        time_zone = df.collect_schema()["Datetime"].time_zone
+        if start is not None:
+            predicates.append(pl.col("Datetime") >= _datetime_bound(start, time_zone))
+        if end is not None:
+            predicates.append(pl.col("Datetime") < _datetime_bound(end, time_zone))
+
+    if not predicates:
+        return df
+
+    return df.filter(*predicates)
+
+
+def format_tceq_data(
+    df: pl.DataFrame | pl.LazyFrame, reference_tables: TCEQReferenceTables = None
+) -> pl.DataFrame:
+    """
+    Pivots unformatted TAMIS records to wide format, with one column per measurement series labelled with
+    parameter and unit names. See `pivot_tceq_long`.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Unformatted TAMIS records, e.g. from `read_and_extract_tceq_data_to_unformatted_df` or `scan_tceq`.
+        LazyFrames are only collected for the pivot, so any filters on them are applied first.
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.Dataframe
+        polars dataframe in wide format containing TAMIS records with descriptive column names
+    """
+
+    return pivot_tceq_long(df, reference_tables=reference_tables)
+
+
+def format_tceq_long(
+    df: pl.DataFrame | pl.LazyFrame, reference_tables: TCEQReferenceTables = None
+) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Labels unformatted TAMIS records with parameter, unit, and site names and keeps them in long format
+    (one row per measurement) with the columns in `LONG_FORMAT_COLUMNS`, followed by "Qual Mask" if the
+    records were read with `qualifier_mask=True`.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Unformatted TAMIS records, e.g. from `read_and_extract_tceq_data_to_unformatted_df` or `scan_tceq`
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.DataFrame | pl.LazyFrame
+        Labelled records in long format, of the same type as df
+    """
+
+    df = label_tceq_codes(df, reference_tables=reference_tables)
+
+    # Columns that were dropped for being all null are left out
+    columns = df.collect_schema().names()
+    return df.select(
+        column
+        for column in LONG_FORMAT_COLUMNS + [tamis_qualifiers.QUALIFIER_MASK_COLUMN]
+        if column in columns
+    )
+
+
+def wide_column_labels(
+    series: pl.DataFrame, reference_tables: TCEQReferenceTables = None
+) -> pl.DataFrame:
+    """
+    Labels measurement series (unique `SERIES_COLUMNS` rows) as "TCEQ <Parameter Name> (<Unit Abbr>)".
+
+    When a parameter and unit are measured by more than one instrument or averaged over more than one
+    duration, the labels are made unique by adding the POC and/or duration code that differ, e.g.
+    "TCEQ Ozone (ppb) [POC 02]" or "TCEQ Ozone (ppb) [POC 01, Dur 1]".
+
+
+    Parameters
+    -----------
+    series: pl.DataFrame
+        Unique "Parameter Cd", "POC", "Dur Cd", and "Unit Cd" rows
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.DataFrame
+        series with a "Column_Name" column. Series whose parameter or unit code is not in the reference
+        tables are dropped.
+    """
+
+    if reference_tables is None:
+        reference_tables = get_reference_tables()
+
+    series = series.with_columns(
+        (
+            "TCEQ "
+            + pl.col("Parameter Cd").replace_strict(
+                reference_tables.parameter_names, default=None, return_dtype=pl.String
+            )
+            + " ("
+            + pl.col("Unit Cd").replace_strict(
+                reference_tables.unit_abbrs, default=None, return_dtype=pl.String
+            )
+            + ")"
+        ).alias("Column_Name")
+    ).drop_nulls("Column_Name")
+
+    # Only name the codes that actually tell colliding series apart
+    suffixes = [
+        pl.when(pl.col(code).n_unique().over("Column_Name") > 1).then(
+            pl.lit(f"{name} ") + pl.col(code).cast(pl.String)
+        )
+        for code, name in [("POC", "POC"), ("Dur Cd", "Dur")]
+    ]
+    suffix = pl.concat_str(suffixes, separator=", ", ignore_nulls=True)
+
+    return series.with_columns(
+        pl.when(suffix != "")
+        .then(pl.col("Column_Name") + " [" + suffix + "]")
+        .otherwise(pl.col("Column_Name"))
+    )
+
+
+def pivot_tceq_long(
+    df: pl.DataFrame | pl.LazyFrame, reference_tables: TCEQReferenceTables = None
+) -> pl.DataFrame:
+    """
+    Pivots TAMIS records in long format (e.g. from `scan_tceq` or `format_tceq_long`) to wide format, with
+    one "TCEQ <Parameter Name> (<Unit Abbr>)" column per measurement series.
+
+    Records are pivoted on their codes (parameter, POC, duration, and unit), so instruments with different
+    POCs or averaging times are never mixed in one column. Column names are built afterwards from the few
+    unique series (see `wide_column_labels`), and site names from the site IDs.
+
+    Parameters
+    -----------
+    df: pl.DataFrame | pl.LazyFrame
+        Records with "Datetime", "Site ID", "Parameter Cd", "POC", "Dur Cd", "Unit Cd", and "Value" columns
+
+    reference_tables: TCEQReferenceTables
+        Default: None (`get_reference_tables()`)
+
+
+    Returns
+    ---------
+    pl.Dataframe
+        polars dataframe in wide format containing TAMIS records with descriptive column names
+    """
+
+    if reference_tables is None:
+        reference_tables = get_reference_tables()
+
+    # Records from sites missing from the reference tables are dropped, as when labelling them
+    lf = df.lazy().filter(pl.col("Site ID").is_in(list(reference_tables.site_names)))
+
+    # For a lazily scanned report, the CSV parse and datetime conversion run inside the "unique series"
+    # and "join column keys" collects
+    with tamis_instrument.stage("unique series", df) as stage:
+        series = stage.output(
+            lf.select(SERIES_COLUMNS).unique(maintain_order=True).collect()
+        )
+    with tamis_instrument.stage("column labels", series) as stage:
+        series = stage.output(
+            wide_column_labels(series, reference_tables).with_row_index("Column Key")
+        )
+
+    # Pivot on a small integer key rather than a label string built for every record
+    with tamis_instrument.stage("join column keys", df) as stage:
+        df_keyed = stage.output(
+            lf.join(
+                series.lazy().select(*SERIES_COLUMNS, "Column Key"),
+                on=SERIES_COLUMNS,
+                how="inner",
+                maintain_order="left",
+            )
+            .select("Datetime", "Site ID", "Column Key", "Value")
+            .collect()
+        )
 
-    # Grab TCEQ param, units, and site_info filepaths relative to this script, then read in
-    TCEQ_parameter_codes_fpath = rf"tceq_parameters.csv"
-    TCEQ_unit_codes_fpath = rf"tceq_units.csv"
-    TCEQ_site_info_codes_fpath = rf"tceq_site_locations.csv"
+    with tamis_instrument.stage("pivot", df_keyed) as stage:
+        df_clean_piv = stage.output(
+            df_keyed.pivot(
+                on="Column Key", index=["Datetime", "Site ID"], values="Value"
+            ).rename(
+                dict(
+                    zip(
+                        series["Column Key"].cast(pl.String),
+                        series["Column_Name"].to_list(),
+                    )
+                )
+            )
+        )
+
+    # Attach site names for the pivoted rows only
+    with tamis_instrument.stage("site names", df_clean_piv) as stage:
+        return stage.output(
+            df_clean_piv.select(
+                "Datetime",
+                pl.col("Site ID")
+                .replace_strict(reference_tables.site_names, return_dtype=pl.String)
+                .alias("Site Name"),
+                pl.exclude("Datetime"),
+            )
+        )
 
-    tceq_param_codes = pull_ref_info("ref_files", TCEQ_parameter_codes_fpath)
-    tceq_unit_codes = pull_ref_info("ref_files", TCEQ_unit_codes_fpath)
-    tceq_site_info_codes = pull_ref_info("ref_files", TCEQ_site_info_codes_fpath)
 
-    return tceq_param_codes, tceq_unit_codes, tceq_site_info_codes
+def _unit_targets(normalize_units: bool | dict) -> dict | None:
+    """Unit targets of the normalize_units argument: True for the defaults, or a Unit Type -> Unit Cd dict"""
+    return None if normalize_units is True else normalize_units
 
 
 def read_tceq_to_pl_dataframe(
-    filepath: str | Path,
+    filepath: str | Path | bytes | BinaryIO,
     tzone_in: str = "Etc/GMT+6",
     tzone_out: str = "Etc/GMT+6",
     save: bool = False,
     saved_file_type: str = "csv",
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    cache_dir: str | Path = None,
+    dataset_dir: str | Path = None,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+    qualifier_mask: bool = False,
+    output: str = "wide",
+    use_index: bool = False,
+    normalize_units: bool | dict = False,
+    cache_max_bytes: int = None,
+    cache_hash_contents: bool = False,
     **kwargs,
 ) -> pl.DataFrame:
     """
@@ -489,9 +1667,10 @@ def read_tceq_to_pl_dataframe(
 
     Parameters
     -----------
-    filepath: str | Path
+    filepath: str | Path | bytes | BinaryIO
         filepath or Path (e.g. returned from pathlib.Path()) to TAMIS
-        report to read and process
+        report to read and process. Compressed reports (.gz, .bz2, .xz, .zst), zip archives, zip archive members
+        ("bundle.zip/report.txt"), and in-memory reports are read directly, see `tamis_io.open_report`.
 
     tzone_in: str
         Timezone code for date and times being read in. TCEQ TAMIS data is presented in LST.
@@ -507,9 +1686,71 @@ def read_tceq_to_pl_dataframe(
         Default: False
 
     saved_file_type:
-        Options: "parquet" or "csv"
+        Options: "parquet", "csv", or "dataset"
         Save file as either csv or parquet (.gzip) file format. Parquet maintains datetime information precluding the need to
         do any datetime conversions after reading in the data to polars or pandas later.
+        "dataset" appends the data to a hive-partitioned Parquet dataset (Site ID / Year / Month) in dataset_dir
+        instead of writing a file next to the report. See `tamis_store.write_tceq_dataset`.
+
+    parameter_codes, site_ids, pocs, start, end:
+        Optional filters applied before the data is labelled and pivoted. Only matching rows are parsed.
+        See `filter_tceq`.
+        Default: None (keep all records)
+
+    cache_dir: str | Path
+        Opt-in on-disk cache of processed reports. If given, the processed frame is stored in cache_dir as
+        Arrow IPC, keyed on the report's path, size, and modification time plus every argument that changes
+        the output (including the reference table version). Later calls with the same inputs memory-map the
+        cached frame instead of re-parsing the report. See `tamis_cache` to inspect, cap, or clear the cache.
+        Reports passed as bytes or streams are not cached.
+        Default: None (no caching)
+
+    dataset_dir: str | Path
+        Root directory of the dataset written when saved_file_type is "dataset".
+        Default: None ("tamis_dataset" in the same directory as the report)
+
+    value_dtype: pl.DataType
+        dtype of the values. Pass pl.Float32 to halve the memory used by values. See `aqs_rd_schema`.
+        Default: None (pl.Float64)
+
+    schema_overrides: dict
+        column name -> dtype, replacing the dtypes from `aqs_rd_schema` for those columns.
+        Default: None
+
+    qualifier_mask: bool
+        Keep each record's qualifier codes as a UInt64 "Qual Mask" column (long output only; wide output has
+        values only). Filter on it with `tamis_qualifiers.has_any_qualifier`.
+        Default: False
+
+    output: str
+        Options: "wide" or "long"
+        "wide" pivots to one column per measurement series (see `pivot_tceq_long`).
+        "long" skips the pivot and returns one row per measurement with code and label columns
+        (see `format_tceq_long`). Much smaller than "wide" for pulls covering many sites and parameters.
+        Default: "wide"
+
+    use_index: bool
+        Parse only the blocks of the report that can hold records matching parameter_codes, site_ids, pocs,
+        start, and end, found with a sidecar index of the report's byte ranges (built on first use, and rebuilt
+        when the report changes). Much faster than a full parse for pulls of a few parameters from large
+        reports. Only uncompressed reports on disk are indexed. See `tamis_index`.
+        Default: False
+
+    normalize_units: bool | dict
+        Convert values to one unit per unit type before the pivot, so a parameter reported in different units
+        (e.g. Deg F and Deg C, or ppb C and ppbv) has a single column. True converts to the
+        `tamis_units.DEFAULT_UNIT_TARGETS` (Deg C, mph, ppbv, Millibars); a dict maps Unit Type -> target Unit Cd.
+        See `tamis_units.normalize_units`.
+        Default: False
+
+    cache_max_bytes: int
+        Size cap of cache_dir. The least recently used entries are evicted when a new entry pushes the cache over it.
+        Default: None (tamis_cache.DEFAULT_CACHE_MAX_BYTES, 2 GiB)
+
+    cache_hash_contents: bool
+        Key cache entries on a hash of the report's contents instead of its size and modification time, so copies
+        of a report share an entry and touched but unchanged reports still hit the cache. Hashing reads the report.
+        Default: False
 
     **kwargs: str
         Additional arguments passed to tzone conversion. See polars_convert_data_and_time_columns_to_datetime().
@@ -518,7 +1759,7 @@ def read_tceq_to_pl_dataframe(
     Returns
     ---------
     pl.Dataframe
-        polars dataframe in wide format containing TAMIS records with descriptive column names
+        polars dataframe in wide (or long) format containing TAMIS records with descriptive column names
 
 
     Example
@@ -596,51 +1837,422 @@ def read_tceq_to_pl_dataframe(
     ```
     """
 
-    # Extract unformatted data to dataframe
-    df = read_and_extract_tceq_data_to_unformatted_df(
-        filepath, tzone_in=tzone_in, tzone_out=tzone_out, **kwargs
-    )
+    if output not in ("wide", "long"):
+        raise ValueError(f'output must be "wide" or "long", not "{output}"')
+
+    with tamis_instrument.report(tamis_io.source_name(filepath)):
+        df_clean_piv = None
+        # Only reports on disk have a path and modification time to key the cache on
+        use_cache = cache_dir is not None and tamis_io.source_path(filepath) is not None
+        if use_cache:
+            key = tamis_cache.cache_key(
+                filepath,
+                hash_contents=cache_hash_contents,
+                tzone_in=tzone_in,
+                tzone_out=tzone_out,
+                parameter_codes=parameter_codes,
+                site_ids=site_ids,
+                pocs=pocs,
+                start=start,
+                end=end,
+                reference_version=get_reference_version(),
+                schema_version=AQS_RD_SCHEMA_VERSION,
+                value_dtype=value_dtype,
+                schema_overrides=schema_overrides,
+                qualifier_mask=qualifier_mask,
+                output=output,
+                normalize_units=normalize_units,
+                **kwargs,
+            )
+            with tamis_instrument.stage("cache load") as stage:
+                df_clean_piv = stage.output(tamis_cache.load_cached(cache_dir, key))
+
+        if df_clean_piv is None:
+            # Lazily scan the report so only the requested rows and columns are parsed
+            source = filepath
+            if use_index:
+                source = tamis_index.indexed_report(
+                    filepath,
+                    parameter_codes=parameter_codes,
+                    site_ids=site_ids,
+                    pocs=pocs,
+                    start=start,
+                    end=end,
+                    tzone_in=tzone_in,
+                    tzone_out=tzone_out,
+                )
+            lf = scan_tceq(
+                source,
+                tzone_in=tzone_in,
+                tzone_out=tzone_out,
+                value_dtype=value_dtype,
+                schema_overrides=schema_overrides,
+                qualifier_mask=qualifier_mask,
+                **kwargs,
+            )
+            lf = filter_tceq(
+                lf,
+                parameter_codes=parameter_codes,
+                site_ids=site_ids,
+                pocs=pocs,
+                start=start,
+                end=end,
+            )
+            if normalize_units:
+                lf = tamis_units.normalize_units(
+                    lf, targets=_unit_targets(normalize_units)
+                )
+
+            # Label with parameter, unit, and site names, and pivot to wide format unless long output is requested
+            if output == "long":
+                with tamis_instrument.stage("collect long", lf) as stage:
+                    df_clean_piv = stage.output(format_tceq_long(lf).collect())
+            else:
+                df_clean_piv = format_tceq_data(lf)
+
+            if use_cache:
+                with tamis_instrument.stage("cache store", df_clean_piv):
+                    tamis_cache.store_cached(
+                        cache_dir, key, df_clean_piv, max_bytes=cache_max_bytes
+                    )
+
+        # Saving functions
+        if save == True:
+            with tamis_instrument.stage("save", df_clean_piv):
+
+                # Compressed and archived reports are saved next to the file on disk, without the compression suffix
+                if saved_file_type == "csv":
+                    saved_path = tamis_io.output_path(filepath, ".csv")
+                    df_clean_piv.write_csv(saved_path)
+                    print(f"Processed file saved to: {saved_path}")
+
+                elif saved_file_type == "parquet":
+                    saved_path = tamis_io.output_path(filepath, ".gzip")
+                    df_clean_piv.write_parquet(saved_path)
+                    print(f"Processed file saved to: {saved_path}")
+
+                elif saved_file_type == "dataset":
+                    if dataset_dir is None:
+                        dataset_dir = (
+                            tamis_io.output_path(filepath, ".txt").parent
+                            / "tamis_dataset"
+                        )
+                    tamis_store.write_tceq_dataset(df_clean_piv, dataset_dir)
+                    print(f"Processed file saved to: {dataset_dir}")
 
-    # Get parameter codes
-    tceq_parameter_codes, tceq_unit_codes, tceq_site_info_codes = (
-        get_clean_reference_info()
-    )
+    return df_clean_piv
 
-    # Add parameter, unit, and location info to dataframe
-    df_w_params = df.join(tceq_parameter_codes, on="Parameter Cd", how="inner")
-    df_w_params_and_units = df_w_params.join(tceq_unit_codes, on="Unit Cd", how="inner")
-    df_w_params_and_units_and_location = df_w_params_and_units.join(
-        tceq_site_info_codes, on="Site ID", how="inner"
-    )
 
-    # Create new column that merges parameter name with units for pivoting
-    df_w_params_and_units_and_location = (
-        df_w_params_and_units_and_location.with_columns(
-            (
-                "TCEQ " + pl.col("Parameter Name") + " (" + pl.col("Unit Abbr") + ")"
-            ).alias("Column_Name")
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        pandas = None
+    # polars converts to pandas through pyarrow, which only has to be installed here
+    if pandas is None or importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(
+            "pandas output needs pandas and pyarrow: pip install tceq_tamis_processor[pandas]"
         )
-    )
+    return pandas
+
+
+def to_pd_dataframe(df: pl.DataFrame, arrow_dtypes: bool = True) -> pd.DataFrame:
+    """
+    Converts processed TAMIS records to a pandas DataFrame.
+
+    Parameters
+    -----------
+    df: pl.DataFrame
+        e.g. output of `read_tceq_to_pl_dataframe` or `read_tceq_many`
+
+    arrow_dtypes: bool
+        Back every column with its polars Arrow memory (`pd.ArrowDtype`) rather than copying it into NumPy
+        blocks. Numeric and datetime columns and the codes of categorical columns are shared with df, not copied,
+        so the conversion adds almost no memory. Datetimes keep their timezone, and categorical columns stay
+        dictionary-encoded with the same codes. False gives NumPy-backed columns (`pl.DataFrame.to_pandas()`),
+        which copies every column.
+        Default: True
+
+
+    Returns
+    ---------
+    pd.DataFrame
 
-    # Pivot rows to column format
-    df_clean = df_w_params_and_units_and_location.select(
-        pl.col("Value", "Column_Name", "Datetime", "Site Name", "Site ID")
-    )
 
-    # Pivot data to long format
-    df_clean_piv = df_clean.pivot(
-        index=["Datetime", "Site Name", "Site ID"], values="Value", on="Column_Name"
+    Example
+    --------
+    ```
+    >>> pdf = ttp.to_pd_dataframe(ttp.read_tceq_many("/data/tamis/*.txt", output="long"))
+    >>> pdf.dtypes
+    Datetime      timestamp[us, tz=Etc/GMT+6][pyarrow]
+    Site ID                             int32[pyarrow]
+    Site Name     dictionary<values=large_string, indices=uint32, ordered=0>[pyarrow]
+    ...
+    ```
+    """
+
+    pd = _pandas()
+    if not arrow_dtypes:
+        return df.to_pandas()
+
+    # Wrap the Arrow arrays polars exports, rather than `to_pandas(use_pyarrow_extension_array=True)`,
+    # which widens categorical codes to int64
+    table = df.to_arrow()
+    return pd.DataFrame(
+        {
+            name: pd.arrays.ArrowExtensionArray(column)
+            for name, column in zip(table.column_names, table.columns)
+        },
+        copy=False,
     )
 
-    # Saving functions
-    if save == True:
 
-        if saved_file_type == "csv":
-            df_clean_piv.write_csv(Path(filepath).with_suffix(".csv"))
-            print(f"Processed file saved to: {Path(filepath).with_suffix(".csv")}")
+def read_tceq_to_pd_dataframe(
+    filepath: str | Path | bytes | BinaryIO, arrow_dtypes: bool = True, **kwargs
+) -> pd.DataFrame:
+    """
+    Reads a TAMIS report into a pandas DataFrame. `read_tceq_to_pl_dataframe` followed by `to_pd_dataframe`,
+    so by default the columns are Arrow-backed and share the memory of the processed records instead of
+    doubling it with a copy.
+
+    Parameters
+    -----------
+    filepath: str | Path | bytes | BinaryIO
+        See `read_tceq_to_pl_dataframe`
 
-        elif saved_file_type == "parquet":
-            df_clean_piv.write_parquet(Path(filepath).with_suffix(".gzip"))
-            print(f"Processed file saved to: {Path(filepath).with_suffix(".gzip")}")
+    arrow_dtypes: bool
+        See `to_pd_dataframe`.
+        Default: True
 
-    return df_clean_piv
+    **kwargs:
+        Passed to `read_tceq_to_pl_dataframe` (timezones, filters, output, ...)
+
+
+    Returns
+    ---------
+    pd.DataFrame
+        The records of `read_tceq_to_pl_dataframe`, in wide (or long) format
+
+
+    Example
+    --------
+    ```
+    >>> pdf = ttp.read_tceq_to_pd_dataframe(filepath, parameter_codes=[43202, 61103, 61104])
+    >>> pdf["TCEQ Ethane (ppbv)"].dtype
+    double[pyarrow]
+    >>> pdf = ttp.read_tceq_to_pd_dataframe(filepath, arrow_dtypes=False)   # NumPy-backed copy
+    ```
+    """
+
+    # Fail before the report is read if pandas is missing
+    _pandas()
+    df = read_tceq_to_pl_dataframe(filepath, **kwargs)
+    with tamis_instrument.stage("to pandas", df):
+        return to_pd_dataframe(df, arrow_dtypes=arrow_dtypes)
+
+
+def resolve_tceq_paths(paths_or_glob: str | Path | list) -> list[Path]:
+    """
+    Expands a glob pattern, a directory, a single filepath, or a list of any of these into a sorted list of
+    TAMIS report filepaths. Directories are expanded to the report files they contain (.txt, compressed .txt,
+    and .zip, see `tamis_io.REPORT_PATTERNS`), and zip archives to the paths of their members
+    ("bundle.zip/report.txt").
+
+    Parameters
+    -----------
+    paths_or_glob: str | Path | list
+        e.g. "/data/tamis/2025_*.txt", Path("/data/tamis"), or ["a.txt", "b.txt"]
+
+
+    Returns
+    ---------
+    list[Path]
+        Sorted, de-duplicated filepaths
+    """
+
+    if isinstance(paths_or_glob, (str, Path)):
+        paths_or_glob = [paths_or_glob]
+
+    filepaths = set()
+    for entry in paths_or_glob:
+        entry = Path(entry)
+        if entry.is_dir():
+            for pattern in tamis_io.REPORT_PATTERNS:
+                filepaths.update(entry.glob(pattern))
+        elif glob.has_magic(str(entry)):
+            filepaths.update(Path(match) for match in glob.glob(str(entry)))
+        else:
+            filepaths.add(entry)
+
+    # Archives are expanded to the reports they hold
+    expanded = set()
+    for filepath in filepaths:
+        if filepath.suffix.lower() == ".zip" and zipfile.is_zipfile(filepath):
+            expanded.update(tamis_io.zip_members(filepath))
+        else:
+            expanded.add(filepath)
+
+    return sorted(expanded)
+
+
+def read_tceq_many(
+    paths_or_glob: str | Path | list,
+    workers: int = None,
+    tzone_in: str = "Etc/GMT+6",
+    tzone_out: str = "Etc/GMT+6",
+    parameter_codes: int | list[int] = None,
+    site_ids: int | list[int] = None,
+    pocs: int | list[int] = None,
+    start: datetime = None,
+    end: datetime = None,
+    value_dtype: pl.DataType = None,
+    schema_overrides: dict = None,
+    qualifier_mask: bool = False,
+    output: str = "wide",
+    use_index: bool = False,
+    normalize_units: bool | dict = False,
+    **kwargs,
+) -> pl.DataFrame:
+    """
+    Reads many TAMIS reports concurrently and combines them into a single wide polars dataframe.
+
+    Reports are parsed in a thread pool (polars releases the GIL while parsing), the reference tables are
+    loaded once, and all records are pivoted together so the output has one consistent set of columns even
+    when the reports hold different parameters. Records repeated across reports (e.g. re-downloads of
+    overlapping date windows) are de-duplicated on site, parameter, POC, duration, unit, and datetime, keeping
+    the value from the report with the latest run date. With normalize_units, records in different units are the
+    same measurement, and the unit is left out of the key.
+
+
+    Parameters
+    -----------
+    paths_or_glob: str | Path | list
+        Glob pattern, directory, filepath, or list of these. See `resolve_tceq_paths`.
+
+    workers: int
+        Number of reports parsed at the same time.
+        Default: None (ThreadPoolExecutor default, based on the number of CPUs)
+
+    tzone_in, tzone_out, parameter_codes, site_ids, pocs, start, end, value_dtype, schema_overrides, qualifier_mask, output, use_index, normalize_units:
+        See `read_tceq_to_pl_dataframe`
+
+    **kwargs: str
+        Date and time format arguments (DATETIME_ARGUMENTS: date_column, date_format, time_column, time_format)
+        passed to `polars_convert_date_and_time_columns_to_datetime`. The other arguments of
+        `read_tceq_to_pl_dataframe` (save, cache_dir, ...) apply to single reports and raise a TypeError; save
+        or cache the combined frame instead.
+
+
+    Returns
+    ---------
+    pl.Dataframe
+        polars dataframe in wide (or long) format containing TAMIS records from all reports, sorted by site and datetime
+
+
+    Example
+    --------
+    ```
+    >>> df = ttp.read_tceq_many("/data/tamis/*.txt", workers=8, parameter_codes=[43202, 61103, 61104])
+    ```
+    """
+
+    if output not in ("wide", "long"):
+        raise ValueError(f'output must be "wide" or "long", not "{output}"')
+    unsupported = sorted(set(kwargs) - set(DATETIME_ARGUMENTS))
+    if unsupported:
+        raise TypeError(
+            f"read_tceq_many() got unsupported arguments {unsupported}. Only the date and time format "
+            f"arguments {list(DATETIME_ARGUMENTS)} are passed on to each report."
+        )
+
+    # Columns taken from the latest run of each record
+    record_columns = ["Unit Cd", "Value"]
+    if output == "long":
+        record_columns = ["Unit Cd", "Meth Cd", "Value", "Null Data Cd"]
+        if qualifier_mask:
+            record_columns.append(tamis_qualifiers.QUALIFIER_MASK_COLUMN)
+
+    filepaths = resolve_tceq_paths(paths_or_glob)
+    if not filepaths:
+        raise FileNotFoundError(f"No TAMIS reports found matching {paths_or_glob}")
+
+    reference_tables = get_reference_tables()
+
+    def read_one(filepath):
+        with tamis_instrument.report(tamis_io.source_name(filepath)):
+            preamble = read_tceq_preamble(filepath)
+            source = filepath
+            if use_index:
+                source = tamis_index.indexed_report(
+                    filepath,
+                    parameter_codes=parameter_codes,
+                    site_ids=site_ids,
+                    pocs=pocs,
+                    start=start,
+                    end=end,
+                    tzone_in=tzone_in,
+                    tzone_out=tzone_out,
+                    preamble=preamble,
+                )
+            lf = scan_tceq(
+                source,
+                tzone_in=tzone_in,
+                tzone_out=tzone_out,
+                preamble=preamble,
+                value_dtype=value_dtype,
+                schema_overrides=schema_overrides,
+                qualifier_mask=qualifier_mask,
+                **kwargs,
+            )
+            lf = filter_tceq(
+                lf,
+                parameter_codes=parameter_codes,
+                site_ids=site_ids,
+                pocs=pocs,
+                start=start,
+                end=end,
+            )
+            with tamis_instrument.stage("read report", lf) as stage:
+                df = stage.output(
+                    lf.select(
+                        "Datetime",
+                        "Site ID",
+                        "Parameter Cd",
+                        "POC",
+                        "Dur Cd",
+                        *record_columns,
+                    ).collect()
+                )
+        return df.with_columns(
+            pl.lit(preamble.run_date, dtype=pl.Datetime("us")).alias("Run Date")
+        )
+
+    # Every report is read with the same schema, so they stack without casts
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        df = pl.concat(executor.map(read_one, filepaths))
+
+    # Keep the value from the latest run of any repeated record. Grouping with maintain_order keeps records
+    # (and so the output columns) in the order they first appear across the reports. Without unit
+    # normalization, records in different units go to different columns and are kept apart.
+    record_key = tamis_store.record_key(normalize_units)
+    latest_columns = [column for column in record_columns if column not in record_key]
+    with tamis_instrument.stage("deduplicate", df) as stage:
+        df = stage.output(
+            df.group_by(record_key, maintain_order=True).agg(
+                pl.col(latest_columns).sort_by("Run Date", maintain_order=True).last()
+            )
+        )
+
+    if normalize_units:
+        df = tamis_units.normalize_units(
+            df,
+            targets=_unit_targets(normalize_units),
+            reference_tables=reference_tables,
+        )
+
+    if output == "long":
+        df_clean_piv = format_tceq_long(df, reference_tables=reference_tables)
+    else:
+        df_clean_piv = format_tceq_data(df, reference_tables=reference_tables)
+
+    return df_clean_piv.sort("Site ID", "Datetime")
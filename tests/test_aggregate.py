@@ -0,0 +1,134 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_aggregate
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from importlib import resources
+
+
+def tceq_monthly_summary(name: str, column: str) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """
+    Hourly values (in the wide format of `read_tceq_to_pl_dataframe`) and daily summary columns of a TCEQ
+    monthly summary page. Hours with a status code (e.g. "PMA", "LIM") instead of a value are null.
+    """
+
+    with resources.path("test_data", name) as test_file:
+        page = pl.read_csv(test_file, infer_schema=False)
+
+    day = pl.col("Date").str.to_date("%m/%d/%Y").cast(pl.Datetime("us"))
+    hours = [f"{hour:02d}:00" for hour in range(24)]
+    hourly = (
+        page.unpivot(index="Date", on=hours, variable_name="Hour", value_name=column)
+        .select(
+            (day + pl.duration(hours=pl.col("Hour").str.head(2).cast(pl.Int64)))
+            .dt.replace_time_zone("Etc/GMT+6")
+            .alias("Datetime"),
+            pl.lit(1070, dtype=pl.Int32).alias("Site ID"),
+            pl.lit("Karnes County").alias("Site Name"),
+            pl.col(column).cast(pl.Float64, strict=False),
+        )
+        .sort("Datetime")
+    )
+    summary = page.select(
+        day.dt.replace_time_zone("Etc/GMT+6").alias("Datetime"),
+        pl.col("Max", "SH", "Min", "Cap").cast(pl.Float64),
+    )
+    return hourly, summary
+
+
+def test_daily_summary_matches_tceq():
+    """
+    Test if the daily maxima, second highs, minima, and data capture match the TCEQ monthly summary pages
+    """
+
+    for name, column in [
+        (
+            "october_2023_resultant_wind_speed_from_tceq_for_comparison.csv",
+            "TCEQ Wind Speed - Resultant (mph)",
+        ),
+        (
+            "october_2023_resultant_wind_direction_from_tceq_for_comparison.csv",
+            "TCEQ Wind Direction - Resultant (deg)",
+        ),
+    ]:
+        hourly, tceq = tceq_monthly_summary(name, column)
+        daily = tamis_aggregate.summarize(hourly.lazy(), every="1d").collect()
+
+        # The page rounds the 23:00 direction of 10/14 (>= 359.5 degrees) to 0, but its Max of 360 is unrounded
+        if "Direction" in column:
+            october_14 = pl.col("Datetime").dt.day() == 14
+            daily, tceq = daily.filter(~october_14), tceq.filter(~october_14)
+
+        assert daily["Series"].unique().to_list() == [column]
+        assert daily["Complete"].all()
+        ptesting.assert_frame_equal(
+            daily.select(
+                "Datetime",
+                pl.col("Max"),
+                pl.col("Second Max").alias("SH"),
+                pl.col("Min"),
+                pl.col("Coverage (%)").round(1).alias("Cap"),
+            ),
+            tceq,
+        )
+
+
+def test_completeness_and_rolling_means():
+    """
+    Test if incomplete periods and windows are masked, and if the 8-hour means and their daily maxima
+    are computed per series across long and wide input
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file)
+        df_long = pt.read_tceq_to_pl_dataframe(test_file, output="long")
+
+    ethane = df.select("Datetime", "Site ID", "Site Name", "TCEQ Ethane (ppbv)")
+    hourly = ethane.drop_nulls("TCEQ Ethane (ppbv)")
+
+    # Wide and long input give the same statistics
+    daily = tamis_aggregate.summarize(ethane)
+    daily_long = tamis_aggregate.summarize(
+        df_long.filter(pl.col("Parameter Cd") == 43202)
+    )
+    ptesting.assert_frame_equal(
+        daily.select(tamis_aggregate.SUMMARY_COLUMNS),
+        daily_long.select(tamis_aggregate.SUMMARY_COLUMNS),
+    )
+    assert daily["Count"].sum() == hourly.height
+    assert (daily["Complete"] == (daily["Count"] >= 18)).all()
+    assert daily.filter(~pl.col("Complete"))["Mean"].is_null().all()
+
+    # The month holds only part of April, so it is incomplete unless the rule is relaxed
+    assert not tamis_aggregate.summarize(ethane, every="1mo")["Complete"].any()
+    monthly = tamis_aggregate.summarize(ethane, every="1mo", min_coverage=0.3)
+    assert monthly["Mean"].item() == pytest.approx(hourly["TCEQ Ethane (ppbv)"].mean())
+
+    # 8-hour means start at each record, and need 6 of their 8 hours
+    eight_hour = tamis_aggregate.rolling_mean(ethane)
+    start = hourly["Datetime"][10]
+    window = hourly.filter(
+        pl.col("Datetime").is_between(start, start + pl.duration(hours=7))
+    )
+    assert window.height >= 6
+    assert eight_hour.filter(pl.col("Datetime") == start)["Mean"].item() == (
+        pytest.approx(window["TCEQ Ethane (ppbv)"].mean())
+    )
+    assert (eight_hour.filter(pl.col("Count") < 6)["Mean"].is_null()).all()
+
+    mda8 = tamis_aggregate.daily_max_rolling_mean(ethane)
+    day = mda8.filter(pl.col("Complete"))["Datetime"][0]
+    assert mda8.filter(pl.col("Datetime") == day)["Max"].item() == (
+        eight_hour.filter(
+            (pl.col("Datetime").dt.truncate("1d") == day)
+            & pl.col("Datetime").dt.hour().is_between(7, 23)
+        )["Mean"].max()
+    )
+
+    assert tamis_aggregate.to_wide(daily).columns == [
+        "Datetime",
+        "Site ID",
+        "Site Name",
+        "TCEQ Ethane (ppbv)",
+    ]
@@ -0,0 +1,86 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_cache
+import polars.testing as ptesting
+from importlib import resources
+
+
+def test_cache_round_trip(tmp_path):
+    """
+    Test if a cached report is returned unchanged and only re-processed when the arguments change
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file, cache_dir=tmp_path)
+        assert tamis_cache.cache_info(tmp_path).height == 1
+
+        df_cached = pt.read_tceq_to_pl_dataframe(test_file, cache_dir=tmp_path)
+        assert tamis_cache.cache_info(tmp_path).height == 1
+        ptesting.assert_frame_equal(df, df_cached)
+
+        df_utc = pt.read_tceq_to_pl_dataframe(
+            test_file, tzone_out="UTC", cache_dir=tmp_path
+        )
+        assert tamis_cache.cache_info(tmp_path).height == 2
+        assert df_utc["Datetime"].dtype.time_zone == "UTC"
+
+    assert tamis_cache.clear_cache(tmp_path) == 2
+    assert tamis_cache.cache_info(tmp_path).is_empty()
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """
+    Test if the size cap evicts the least recently used entries first
+    """
+    import os
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file)
+
+    entry_size = None
+    for index, key in enumerate(["a", "b", "c"]):
+        entry = tamis_cache.store_cached(tmp_path, key, df)
+        entry_size = entry.stat().st_size
+        os.utime(entry, ns=(index * 10**9, index * 10**9))
+
+    # Reading "a" makes "b" the least recently used entry
+    tamis_cache.load_cached(tmp_path, "a")
+    tamis_cache.store_cached(tmp_path, "d", df, max_bytes=3 * entry_size)
+
+    assert sorted(tamis_cache.cache_info(tmp_path)["Key"]) == ["a", "c", "d"]
+
+
+def test_cache_options_and_in_memory_reports(tmp_path):
+    """
+    Test if the reader passes the size cap and content hashing to the cache, and skips the cache for reports
+    that are not on disk
+    """
+    import shutil
+
+    cache_dir = tmp_path / "cache"
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        copy = shutil.copy(test_file, tmp_path / "copy.txt")
+        df = pt.read_tceq_to_pl_dataframe(
+            test_file, cache_dir=cache_dir, cache_hash_contents=True
+        )
+        content = test_file.read_bytes()
+
+    # A copy of the report at another path has the same contents
+    df_copy = pt.read_tceq_to_pl_dataframe(
+        copy, cache_dir=cache_dir, cache_hash_contents=True
+    )
+    assert tamis_cache.cache_info(cache_dir).height == 1
+    ptesting.assert_frame_equal(df, df_copy)
+
+    # A cap below two entries keeps only the newest
+    entry_size = tamis_cache.cache_info(cache_dir)["Size (bytes)"].item()
+    pt.read_tceq_to_pl_dataframe(
+        copy, tzone_out="UTC", cache_dir=cache_dir, cache_max_bytes=entry_size + 1
+    )
+    assert tamis_cache.cache_info(cache_dir).height == 1
+
+    # Bytes have no path to key the cache on
+    tamis_cache.clear_cache(cache_dir)
+    df_bytes = pt.read_tceq_to_pl_dataframe(content, cache_dir=cache_dir)
+    ptesting.assert_frame_equal(df, df_bytes)
+    assert tamis_cache.cache_info(cache_dir).is_empty()
@@ -0,0 +1,88 @@
+# %%
+import gzip
+import os
+import tceq_tamis_processor as pt
+import tamis_catalog
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from datetime import datetime
+from importlib import resources
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """A directory with a full report, and a compressed report holding only the wind parameters"""
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        text = test_file.read_bytes()
+    (tmp_path / "2025_full.txt").write_bytes(text)
+
+    lines = text.splitlines(keepends=True)
+    wind = [line for line in lines[11:] if b",6110" in line]
+    (tmp_path / "2025_wind.txt.gz").write_bytes(
+        gzip.compress(b"".join(lines[:11] + wind))
+    )
+    return tmp_path
+
+
+def test_catalog_and_query(archive):
+    """
+    Test if the catalog lists the series of every report, and if queries return only the reports that hold them
+    """
+
+    catalog = tamis_catalog.build_tceq_catalog(archive)
+    assert catalog.columns == tamis_catalog.CATALOG_COLUMNS
+
+    records = pt.read_and_extract_tceq_data_to_unformatted_df(
+        archive / "2025_full.txt", tzone_in=None
+    )
+    full = catalog.filter(pl.col("Path") == str(archive / "2025_full.txt"))
+    assert full["Rows"].sum() == records.height
+    assert full["Parameter Cd"].n_unique() == records["Parameter Cd"].n_unique()
+    assert full["Measurements From"].unique().to_list() == [datetime(2025, 4, 7)]
+    assert full["Delimiter"].unique().to_list() == [","]
+
+    assert tamis_catalog.query_catalog(catalog, parameter_codes=43202) == [
+        archive / "2025_full.txt"
+    ]
+    assert tamis_catalog.query_catalog(catalog, parameter_codes=[61103, 61104]) == [
+        archive / "2025_full.txt",
+        archive / "2025_wind.txt.gz",
+    ]
+    assert tamis_catalog.query_catalog(catalog, site_ids=48) == []
+    assert tamis_catalog.query_catalog(catalog, start=datetime(2025, 4, 22)) == []
+
+    window = dict(
+        parameter_codes=61103, start=datetime(2025, 4, 8), end=datetime(2025, 4, 9)
+    )
+    ptesting.assert_frame_equal(
+        tamis_catalog.read_tceq_catalog(catalog, **window),
+        pt.read_tceq_many(archive, **window),
+    )
+
+
+def test_catalog_refresh(archive, tmp_path_factory):
+    """
+    Test if a saved catalog only rescans new and changed reports, and drops removed reports
+    """
+
+    catalog_path = tmp_path_factory.mktemp("catalog") / "catalog.parquet"
+    catalog = tamis_catalog.build_tceq_catalog(archive, catalog_path=catalog_path)
+    ptesting.assert_frame_equal(pl.read_parquet(catalog_path), catalog)
+
+    # A report with the same size and modification time is not rescanned
+    full = archive / "2025_full.txt"
+    stat = full.stat()
+    full.write_bytes(full.read_bytes().replace(b",43202,", b",43999,"))
+    os.utime(full, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    ptesting.assert_frame_equal(
+        tamis_catalog.build_tceq_catalog(archive, catalog_path=catalog_path), catalog
+    )
+
+    os.utime(full)
+    (archive / "2025_wind.txt.gz").unlink()
+    refreshed = tamis_catalog.build_tceq_catalog(archive, catalog_path=catalog_path)
+    assert refreshed["Path"].unique().to_list() == [str(full)]
+    assert 43999 in refreshed["Parameter Cd"]
+    assert 43202 not in refreshed["Parameter Cd"]
@@ -0,0 +1,66 @@
+# %%
+import os
+import shutil
+import tceq_tamis_processor as pt
+import tamis_cli
+import polars as pl
+import polars.testing as ptesting
+from importlib import resources
+
+
+def test_convert_skip_and_fail(tmp_path, capsys):
+    """
+    Test if reports are converted, up-to-date outputs (of the same options) are skipped, and failures (including colliding outputs)
+    set the exit code
+    """
+
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    for name in ("comma", "pipe"):
+        with resources.path(
+            "test_data", f"2025_kc_autogc_w_ws_wd_{name}.txt"
+        ) as test_file:
+            shutil.copy(test_file, reports)
+    out = tmp_path / "out"
+
+    assert tamis_cli.main([str(reports), "--out", str(out), "--jobs", "2"]) == 0
+    ptesting.assert_frame_equal(
+        pl.read_parquet(out / "2025_kc_autogc_w_ws_wd_comma.parquet"),
+        pt.read_tceq_to_pl_dataframe(reports / "2025_kc_autogc_w_ws_wd_comma.txt"),
+    )
+    assert "2 converted, 0 up to date, 0 failed" in capsys.readouterr().out
+
+    # Outputs converted with other options are not up to date
+    assert tamis_cli.main([str(reports), "--out", str(out), "--tz-out", "UTC"]) == 0
+    assert "2 converted, 0 up to date, 0 failed" in capsys.readouterr().out
+    df_utc = pl.read_parquet(out / "2025_kc_autogc_w_ws_wd_comma.parquet")
+    assert df_utc.schema["Datetime"].time_zone == "UTC"
+    assert tamis_cli.main([str(reports), "--out", str(out)]) == 0
+    assert "2 converted, 0 up to date, 0 failed" in capsys.readouterr().out
+
+    # Only the report that changed since it was converted is converted again
+    (reports / "bad.txt").write_text("not a TAMIS report\n")
+    os.utime(reports / "2025_kc_autogc_w_ws_wd_pipe.txt")
+    assert tamis_cli.main([f"{reports}/*.txt", "--out", str(out)]) == 1
+    captured = capsys.readouterr()
+    assert "1 converted, 1 up to date, 1 failed" in captured.out
+    assert "FAILED" in captured.err and "bad.txt" in captured.err
+    assert not list(out.glob("*.tmp"))
+
+    # Reports of the same name in different directories would overwrite each other's output
+    other = tmp_path / "other"
+    other.mkdir()
+    shutil.copy(reports / "2025_kc_autogc_w_ws_wd_pipe.txt", other)
+    modified = (out / "2025_kc_autogc_w_ws_wd_pipe.parquet").stat().st_mtime_ns
+    assert (
+        tamis_cli.main(
+            [f"{reports}/*pipe.txt", str(other), "--out", str(out), "--force"]
+        )
+        == 1
+    )
+    captured = capsys.readouterr()
+    assert "0 converted, 0 up to date, 2 failed" in captured.out
+    assert captured.err.count("is also the output of") == 2
+    assert (out / "2025_kc_autogc_w_ws_wd_pipe.parquet").stat().st_mtime_ns == modified
+
+    assert tamis_cli.main([str(tmp_path / "missing_*.txt")]) == 2
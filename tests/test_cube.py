@@ -0,0 +1,99 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_cube
+import numpy as np
+import polars as pl
+import pytest
+from importlib import resources
+
+
+def test_cube_matches_upsampled_wide_output():
+    """
+    Test if the cube of a report holds the same values as its wide output upsampled to hourly
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as test_file:
+        cube = tamis_cube.to_cube(test_file)
+        wide = pt.read_tceq_to_pl_dataframe(test_file)
+        preamble = pt.read_tceq_preamble(test_file)
+
+    # The time axis covers the measurement window, hourly
+    hours = (
+        preamble.measurements_to - preamble.measurements_from
+    ).total_seconds() // 3600
+    assert cube.values.shape == (1, len(cube.series), hours)
+    assert (
+        cube.times.dt.replace_time_zone(None).to_list()[0] == preamble.measurements_from
+    )
+    assert cube.sites == {1070: 0}
+
+    upsampled = (
+        wide.sort("Datetime")
+        .upsample("Datetime", every="1h", maintain_order=True)
+        .select("Datetime", "TCEQ Ethane (ppbv)")
+    )
+    ethane = pl.DataFrame(
+        {"Datetime": cube.times, "Cube": cube.values[0, cube.parameter_index(43202)]}
+    ).join(upsampled, on="Datetime", how="left")
+    assert (
+        ethane["Cube"].fill_nan(None).is_null()
+        == ethane["TCEQ Ethane (ppbv)"].is_null()
+    ).all()
+    assert np.allclose(
+        ethane["Cube"].fill_nan(None).drop_nulls().to_numpy(),
+        ethane["TCEQ Ethane (ppbv)"].drop_nulls().to_numpy(),
+    )
+
+    # Every valid value of the report is in the cube
+    assert (~cube.missing).sum() == wide.drop(
+        "Datetime", "Site ID", "Site Name"
+    ).count().sum_horizontal().item()
+    assert np.array_equal(cube.missing, np.isnan(cube.values))
+
+
+def test_memory_mapped_float32_cube(tmp_path):
+    """
+    Test if cubes of long-format records are saved to memory-mapped .npy files, and if time steps holding more
+    than one record are refused, as are records without bounds for the time grid
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as test_file:
+        records = pt.scan_tceq(test_file).filter(
+            pl.col("Parameter Cd").is_in([43202, 61103])
+        )
+        cube = tamis_cube.to_cube(records, dtype="float32", out=tmp_path / "cube.npy")
+        in_memory = tamis_cube.to_cube(
+            records.collect(), parameter_codes=[43202, 61103]
+        )
+
+    values = np.load(tmp_path / "cube.npy", mmap_mode="r")
+    missing = np.load(tamis_cube.missing_path(tmp_path / "cube.npy"), mmap_mode="r")
+    assert values.dtype == np.float32
+    assert (
+        values.shape
+        == missing.shape
+        == in_memory.values.shape
+        == (1, 2, cube.times.len())
+    )
+    assert np.array_equal(missing, in_memory.missing)
+    assert np.allclose(values, in_memory.values, equal_nan=True)
+    assert cube.series == in_memory.series
+
+    # The first and last records are at the ends of the time axis
+    assert cube.times.min() == records.select(pl.col("Datetime").min()).collect().item()
+    assert cube.times.max() == records.select(pl.col("Datetime").max()).collect().item()
+
+    with pytest.raises(ValueError, match="summarize"):
+        tamis_cube.to_cube(records, every="1d")
+
+    # No records: an empty cube over the requested grid, or no grid at all
+    empty = tamis_cube.to_cube(
+        records.collect(),
+        parameter_codes=99999,
+        start=cube.times.min(),
+        end=cube.times.max(),
+    )
+    assert empty.values.shape == (0, 0, cube.times.len() - 1)
+    assert empty.sites == empty.series == {}
+    with pytest.raises(ValueError, match="No records"):
+        tamis_cube.to_cube(records, parameter_codes=99999)
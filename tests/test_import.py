@@ -0,0 +1,45 @@
+# %%
+import json
+import subprocess
+import sys
+
+# Modules that should only be imported once data is actually read
+HEAVY_MODULES = ["polars.dataframe", "pandas", "pyarrow", "numpy"]
+
+
+def import_in_fresh_interpreter(module: str, repeat: int = 3) -> dict:
+    """Best import time of module in a new interpreter, and which heavy modules the import loaded"""
+
+    code = f"""
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+    return min(runs, key=lambda run: run["seconds"])
+
+
+def test_import_is_cheap():
+    """
+    Test if importing the processor and the CLI loads no heavy dependencies and is faster than importing polars
+    """
+
+    polars_import = import_in_fresh_interpreter("polars")
+    for module in ("tceq_tamis_processor", "tamis_cli"):
+        module_import = import_in_fresh_interpreter(module)
+        print(
+            f"import {module}: {module_import['seconds'] * 1000:.0f} ms "
+            f"(polars: {polars_import['seconds'] * 1000:.0f} ms)"
+        )
+
+        assert module_import["loaded"] == []
+        assert module_import["seconds"] < polars_import["seconds"]
@@ -0,0 +1,124 @@
+# %%
+import gzip
+import os
+import tceq_tamis_processor as pt
+import tamis_index
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from datetime import datetime
+from importlib import resources
+
+
+@pytest.fixture
+def report(tmp_path):
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as test_file:
+        filepath = tmp_path / "2025_site.txt"
+        filepath.write_bytes(test_file.read_bytes())
+    return filepath
+
+
+def test_index_blocks_and_indexed_reads(report):
+    """
+    Test if the index holds every block of the report, and if reads through the index match full reads
+    """
+
+    index = tamis_index.build_tceq_index(report)
+    assert tamis_index.index_path(report).is_file()
+
+    records = pt.read_and_extract_tceq_data_to_unformatted_df(report, tzone_in=None)
+    blocks = records.group_by(tamis_index.BLOCK_KEY_COLUMNS, maintain_order=True).agg(
+        pl.len().cast(pl.UInt32).alias("Rows"),
+        pl.col("Datetime").min().alias("Start"),
+        pl.col("Datetime").max().alias("End"),
+    )
+    ptesting.assert_frame_equal(
+        index.drop("Offset", "Length"), blocks, check_dtypes=False
+    )
+
+    # Each block starts with a record of its series
+    with open(report, "rb") as text:
+        for offset, parameter_cd in index.select("Offset", "Parameter Cd").iter_rows():
+            text.seek(offset)
+            assert text.readline().split(b"\t")[5] == str(parameter_cd).encode()
+
+    for filters in [
+        dict(parameter_codes=[43202, 61103, 61104]),
+        dict(
+            parameter_codes=43202,
+            start=datetime(2025, 4, 10),
+            end=datetime(2025, 4, 12),
+        ),
+        dict(site_ids=1070, pocs=1, output="long"),
+    ]:
+        ptesting.assert_frame_equal(
+            pt.read_tceq_to_pl_dataframe(report, use_index=True, **filters),
+            pt.read_tceq_to_pl_dataframe(report, **filters),
+        )
+
+    # Only the matching blocks are read
+    ethane = tamis_index.indexed_report(report, parameter_codes=43202)
+    assert len(ethane) < report.stat().st_size / 10
+
+
+def test_index_refresh_and_fallbacks(report, tmp_path):
+    """
+    Test if a stale index is rebuilt, if CRLF reports are indexed, and if compressed reports are read in full
+    """
+
+    index = tamis_index.load_tceq_index(report)
+    rows = index["Rows"].sum()
+
+    # Appending a block makes the saved index stale
+    first_line = report.read_bytes().split(b"\n")[11]
+    with open(report, "ab") as text:
+        text.write(first_line.replace(b"1070", b"1071", 1) + b"\n")
+    assert tamis_index.load_tceq_index(report, build=False) is None
+    index = tamis_index.load_tceq_index(report)
+    assert index["Rows"].sum() == rows + 1
+    assert index.row(-1, named=True)["Site ID"] == 1071
+    ptesting.assert_frame_equal(
+        pt.read_tceq_to_pl_dataframe(report, site_ids=1071, use_index=True),
+        pt.read_tceq_to_pl_dataframe(report, site_ids=1071),
+    )
+
+    crlf = tmp_path / "2025_crlf.txt"
+    crlf.write_bytes(report.read_bytes().replace(b"\n", b"\r\n"))
+    ptesting.assert_frame_equal(
+        tamis_index.build_tceq_index(crlf).select("Rows", "Start", "End"),
+        index.select("Rows", "Start", "End"),
+    )
+    ptesting.assert_frame_equal(
+        pt.read_tceq_to_pl_dataframe(crlf, parameter_codes=43202, use_index=True),
+        pt.read_tceq_to_pl_dataframe(report, parameter_codes=43202),
+    )
+
+    compressed = tmp_path / "2025_site.txt.gz"
+    compressed.write_bytes(gzip.compress(report.read_bytes()))
+    assert tamis_index.indexed_report(compressed, parameter_codes=43202) == compressed
+    with pytest.raises(ValueError):
+        tamis_index.build_tceq_index(compressed)
+
+
+def test_index_of_read_only_report(report, monkeypatch):
+    """
+    Test if reports in read-only directories are read through an index built in memory
+    """
+
+    report.parent.chmod(0o555)
+    try:
+        if os.access(report.parent, os.W_OK):
+            # Permissions do not apply to root: fail the rename as a read-only directory would
+            def read_only(source, destination):
+                raise PermissionError(13, "Permission denied", str(destination))
+
+            monkeypatch.setattr(tamis_index.os, "replace", read_only)
+
+        ptesting.assert_frame_equal(
+            pt.read_tceq_to_pl_dataframe(report, parameter_codes=43202, use_index=True),
+            pt.read_tceq_to_pl_dataframe(report, parameter_codes=43202),
+        )
+        assert not tamis_index.index_path(report).exists()
+        assert tamis_index.load_tceq_index(report, build=False) is None
+    finally:
+        report.parent.chmod(0o755)
@@ -0,0 +1,61 @@
+# %%
+import logging
+import tceq_tamis_processor as pt
+import tamis_instrument
+from importlib import resources
+
+
+def test_stages_are_reported():
+    """
+    Test if the stages of a read are reported with their shapes and aggregated across files
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as comma:
+        with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as tab:
+            with tamis_instrument.collect_stages() as stages:
+                df = pt.read_tceq_to_pl_dataframe(comma)
+                df_raw = pt.read_and_extract_tceq_data_to_unformatted_df(tab)
+
+    events = {(event.stage, event.filepath): event for event in stages.events}
+    assert {stage for stage, _ in events} >= {
+        "preamble scan",
+        "unique series",
+        "join column keys",
+        "pivot",
+        "site names",
+        "read_csv",
+        "drop null columns",
+        "datetime conversion",
+    }
+
+    site_names = events["site names", str(comma)]
+    assert (site_names.rows_out, site_names.columns_out) == df.shape
+    read_csv = events["read_csv", str(tab)]
+    assert read_csv.rows_out == df_raw.height
+    assert events["datetime conversion", str(tab)].rows_in == df_raw.height
+    assert all(event.seconds >= 0 for event in stages.events)
+
+    summary = stages.summary()
+    preamble = summary.filter(stage="preamble scan").row(0, named=True)
+    assert preamble["calls"] == 2 and preamble["files"] == 2
+    assert abs(summary["share"].sum() - 1) < 1e-9
+
+
+def test_disabled_and_logging(caplog):
+    """
+    Test if stages are no-ops without observers and are logged by log_stages
+    """
+
+    assert not tamis_instrument.enabled()
+    stage = tamis_instrument.stage("pivot")
+    with stage:
+        assert stage.output("unchanged") == "unchanged"
+    assert stage is tamis_instrument.stage("read_csv")
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_pipe.txt") as test_file:
+        with caplog.at_level(logging.INFO, logger="tamis.stages"):
+            with tamis_instrument.log_stages():
+                pt.read_tceq_preamble(test_file)
+
+    assert not tamis_instrument.enabled()
+    assert any(record.message.startswith("preamble scan:") for record in caplog.records)
@@ -0,0 +1,117 @@
+# %%
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+import tceq_tamis_processor as pt
+import tamis_cache
+import tamis_io
+import tamis_streaming
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from importlib import resources
+
+
+class _Unseekable(io.RawIOBase):
+    """A stream that can only be read forward, like an HTTP response"""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+
+
+@pytest.fixture
+def report_text():
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as test_file:
+        return test_file.read_bytes()
+
+
+def test_compressed_and_archived_reports(tmp_path, report_text):
+    """
+    Test if compressed reports, zip archives and their members, and in-memory reports read the same as the plain report
+    """
+
+    plain = tmp_path / "2025_site.txt"
+    plain.write_bytes(report_text)
+    df = pt.read_tceq_to_pl_dataframe(plain)
+
+    sources = {"gz": gzip.compress, "bz2": bz2.compress, "xz": lzma.compress}
+    for suffix, compress in sources.items():
+        (tmp_path / f"2025_site.txt.{suffix}").write_bytes(compress(report_text))
+    zstandard = pytest.importorskip("zstandard")
+    (tmp_path / "2025_site.txt.zst").write_bytes(
+        zstandard.ZstdCompressor().compress(report_text)
+    )
+    with zipfile.ZipFile(tmp_path / "bundle.zip", "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("2025_site.txt", report_text)
+        bundle.writestr("2025_other.txt", report_text)
+    with zipfile.ZipFile(tmp_path / "single.zip", "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("2025_site.txt", report_text)
+
+    for source in (
+        tmp_path / "2025_site.txt.gz",
+        tmp_path / "2025_site.txt.bz2",
+        tmp_path / "2025_site.txt.xz",
+        tmp_path / "2025_site.txt.zst",
+        tmp_path / "single.zip",
+        tmp_path / "bundle.zip" / "2025_other.txt",
+        gzip.compress(report_text),
+        io.BufferedReader(_Unseekable(gzip.compress(report_text))),
+        _Unseekable(report_text),
+    ):
+        ptesting.assert_frame_equal(pt.read_tceq_to_pl_dataframe(source), df)
+
+    assert pt.read_tceq_preamble(
+        tmp_path / "2025_site.txt.zst"
+    ) == pt.read_tceq_preamble(plain)
+    batches = tamis_streaming.iter_tceq_batches(
+        _Unseekable(zstandard.ZstdCompressor().compress(report_text)),
+        batch_bytes=64 * 1024,
+    )
+    assert (
+        pl.concat(batches).height
+        == pt.read_and_extract_tceq_data_to_unformatted_df(plain).height
+    )
+
+    # A bundle of many reports needs a member path, and is expanded to its members
+    with pytest.raises(ValueError, match="2025_other.txt"):
+        pt.read_tceq_to_pl_dataframe(tmp_path / "bundle.zip")
+    assert tmp_path / "bundle.zip" / "2025_site.txt" in pt.resolve_tceq_paths(tmp_path)
+    assert len(pt.resolve_tceq_paths(tmp_path)) == 8
+
+    assert tamis_io.output_path(tmp_path / "2025_site.txt.gz", ".csv") == (
+        tmp_path / "2025_site.csv"
+    )
+    assert tamis_io.output_path(tmp_path / "bundle.zip" / "2025_other.txt", ".csv") == (
+        tmp_path / "2025_other.csv"
+    )
+
+
+def test_compressed_report_cache_and_save(tmp_path, report_text):
+    """
+    Test if compressed reports are cached and saved next to the compressed file
+    """
+
+    source = tmp_path / "2025_site.txt.gz"
+    source.write_bytes(gzip.compress(report_text))
+
+    df = pt.read_tceq_to_pl_dataframe(
+        source, cache_dir=tmp_path / "cache", save=True, saved_file_type="parquet"
+    )
+    ptesting.assert_frame_equal(pl.read_parquet(tmp_path / "2025_site.gzip"), df)
+    ptesting.assert_frame_equal(
+        pt.read_tceq_to_pl_dataframe(source, cache_dir=tmp_path / "cache"), df
+    )
+
+    # Reports in memory are read without the cache
+    ptesting.assert_frame_equal(
+        pt.read_tceq_to_pl_dataframe(report_text, cache_dir=tmp_path / "cache"), df
+    )
+    assert tamis_cache.cache_info(tmp_path / "cache").height == 1
@@ -3,6 +3,7 @@ import tceq_tamis_processor as pt
 import importlib
 import polars as pl
 import polars.testing as ptesting
+import pytest
 from importlib import resources
 
 importlib.reload(pt)
@@ -54,6 +55,318 @@ def test_equivalence():
     ptesting.assert_frame_equal(df2, df3)
 
 
+def test_preamble():
+    """
+    Test if the preamble parser finds the same header row and delimiter for each delimiter type,
+    and that the data starts at the reported byte offset
+
+    """
+    from datetime import datetime
+
+    for fname, delimiter in [
+        ("2025_kc_autogc_w_ws_wd_comma.txt", ","),
+        ("2025_kc_autogc_w_ws_wd_pipe.txt", "|"),
+        ("2025_kc_autogc_w_ws_wd_tab.txt", "\t"),
+    ]:
+        with resources.path("test_data", fname) as test_file:
+            preamble = pt.read_tceq_preamble(test_file)
+            with open(test_file, "rb") as report:
+                report.seek(preamble.header_offset)
+                header_line = report.readline()
+
+        assert preamble.delimiter == delimiter
+        assert preamble.header_row_number == 10
+        assert header_line.startswith(b"Transaction Type")
+        assert preamble.measurements_from == datetime(2025, 4, 7)
+        assert preamble.measurements_to == datetime(2025, 4, 22)
+        assert preamble.sample_duration_code == "1"
+        assert preamble.column_headings_included
+        assert preamble.column_names[:3] == ("Transaction Type", "Action", "State Cd")
+        assert len(preamble.column_names) == 28
+
+
+def test_scan_with_filters():
+    """
+    Test if filters pushed down into the lazy scan give the same data as filtering the full output
+    """
+    from datetime import datetime
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df_full = pt.read_tceq_to_pl_dataframe(test_file, save=False)
+        df_filtered = pt.read_tceq_to_pl_dataframe(
+            test_file,
+            parameter_codes=[43202, 61103],
+            start=datetime(2025, 4, 10),
+            end=datetime(2025, 4, 12),
+        )
+        lf = pt.scan_tceq(test_file)
+
+    assert isinstance(lf, pl.LazyFrame)
+    assert df_filtered.columns == [
+        "Datetime",
+        "Site Name",
+        "Site ID",
+        "TCEQ Ethane (ppbv)",
+        "TCEQ Wind Speed - Resultant (mph)",
+    ]
+
+    df_expected = df_full.select(df_filtered.columns).filter(
+        pl.col("Datetime").is_between(
+            pl.datetime(2025, 4, 10, time_zone="Etc/GMT+6"),
+            pl.datetime(2025, 4, 12, time_zone="Etc/GMT+6"),
+            closed="left",
+        ),
+        pl.any_horizontal(pl.col(df_filtered.columns[3:]).is_not_null()),
+    )
+    ptesting.assert_frame_equal(df_filtered, df_expected)
+
+
+def test_report_schema():
+    """
+    Test if reports are read with the explicit AQS schema: codes keep their leading zeros, every delimiter
+    gives the same dtypes, and the value dtype and per-column overrides can be changed
+    """
+
+    schemas = []
+    for fname in [
+        "2025_kc_autogc_w_ws_wd_comma.txt",
+        "2025_kc_autogc_w_ws_wd_pipe.txt",
+        "2025_kc_autogc_w_ws_wd_tab.txt",
+    ]:
+        with resources.path("test_data", fname) as test_file:
+            df = pt.read_and_extract_tceq_data_to_unformatted_df(test_file)
+        schemas.append(df.schema)
+
+    assert schemas[0] == schemas[1] == schemas[2]
+    assert df["POC"].dtype == pl.Categorical
+    assert df["POC"].cast(pl.String).unique().to_list() == ["01"]
+    assert df["Site ID"].dtype == pl.Int32
+    assert df["Value"].dtype == pl.Float64
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lf = pt.scan_tceq(
+            test_file, value_dtype=pl.Float32, schema_overrides={"Meth Cd": pl.String}
+        )
+        df_poc = pt.read_tceq_to_pl_dataframe(test_file, pocs=1)
+
+    schema = lf.collect_schema()
+    assert schema["Value"] == pl.Float32
+    assert schema["Meth Cd"] == pl.String
+    ptesting.assert_frame_equal(
+        lf.select("Value").collect(),
+        df.select(pl.col("Value").cast(pl.Float32)),
+    )
+    assert df_poc.height > 0
+
+
+def test_datetime_fast_path():
+    """
+    Test if the integer conversion of AQS dates and times gives the same result as parsing them as strings,
+    for fixed-offset, DST-observing, and missing timezones
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lf = pt.scan_tceq(test_file, tzone_in=None).select(
+            pl.col("Date").dt.strftime("%Y%m%d").cast(pl.Int32),
+            pl.col("Time").dt.strftime("%H:%M"),
+        )
+
+    # Leap days, century years, and year ends
+    df = pl.concat(
+        [
+            lf.collect(),
+            pl.DataFrame(
+                {
+                    "Date": [20000229, 19991231, 21000301, 20240229, 19700101],
+                    "Time": ["23:00", "00:00", "12:59", "01:30", "00:00"],
+                },
+                schema={"Date": pl.Int32, "Time": pl.String},
+            ),
+        ]
+    )
+
+    for tzone_in, tzone_out in [
+        ("Etc/GMT+6", "Etc/GMT+6"),
+        ("Etc/GMT+7", "UTC"),
+        ("UTC", "America/Chicago"),
+        ("America/Chicago", "Etc/GMT+6"),
+        ("Etc/GMT+6", None),
+        (None, None),
+    ]:
+        df_fast = pt.polars_convert_date_and_time_columns_to_datetime(
+            df, tzone_in=tzone_in, tzone_out=tzone_out
+        )
+        df_generic = pt._parse_date_and_time_columns(
+            df, "Date", "%Y%m%d", "Time", "%H:%M", tzone_in, tzone_out
+        )
+        ptesting.assert_frame_equal(df_fast, df_generic)
+
+    # Other formats and dtypes fall back to parsing strings
+    ptesting.assert_frame_equal(
+        pt.polars_convert_date_and_time_columns_to_datetime(
+            df.with_columns(pl.col("Date").cast(pl.String)), tzone_in="Etc/GMT+6"
+        ),
+        pt.polars_convert_date_and_time_columns_to_datetime(df, tzone_in="Etc/GMT+6"),
+    )
+
+
+def test_long_output():
+    """
+    Test if long output holds every value of the wide output, with compact code and label columns
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df_wide = pt.read_tceq_to_pl_dataframe(test_file)
+        df_long = pt.read_tceq_to_pl_dataframe(test_file, output="long")
+
+    assert df_long.columns == pt.LONG_FORMAT_COLUMNS
+    assert df_long["Parameter Name"].dtype == pl.Categorical
+    assert df_long["POC"].dtype == pl.Categorical
+    assert (
+        df_long.height
+        == df_wide.select(
+            pl.sum_horizontal(
+                pl.exclude("Datetime", "Site Name", "Site ID").is_not_null()
+            )
+        )
+        .sum()
+        .item()
+    )
+    ptesting.assert_frame_equal(pt.pivot_tceq_long(df_long), df_wide)
+
+
+def test_pivot_keeps_pocs_and_durations_apart(tmp_path):
+    """
+    Test if the same parameter measured with two POCs or two durations gets one labelled column per series
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_single = pt.read_tceq_to_pl_dataframe(test_file)
+
+    # A second ethane instrument (POC 02), and 24-hour (Dur Cd 7) averages of the outdoor temperature
+    second_poc = [
+        line.replace(",43202,01,", ",43202,02,")
+        for line in lines[11:]
+        if ",43202,01," in line
+    ]
+    daily = [
+        line.replace(",62101,01,1,", ",62101,01,7,")
+        for line in lines[11:]
+        if ",62101,01,1," in line and ",00:00," in line
+    ]
+    (tmp_path / "report.txt").write_text("".join(lines + second_poc + daily))
+
+    df = pt.read_tceq_to_pl_dataframe(tmp_path / "report.txt")
+
+    ethane = ["TCEQ Ethane (ppbv) [POC 01]", "TCEQ Ethane (ppbv) [POC 02]"]
+    temperature = [
+        "TCEQ Outdoor Temperature (Deg F) [Dur 1]",
+        "TCEQ Outdoor Temperature (Deg F) [Dur 7]",
+    ]
+    assert set(ethane + temperature) <= set(df.columns)
+    assert "TCEQ Ethane (ppbv)" not in df.columns
+    assert df.width == df_single.width + 2
+
+    ptesting.assert_series_equal(df[ethane[0]], df[ethane[1]], check_names=False)
+    ptesting.assert_series_equal(
+        df[ethane[0]], df_single["TCEQ Ethane (ppbv)"], check_names=False
+    )
+    assert (
+        df[temperature[1]].count()
+        == df.filter(pl.col("Datetime").dt.hour() == 0)[temperature[0]].count()
+    )
+
+
+def test_read_many_deduplicates_overlapping_reports(tmp_path):
+    """
+    Test if reading several reports gives one frame, keeping the values from the most recent run
+    when reports overlap
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_single = pt.read_tceq_to_pl_dataframe(test_file)
+
+    # Re-download of the wind speed only, run later and with revised values
+    preamble = [line.replace("08/29/2025", "09/15/2025") for line in lines[:11]]
+    wind_speed = [
+        line.replace(line.split(",")[12], "99.0")
+        for line in lines[11:]
+        if line.split(",")[5] == "61103"
+    ]
+    (tmp_path / "revised_wind.txt").write_text("".join(preamble + wind_speed))
+    (tmp_path / "original.txt").write_text("".join(lines))
+
+    df = pt.read_tceq_many(tmp_path, workers=2)
+
+    with pytest.raises(TypeError, match="save"):
+        pt.read_tceq_many(tmp_path, save=True)
+
+    assert df.columns == df_single.columns
+    assert df.height == df_single.height
+    assert (df["TCEQ Wind Speed - Resultant (mph)"] == 99.0).all()
+    ptesting.assert_frame_equal(
+        df.drop("TCEQ Wind Speed - Resultant (mph)"),
+        df_single.sort("Site ID", "Datetime").drop("TCEQ Wind Speed - Resultant (mph)"),
+    )
+
+
+def test_read_many_keeps_overlapping_records_in_other_units(tmp_path):
+    """
+    Test if records repeated across reports in different units are kept apart, unless units are normalized
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_single = pt.read_tceq_to_pl_dataframe(test_file)
+
+    # Re-download of the wind speed in knots, run later
+    preamble = [line.replace("08/29/2025", "09/15/2025") for line in lines[:11]]
+    wind_speed = []
+    for line in lines[11:]:
+        fields = line.split(",")
+        if fields[5] == "61103":
+            fields[8], fields[12] = "013", "10.0"
+            wind_speed.append(",".join(fields))
+    (tmp_path / "knots.txt").write_text("".join(preamble + wind_speed))
+    (tmp_path / "original.txt").write_text("".join(lines))
+
+    df = pt.read_tceq_many(tmp_path)
+    ptesting.assert_series_equal(
+        df["TCEQ Wind Speed - Resultant (mph)"],
+        df_single.sort("Site ID", "Datetime")["TCEQ Wind Speed - Resultant (mph)"],
+    )
+    knots = df_single["TCEQ Wind Speed - Resultant (mph)"].count()
+    assert (df["TCEQ Wind Speed - Resultant (Knots)"] == 10.0).sum() == knots
+
+    # Normalized, the knots are the same measurements, from the latest run
+    df = pt.read_tceq_many(tmp_path, normalize_units=True)
+    assert "TCEQ Wind Speed - Resultant (Knots)" not in df.columns
+    assert df[
+        "TCEQ Wind Speed - Resultant (mph)"
+    ].drop_nulls().to_list() == pytest.approx([11.50779] * knots)
+
+
+def test_reference_tables():
+    """
+    Test if the reference tables are loaded once per process and that the packaged .csv files match
+    the raw .txt exports they were made from
+    """
+
+    reference_tables = pt.get_reference_tables()
+    assert pt.get_reference_tables() is reference_tables
+    assert reference_tables.parameter_names[43202] == "Ethane"
+    assert reference_tables.unit_abbrs[8] == "ppbv"
+    assert reference_tables.sites["Site ID"].is_unique().all()
+
+    from_txt = pt.refresh_reference_tables(from_txt=True)
+    assert from_txt.version == reference_tables.version
+    assert pt.get_reference_tables() is from_txt
+
+    pt.refresh_reference_tables()
+
+
 def proc_tceq_formatted_ethane_2025():
     """
     Process data formatted by TCEQ (ethane) for comparing with data processed with TCEQ processor package
@@ -139,6 +452,38 @@ def test_compare_tceq_formatted_and_processed_data_ethane_2025():
     ptesting.assert_frame_equal(df, df2, check_exact=False, abs_tol=0.1)
 
 
+def test_pandas_output():
+    """
+    Test if pandas output is Arrow-backed and shares the memory of the polars records, keeping timezones and
+    categorical codes
+    """
+
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        wide = pt.read_tceq_to_pd_dataframe(test_file)
+        numpy_backed = pt.read_tceq_to_pd_dataframe(test_file, arrow_dtypes=False)
+        # One chunk per column, so the Series export below is zero-copy too
+        long = pt.read_tceq_to_pl_dataframe(test_file, output="long").rechunk()
+
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in wide.dtypes)
+    assert str(wide["Datetime"].dtype) == "timestamp[us, tz=Etc/GMT+6][pyarrow]"
+    ptesting.assert_frame_equal(
+        pl.from_pandas(wide), pl.from_pandas(numpy_backed), check_dtypes=False
+    )
+
+    pdf = pt.to_pd_dataframe(long)
+    poc = pdf["POC"].array.__arrow_array__().combine_chunks()
+    assert str(poc.type.index_type) == "uint32"
+    assert poc.indices.to_pylist() == long["POC"].to_physical().to_list()
+    assert poc.dictionary.take(poc.indices).to_pylist() == long["POC"].to_list()
+
+    # The values are the polars buffer itself
+    values = pdf["Value"].array.__arrow_array__().chunk(0)
+    assert values.buffers()[1].address == long["Value"].to_arrow().buffers()[1].address
+
+
 if __name__ == "__main__":
 
     test_compare_tceq_formatted_and_processed_data_ethane_2025()
@@ -0,0 +1,84 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_qualifiers as tq
+import tamis_synthetic
+import polars as pl
+import pytest
+
+
+def test_fold_and_filter_qualifiers(tmp_path):
+    """
+    Test if folding the qualifier columns keeps every code and if the helpers filter on them
+    """
+
+    filepath = tamis_synthetic.write_synthetic_report(
+        tmp_path / "qualified.txt", hours=500, qualifier_fraction=0.2
+    )
+    df_codes = pt.read_and_extract_tceq_data_to_unformatted_df(filepath)
+    df_mask = pt.read_and_extract_tceq_data_to_unformatted_df(
+        filepath, qualifier_mask=True
+    )
+
+    assert df_mask.schema[tq.QUALIFIER_MASK_COLUMN] == pl.UInt64
+    assert not set(tq.QUALIFIER_COLUMNS) & set(df_mask.columns)
+
+    # Synthetic reports only use "Qual Cd 1", with known codes
+    decoded = df_mask.select(tq.decode_qualifiers().list.first())
+    expected = df_codes.select(pl.col("Qual Cd 1").cast(pl.String))
+    assert decoded.to_series().to_list() == expected.to_series().to_list()
+
+    events = df_mask.filter(tq.has_any_qualifier(tq.EXCEPTIONAL_EVENT_CODES))
+    assert (
+        events.height
+        == df_codes.filter(pl.col("Qual Cd 1").is_in(["IT", "IH", "RT"])).height
+    )
+    assert 0 < events.height < df_mask.height
+    assert (
+        df_mask.filter(tq.has_any_qualifier("QX")).height
+        == df_codes.filter(pl.col("Qual Cd 1") == "QX").height
+        > 0
+    )
+    assert df_mask.filter(tq.has_unknown_qualifier()).is_empty()
+    assert df_mask.filter(tq.has_all_qualifiers(["IT", "RT"])).is_empty()
+
+    # Detection limit codes have bits of their own; codes AQS does not define share the unknown bit
+    df_other = tq.fold_qualifiers(
+        pl.DataFrame(
+            {
+                "Qual Cd 1": ["MD", "SQ", "ZZ", None],
+                "Qual Cd 2": [None, "V", None, None],
+            }
+        )
+    )
+    assert df_other.select(tq.decode_qualifiers()).to_series().to_list() == [
+        ["MD"],
+        ["SQ", "V"],
+        ["?"],
+        [],
+    ]
+    assert df_other.filter(tq.has_any_qualifier(["MD"])).height == 1
+    assert df_other.filter(tq.has_unknown_qualifier()).height == 1
+
+    with pytest.raises(ValueError):
+        tq.has_any_qualifier(["ZZ"])
+
+
+def test_qualifier_mask_long_output(tmp_path):
+    """
+    Test if long output keeps the qualifier mask and the wide output is unchanged
+    """
+
+    filepath = tamis_synthetic.write_synthetic_report(
+        tmp_path / "qualified.txt", hours=100, qualifier_fraction=0.2
+    )
+
+    df_long = pt.read_tceq_to_pl_dataframe(filepath, output="long", qualifier_mask=True)
+    assert df_long.columns[-1] == tq.QUALIFIER_MASK_COLUMN
+    assert df_long[tq.QUALIFIER_MASK_COLUMN].null_count() == 0
+
+    assert pt.read_tceq_to_pl_dataframe(filepath, qualifier_mask=True).equals(
+        pt.read_tceq_to_pl_dataframe(filepath)
+    )
+    assert (
+        tq.qualifier_codes().height == len(tq.QUALIFIER_BITS) < tq.OTHER_QUALIFIER_BIT
+    )
@@ -0,0 +1,232 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_store
+import polars as pl
+import polars.testing as ptesting
+from datetime import datetime
+from importlib import resources
+
+
+def test_dataset_append_and_scan(tmp_path):
+    """
+    Test if appends add new files to the dataset and if scanning combines partitions with different columns
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file)
+
+    ethane = df.select("Datetime", "Site Name", "Site ID", "TCEQ Ethane (ppbv)")
+    written = tamis_store.write_tceq_dataset(ethane, tmp_path)
+    written += tamis_store.write_tceq_dataset(df, tmp_path)
+
+    assert len(set(written)) == 2
+    assert all(path.parent.name == "Month=4" for path in written)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+    df_dataset = tamis_store.scan_tceq_dataset(tmp_path).collect()
+    assert df_dataset.height == 2 * df.height
+    assert set(df.columns) < set(df_dataset.columns)
+    assert (
+        df_dataset["TCEQ Ethylene (ppbv)"].null_count()
+        == ethane.height + df["TCEQ Ethylene (ppbv)"].null_count()
+    )
+
+
+def test_dataset_datetime_filter(tmp_path):
+    """
+    Test if datetime filters on a scanned dataset return the same rows as filtering in memory
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_tab.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(
+            test_file, save=True, saved_file_type="dataset", dataset_dir=tmp_path
+        )
+
+    lf = tamis_store.scan_tceq_dataset(tmp_path)
+    df_filtered = pt.filter_tceq(lf, start=datetime(2025, 4, 20)).collect()
+
+    ptesting.assert_frame_equal(
+        df_filtered.select(df.columns),
+        pt.filter_tceq(df, start=datetime(2025, 4, 20)).sort("Datetime"),
+    )
+
+
+def test_update_store(tmp_path):
+    """
+    Test if updating a store with a newer, overlapping report replaces revised values, removes values
+    invalidated inside the report's window, and leaves partitions the report does not touch alone
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_long = pt.format_tceq_long(pt.scan_tceq(test_file)).collect()
+
+    store = tmp_path / "store"
+    tamis_store.write_tceq_dataset(df_long, store)
+    (untouched,) = tamis_store.write_tceq_dataset(
+        df_long.with_columns(pl.lit(9999).alias("Site ID")), store
+    )
+
+    # Re-download of the wind speed for the second week: revised values, and 04/20 invalidated
+    preamble = [line.replace("04/07/2025", "04/14/2025") for line in lines[:11]]
+    wind_speed = [
+        line.replace(line.split(",")[12], "99.0")
+        for line in lines[11:]
+        if line.split(",")[5] == "61103"
+        and "20250414" <= line.split(",")[10] != "20250420"
+    ]
+    (tmp_path / "revised_wind.txt").write_text("".join(preamble + wind_speed))
+
+    summary = tamis_store.update_store(
+        store, tmp_path / "revised_wind.txt", replace_window=True, parameter_codes=61103
+    )
+
+    assert summary.rows() == [(1070, 2025, 4, df_long.height, df_long.height - 24)]
+    assert untouched.exists()
+    assert len(list(store.rglob("*.parquet"))) == 2
+    assert not list(store.rglob("*.tmp"))
+
+    df_store = (
+        tamis_store.scan_tceq_dataset(store).filter(pl.col("Site ID") == 1070).collect()
+    )
+    wind = pl.col("Parameter Cd") == 61103
+    in_window = pl.col("Datetime") >= pl.datetime(2025, 4, 14, time_zone="Etc/GMT+6")
+
+    assert (df_store.filter(wind & in_window)["Value"] == 99.0).all()
+    assert df_store.filter(wind, pl.col("Datetime").dt.day() == 20).is_empty()
+    ptesting.assert_frame_equal(
+        df_store.filter(~(wind & in_window)).drop("Year", "Month"),
+        df_long.filter(~(wind & in_window)),
+        check_row_order=False,
+        check_column_order=False,
+    )
+
+
+def test_update_store_in_utc(tmp_path):
+    """
+    Test if the measurement window of a report is applied in the timezone of a store written in another timezone
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_long = pt.format_tceq_long(
+            pt.scan_tceq(test_file, tzone_out="UTC")
+        ).collect()
+
+    store = tmp_path / "store"
+    tamis_store.write_tceq_dataset(df_long, store)
+
+    # Re-download of the wind speed for the second week, with 04/20 (local time) invalidated
+    preamble = [line.replace("04/07/2025", "04/14/2025") for line in lines[:11]]
+    wind_speed = [
+        line
+        for line in lines[11:]
+        if line.split(",")[5] == "61103"
+        and "20250414" <= line.split(",")[10] != "20250420"
+    ]
+    (tmp_path / "revised_wind.txt").write_text("".join(preamble + wind_speed))
+
+    summary = tamis_store.update_store(
+        store,
+        tmp_path / "revised_wind.txt",
+        tzone_out="UTC",
+        replace_window=True,
+        parameter_codes=61103,
+    )
+    assert summary["Rows After"].sum() == df_long.height - 24
+
+    df_store = tamis_store.scan_tceq_dataset(store).collect()
+    assert df_store.schema["Datetime"].time_zone == "UTC"
+    local_day = pl.col("Datetime").dt.convert_time_zone("Etc/GMT+6").dt.day()
+    assert df_store.filter(pl.col("Parameter Cd") == 61103, local_day == 20).is_empty()
+
+
+def test_update_store_removes_invalidated_months(tmp_path):
+    """
+    Test if replacing a window removes the stored records of partitions and series the report has no records for
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_long = pt.format_tceq_long(pt.scan_tceq(test_file)).collect()
+
+    # The same records a month later, in the May partition
+    store = tmp_path / "store"
+    tamis_store.write_tceq_dataset(df_long, store)
+    tamis_store.write_tceq_dataset(
+        df_long.with_columns(pl.col("Datetime").dt.offset_by("30d")), store
+    )
+
+    # Re-download of the wind speed from 04/14 to 05/10 with every value invalidated
+    window = "04/14/2025 00:00:00 up to but not including: 05/10/2025 00:00:00"
+    preamble = [
+        line.replace(
+            "04/07/2025 00:00:00 up to but not including: 04/22/2025 00:00:00", window
+        )
+        for line in lines[:11]
+    ]
+    (tmp_path / "invalidated.txt").write_text("".join(preamble))
+
+    summary = tamis_store.update_store(
+        store,
+        tmp_path / "invalidated.txt",
+        replace_window=True,
+        site_ids=1070,
+        parameter_codes=61103,
+    )
+    assert summary.select("Month").to_series().to_list() == [4, 5]
+
+    df_store = tamis_store.scan_tceq_dataset(store).collect()
+    in_window = pl.col("Datetime").is_between(
+        pl.datetime(2025, 4, 14, time_zone="Etc/GMT+6"),
+        pl.datetime(2025, 5, 10, time_zone="Etc/GMT+6"),
+        closed="left",
+    )
+    wind = pl.col("Parameter Cd") == 61103
+    assert df_store.filter(wind, in_window).is_empty()
+    assert not df_store.filter(wind, ~in_window).is_empty()
+    assert df_store.filter(~wind).height == 2 * df_long.filter(~wind).height
+
+
+def test_update_store_keeps_records_in_other_units(tmp_path):
+    """
+    Test if a record reported in two units is stored as two records, unless units are normalized
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines(keepends=True)
+        df_long = pt.format_tceq_long(pt.scan_tceq(test_file)).collect()
+
+    store = tmp_path / "store"
+    tamis_store.write_tceq_dataset(df_long, store)
+
+    # Wind speeds of 04/20 in mph, and again in knots
+    wind_speed = [
+        line.split(",")
+        for line in lines[11:]
+        if line.split(",")[5] == "61103" and line.split(",")[10] == "20250420"
+    ]
+    knots = [
+        [*fields[:8], "013", *fields[9:12], "10.0", *fields[13:]]
+        for fields in wind_speed
+    ]
+    (tmp_path / "two_units.txt").write_text(
+        "".join(lines[:11] + [",".join(fields) for fields in wind_speed + knots])
+    )
+
+    summary = tamis_store.update_store(store, tmp_path / "two_units.txt")
+    assert summary["Rows After"].item() == df_long.height + len(knots)
+
+    df_store = tamis_store.scan_tceq_dataset(store).collect()
+    ptesting.assert_frame_equal(
+        df_store.filter(pl.col("Unit Cd") != 13).drop("Year", "Month"),
+        df_long,
+        check_row_order=False,
+        check_column_order=False,
+    )
+
+    # Normalized, the knots are the same measurements as the mph values
+    summary = tamis_store.update_store(
+        store, tmp_path / "two_units.txt", normalize_units=True
+    )
+    assert summary["Rows After"].item() == df_long.height
@@ -0,0 +1,63 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_streaming
+import tamis_store
+import polars as pl
+import polars.testing as ptesting
+from importlib import resources
+
+
+def test_batches_match_full_read():
+    """
+    Test if reading a report in small batches gives the same records as reading it in one go
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_pipe.txt") as test_file:
+        batches = list(
+            tamis_streaming.iter_tceq_batches(test_file, batch_bytes=64 * 1024)
+        )
+        df_full = pt.format_tceq_long(
+            pt.read_and_extract_tceq_data_to_unformatted_df(test_file)
+        )
+
+    assert len(batches) > 1
+    ptesting.assert_frame_equal(pl.concat(batches).select(df_full.columns), df_full)
+
+
+def test_convert_to_parquet_dataset(tmp_path):
+    """
+    Test if the long and wide Parquet datasets read back to the same data as `read_tceq_to_pl_dataframe`, and
+    if batches are buffered into one file per partition
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file)
+        tamis_streaming.convert_tceq_to_parquet(
+            test_file, tmp_path / "long", memory_budget=0
+        )
+        tamis_streaming.convert_tceq_to_parquet(
+            test_file, tmp_path / "wide", output="wide", memory_budget=0
+        )
+        tamis_streaming.convert_tceq_to_parquet(
+            test_file, tmp_path / "buffered", batch_bytes=64 * 1024
+        )
+
+    df_long = tamis_store.scan_tceq_dataset(tmp_path / "long").collect()
+    assert set(df_long.select("Year", "Month").unique().iter_rows()) == {(2025, 4)}
+    ptesting.assert_frame_equal(
+        pt.pivot_tceq_long(df_long).sort("Datetime"), df.sort("Datetime")
+    )
+
+    # Several batches, written together
+    assert len(list((tmp_path / "buffered").rglob("*.parquet"))) == 1
+    ptesting.assert_frame_equal(
+        tamis_store.scan_tceq_dataset(tmp_path / "buffered").collect(),
+        df_long,
+        check_row_order=False,
+    )
+
+    df_wide = tamis_store.scan_tceq_dataset(tmp_path / "wide").collect()
+    ptesting.assert_frame_equal(
+        df_wide.select(df.columns).sort("Datetime"),
+        df.sort("Datetime"),
+    )
@@ -0,0 +1,67 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_synthetic
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from datetime import datetime
+
+
+def test_synthetic_report_reads_back(tmp_path):
+    """
+    Test if synthetic reports in each delimiter have a valid preamble and read to the same data
+    """
+
+    dfs = []
+    for name, delimiter in (("comma", ","), ("pipe", "|"), ("tab", "\t")):
+        filepath = tamis_synthetic.write_synthetic_report(
+            tmp_path / f"synthetic_{name}.txt",
+            sites=[1070, 1071],
+            pocs=["01", "02"],
+            start=datetime(2025, 4, 7),
+            hours=200,
+            delimiter=delimiter,
+            null_fraction=0.05,
+            qualifier_fraction=0.05,
+            block_rows=64,
+        )
+
+        preamble = pt.read_tceq_preamble(filepath)
+        assert preamble.delimiter == delimiter
+        assert preamble.header_row_number == 10
+        assert preamble.measurements_from == datetime(2025, 4, 7)
+        assert preamble.measurements_to == datetime(2025, 4, 15, 8)
+
+        df_raw = pt.read_and_extract_tceq_data_to_unformatted_df(filepath)
+        assert df_raw.height == 2 * len(tamis_synthetic.DEFAULT_PARAMETERS) * 2 * 200
+        assert set(df_raw["Null Data Cd"].drop_nulls()) <= set(
+            tamis_synthetic.NULL_DATA_CODES
+        )
+        assert 0 < df_raw["Null Data Cd"].is_not_null().sum() < df_raw.height / 10
+        assert df_raw["Qual Cd 1"].is_not_null().sum() > 0
+        assert (
+            df_raw.filter(pl.col("Null Data Cd").is_not_null())["Value"].is_null().all()
+        )
+
+        dfs.append(pt.read_tceq_to_pl_dataframe(filepath))
+
+    assert dfs[0].height == 2 * 200
+    for df in dfs[1:]:
+        ptesting.assert_frame_equal(df, dfs[0])
+
+
+def test_synthetic_report_is_reproducible(tmp_path):
+    """
+    Test if the same seed gives the same report and rows sets the report size
+    """
+
+    first, second, third = (
+        tamis_synthetic.write_synthetic_report(tmp_path / name, rows=10_000, seed=seed)
+        for name, seed in (("a.txt", 1), ("b.txt", 1), ("c.txt", 2))
+    )
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != third.read_bytes()
+    assert pt.read_and_extract_tceq_data_to_unformatted_df(
+        first
+    ).height == pytest.approx(10_000, abs=len(tamis_synthetic.DEFAULT_PARAMETERS))
@@ -0,0 +1,84 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_units
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from importlib import resources
+
+
+@pytest.fixture
+def ppbc_report(tmp_path):
+    """The comma-delimited test report, with the ethane records from April 14 on reported in ppb C"""
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        lines = test_file.read_text().splitlines()
+
+    for number, line in enumerate(lines):
+        fields = line.split(",")
+        if len(fields) > 12 and fields[5] == "43202" and fields[10] >= "20250414":
+            fields[8] = "078"
+            fields[12] = str(float(fields[12]) * 2)
+            lines[number] = ",".join(fields)
+
+    filepath = tmp_path / "2025_ppbc.txt"
+    filepath.write_text("\n".join(lines) + "\n")
+    return filepath
+
+
+def test_carbon_units_share_a_column(ppbc_report):
+    """
+    Test if values reported in ppb C are converted to ppbv with the compound's carbon number before the pivot
+    """
+
+    mixed = pt.read_tceq_to_pl_dataframe(ppbc_report)
+    assert "TCEQ Ethane (ppb C)" in mixed.columns
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        expected = pt.read_tceq_to_pl_dataframe(test_file)
+    normalized = pt.read_tceq_to_pl_dataframe(
+        ppbc_report, normalize_units={"CarbonVolRatio": 8}
+    )
+    ptesting.assert_frame_equal(normalized, expected)
+
+    long = pt.read_tceq_many([ppbc_report], normalize_units=True, output="long")
+    units = long["Unit Abbr"].unique().sort()
+    assert units.to_list() == ["Deg C", "deg", "mph", "ppbv"]
+
+    # Compounds without a carbon number keep their carbon units
+    kept = tamis_units.normalize_units(pt.scan_tceq(ppbc_report), carbon_numbers={})
+    units = kept.select(pl.col("Unit Cd").unique().sort()).collect()
+    assert units["Unit Cd"].to_list() == [8, 12, 14, 17, 78]
+
+
+def test_unit_conversions():
+    """
+    Test temperature and volume mixing ratio conversions, and that units of different kinds are refused
+    """
+
+    records = pl.DataFrame(
+        {
+            "Parameter Cd": [62101, 62101, 43202, 43202, 43202],
+            "Unit Cd": [15, 17, 7, 101, 8],
+            "Value": [212.0, 20.0, 0.5, 0.5, 3.0],
+        },
+        schema_overrides={"Parameter Cd": pl.Int32, "Unit Cd": pl.Int16},
+    )
+
+    normalized = tamis_units.normalize_units(records)
+    assert normalized["Unit Cd"].to_list() == [17, 17, 8, 8, 8]
+    assert normalized["Value"].to_list() == pytest.approx(
+        [100.0, 20.0, 500.0, 250.0, 3.0]
+    )
+
+    # Back to Deg F, and ppbv to ppb C
+    normalized = tamis_units.normalize_units(
+        records.lazy(), targets={"Temp": 15, "VolRatio": 78}
+    ).collect()
+    assert normalized["Unit Cd"].to_list() == [15, 15, 78, 101, 78]
+    assert normalized["Value"].to_list() == pytest.approx(
+        [212.0, 68.0, 1000.0, 0.5, 6.0]
+    )
+
+    with pytest.raises(ValueError, match="Cannot convert"):
+        tamis_units.unit_conversions({"Temp": 12})
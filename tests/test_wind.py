@@ -0,0 +1,105 @@
+# %%
+import tceq_tamis_processor as pt
+import tamis_wind
+import polars as pl
+import polars.testing as ptesting
+import pytest
+from importlib import resources
+from test_aggregate import tceq_monthly_summary
+
+
+def _tceq_page(
+    name: str, column: str, parameter_cd: int
+) -> tuple[pl.DataFrame, pl.Series]:
+    """Long-format hourly records of a TCEQ monthly summary page, and its daily "Res" column"""
+
+    hourly, _ = tceq_monthly_summary(name, column)
+    with resources.path("test_data", name) as test_file:
+        resultant = pl.read_csv(test_file, infer_schema=False)["Res"].cast(pl.Float64)
+    long = hourly.select(
+        "Site ID",
+        pl.lit("Karnes County").cast(pl.Categorical).alias("Site Name"),
+        pl.lit(parameter_cd, dtype=pl.Int32).alias("Parameter Cd"),
+        pl.lit("1").cast(pl.Categorical).alias("POC"),
+        pl.lit("1").cast(pl.Categorical).alias("Dur Cd"),
+        "Datetime",
+        pl.col(column).alias("Value"),
+    )
+    return long, resultant
+
+
+def test_daily_resultants_match_tceq():
+    """
+    Test if the daily vector averages of the hourly resultant winds match the "Res" columns of the TCEQ monthly
+    summary pages
+    """
+
+    speed, speed_resultant = _tceq_page(
+        "october_2023_resultant_wind_speed_from_tceq_for_comparison.csv",
+        "TCEQ Wind Speed - Resultant (mph)",
+        61103,
+    )
+    direction, direction_resultant = _tceq_page(
+        "october_2023_resultant_wind_direction_from_tceq_for_comparison.csv",
+        "TCEQ Wind Direction - Resultant (deg)",
+        61104,
+    )
+    df = pl.concat([speed, direction])
+
+    daily = tamis_wind.vector_average(df.lazy(), every="1d").collect()
+    assert daily["Parameter Cd"].unique().to_list() == [61103]
+    assert daily["Complete"].all()
+    assert daily["Resultant Speed"].round(1).to_list() == speed_resultant.to_list()
+    assert (
+        daily["Resultant Direction"].round(0) % 360
+    ).to_list() == direction_resultant.to_list()
+    assert (daily["Resultant Speed"] <= daily["Scalar Speed"] + 1e-9).all()
+
+
+def test_wind_components_and_rose():
+    """
+    Test if speeds and directions are paired per site and time, and if the wind rose counts every pair once
+    """
+
+    with resources.path("test_data", "2025_kc_autogc_w_ws_wd_comma.txt") as test_file:
+        df = pt.read_tceq_to_pl_dataframe(test_file)
+        df_long = pt.read_tceq_to_pl_dataframe(test_file, output="long")
+
+    components = tamis_wind.wind_components(df_long)
+    wide = df.drop_nulls(
+        ["TCEQ Wind Speed - Resultant (mph)", "TCEQ Wind Direction - Resultant (deg)"]
+    )
+    assert components.height == wide.height
+    ptesting.assert_series_equal(
+        components.sort("Datetime")["Wind Speed"],
+        wide.sort("Datetime")["TCEQ Wind Speed - Resultant (mph)"],
+        check_names=False,
+    )
+
+    # A wind from the east blows towards the west
+    east = components.filter(pl.col("Wind Direction").is_between(89, 91))
+    assert (east["U"] < 0).all()
+
+    rose = tamis_wind.wind_rose(df_long, sectors=8)
+    assert rose["Count"].sum() == components.height
+    assert rose["Frequency (%)"].sum() == pytest.approx(100)
+    assert set(rose["Sector"]) <= {45.0 * sector for sector in range(8)}
+    assert rose["Speed Bin"].dtype.categories.to_list() == [
+        "[-inf, 2)",
+        "[2, 5)",
+        "[5, 10)",
+        "[10, 15)",
+        "[15, 20)",
+        "[20, inf)",
+    ]
+    calm = components.filter(pl.col("Wind Speed") < 2).height
+    assert rose.filter(pl.col("Speed Bin") == "[-inf, 2)")["Count"].sum() == calm
+
+    monthly = tamis_wind.wind_rose(df_long.lazy(), every="1mo").collect()
+    assert (
+        monthly.group_by("Datetime")
+        .agg(pl.col("Frequency (%)").sum())["Frequency (%)"]
+        .round(6)
+        .eq(100)
+        .all()
+    )